@@ -28,12 +28,24 @@ RESTORED FUNCTIONALITY:
 """
 
 import numpy as np
+import os
 import queue
 import threading
 import time
 import json
 import collections
-from typing import List, Dict, Optional, Tuple
+import collections.abc
+import dataclasses
+import functools
+import gc
+import itertools
+import lzma
+import math
+import mmap
+import operator
+import struct
+import zlib
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -45,6 +57,48 @@ KB = 1.380649e-23  # Boltzmann constant
 G = 6.67430e-11  # Gravitational constant
 
 
+# CST v2.0 additive: φ-ratio ladder PHI ** (i / 2), computed once
+PHI_LADDER_SIZE = 64
+PHI_RATIOS = tuple(PHI ** (i / 2) for i in range(PHI_LADDER_SIZE))
+
+
+def phi_ratio(idx: int) -> float:
+    """CST v2.0 additive: PHI ** (idx / 2), read from the ladder when in range"""
+    return PHI_RATIOS[idx] if 0 <= idx < PHI_LADDER_SIZE else PHI ** (idx / 2)
+
+
+@functools.lru_cache(maxsize=None)
+def _folded_phi_ratios(count: int) -> np.ndarray:
+    """The first ``count`` φ ratios folded down by octaves into [1, 4], ascending
+    
+    Closed form of "halve while above 4": k = ceil(log2(r) - 2) octaves,
+    with one compare to absorb log2 rounding. Halving is exact, so
+    f * folded equals the looped fold of f * r bit for bit.
+    """
+    ratios = np.array([phi_ratio(i) for i in range(count)], dtype=np.float64)
+    octaves = np.maximum(0.0, np.ceil(np.log2(ratios) - 2.0))
+    folded = ratios / 2.0 ** octaves
+    folded = np.where(folded > 4.0, folded / 2.0, folded)
+    return np.sort(folded)
+
+
+@functools.lru_cache(maxsize=1024)
+def _phi_harmonic_series(fundamental: float, count: int) -> Tuple[float, ...]:
+    if not (fundamental > 0 and math.isfinite(fundamental)):
+        return tuple(sorted(float(fundamental * phi_ratio(i)) for i in range(count)))
+    return tuple((fundamental * _folded_phi_ratios(count)).tolist())
+
+
+def phi_harmonics(fundamental: float, count: int = 8) -> List[float]:
+    """CST v2.0 additive: φ-harmonic series of ``fundamental``, octave-folded, ascending
+    
+    fundamental * PHI ** (i / 2) for i < count, halved until at most
+    4 * fundamental. Results are cached (LRU) per fundamental; FFT peaks
+    sit on the bin grid, so a held note or a replay is a cache hit.
+    """
+    return list(_phi_harmonic_series(float(fundamental), count))
+
+
 class SimulationMode(Enum):
     LIVE = "live"
     REPLAY = "replay"
@@ -79,6 +133,9 @@ class AdaptiveConfig:
 class SyncConfig:
     """CST v2.0 additive: Synchronization configuration"""
     Ksync: float = 0.1
+    clusterPhaseTolerance: float = 0.1  # radians; neighbors closer in phase are locked
+    clusterMinSize: int = 2  # smallest reported phase-locked cluster
+    clusterEveryTick: bool = False  # update the cluster union-find at the end of every tick
 
 
 @dataclass
@@ -87,6 +144,26 @@ class TimestepConfig:
     dt: float = 0.005
     dtMax: float = 0.01
     adaptive: bool = True
+    # CST v2.0 additive: Hierarchical block timesteps (per-particle 2^-k sub-steps)
+    blockSteps: bool = False
+    maxBlockLevel: int = 7  # finest sub-step is dt / 2**maxBlockLevel
+    blockEta: float = 0.1  # accuracy factor, as in the global 0.1 * r_min / v_max
+    # CST v2.0 additive: Position integrator, one of INTEGRATORS
+    integrator: str = "euler"
+
+
+# CST v2.0 additive: Position integrators. "euler" is the original blended
+# displacement step; "rk4" integrates the same flow with classic RK4;
+# "leapfrog" Strang-splits RK4 Lorenz half-steps around a kick-drift-kick
+# gravity step with its own velocity state.
+INTEGRATORS = ("euler", "rk4", "leapfrog")
+
+# CST v2.0 additive: Particle state precisions. In "float32" mode the chunked
+# tick gathers particle state as float32 and its neighbor, force, phase and
+# integration kernels compute in float32; the per-particle tick rounds
+# positions, velocities, x12, m12 and theta to float32 after every
+# integration step. ψ integrals, energies and conservation sums stay float64.
+PRECISIONS = {"float64": np.float64, "float32": np.float32}
 
 
 @dataclass
@@ -96,6 +173,79 @@ class DarkMatterParams:
     rs: float = 5.0
 
 
+# CST v2.0 additive: NFW lookup table resolution. The grid is uniform in
+# ln(1 + r/rs) out to NFW_TABLE_RMAX, the farthest a clamped position
+# (|x|, |y|, |z| <= 1000) can be from the origin.
+NFW_TABLE_SIZE = 4096
+NFW_TABLE_RMAX = 1000.0 * np.sqrt(3.0)
+
+
+class NFWTable:
+    """CST v2.0 additive: Tabulated NFW potential and radial acceleration
+    
+    Φ(r) = -4πGρ0 rs³ ln(1 + x) / r and g(r) = G M(<r) / r², with
+    M(<r) = 4πρ0 rs³ [ln(1 + x) - x / (1 + x)] and x = r / rs, sampled on a
+    grid uniform in ln(1 + x). At r = 0 both take their finite limits,
+    -4πGρ0 rs² and 2πGρ0 rs, and the acceleration vector is zero.
+    ``evaluate`` is one linear interpolation pass with the grid index
+    computed directly.
+    """
+    
+    def __init__(self, rho0: float, rs: float, G_: float = G, size: int = NFW_TABLE_SIZE,
+                 r_max: float = NFW_TABLE_RMAX):
+        if rs <= 0:
+            raise ValueError("NFW scale radius rs must be positive")
+        self.key = (rho0, rs, G_)
+        self.rs = rs
+        self.size = size
+        self.du = np.log1p(r_max / rs) / (size - 1)
+        x = np.expm1(np.arange(size) * self.du)
+        r = x * rs
+        scale = 4 * np.pi * G_ * rho0 * rs ** 3
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.potential = -scale * np.log1p(x) / r
+            self.acceleration = scale * (np.log1p(x) - x / (1 + x)) / r ** 2
+        self.potential[0] = -4 * np.pi * G_ * rho0 * rs ** 2
+        self.acceleration[0] = 2 * np.pi * G_ * rho0 * rs
+    
+    def evaluate(self, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Potential per unit mass and (3, N) acceleration at the given positions"""
+        pos = np.stack([np.asarray(c, dtype=np.float64) for c in (x, y, z)])
+        r = np.sqrt(np.einsum('ij,ij->j', pos, pos))
+        t = np.clip(np.log1p(r / self.rs) / self.du, 0.0, self.size - 1)
+        k = np.minimum(t.astype(np.int64), self.size - 2)
+        w = t - k
+        phi = self.potential[k] + w * (self.potential[k + 1] - self.potential[k])
+        g = self.acceleration[k] + w * (self.acceleration[k + 1] - self.acceleration[k])
+        with np.errstate(divide='ignore'):
+            inward = np.where(r > 0, -g / r, 0.0)
+        return phi, inward * pos
+
+
+@dataclass
+class CoalescingConfig:
+    """CST v2.0 additive: Token coalescing configuration"""
+    enabled: bool = False
+    frequencyWindow: float = 0.5  # seconds of frame time per merged frequency_update
+    harmonicTolerance: float = 0.01  # relative change that re-emits the harmonic set
+
+
+@dataclass
+class ParallelConfig:
+    """CST v2.0 additive: Chunked, thread-parallel tick kernels"""
+    enabled: bool = False
+    threads: int = 0  # pool size; 0 = one per CPU
+    chunkSize: int = 4096  # particles per chunk (results do not depend on threads)
+
+
+@dataclass
+class DomainConfig:
+    """CST v2.0 additive: Spatial domain decomposition configuration"""
+    workers: int = 0  # worker processes; 0 = one per CPU
+    rebalanceInterval: int = 10  # steps between cost-based slab rebalancing (0 = never)
+    chunkSize: int = 32768  # particles per vectorized neighbor-search batch
+
+
 @dataclass
 class AudioFrame:
     """CST v2.0 additive: Audio frame data structure"""
@@ -105,10 +255,431 @@ class AudioFrame:
     spectralCentroid: float
     harmonics: List[float]
     dataArray: Optional[np.ndarray] = None
+    # Monotonic-clock stage stamps (time.monotonic()), e.g. {"capture": t0, "features": t1}
+    stageTimes: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class FrequencyMatchConfig:
+    """CST v2.0 additive: Matching detected audio peaks to particles by frequency"""
+    toleranceOctaves: float = 1.0 / 12.0  # a peak claims the nearest particle within a semitone
+
+
+class FrequencyIndex:
+    """CST v2.0 additive: Particles sorted by log2 frequency for nearest-peak lookup
+    
+    Holds (key, particle row) pairs in key order; particles with a
+    non-positive frequency are not indexed. ``match`` resolves all k peaks
+    of a frame with one searchsorted (O(k log N)); ``move`` re-sorts only
+    when a retuned particle passes a neighbour, and ``insert`` places one
+    new key by binary search.
+    """
+    
+    def __init__(self, particles):
+        freqs = np.array([p.frequency for p in particles], dtype=np.float64)
+        rows = np.flatnonzero(freqs > 0)
+        keys = np.log2(freqs[rows])
+        order = np.argsort(keys, kind='stable')
+        self.keys: np.ndarray = keys[order]
+        self.rows: np.ndarray = rows[order]
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    @staticmethod
+    def _key(frequencies) -> np.ndarray:
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        return np.log2(frequencies, out=np.full(frequencies.shape, np.nan), where=frequencies > 0)
+    
+    def match(self, frequencies, tolerance: float) -> np.ndarray:
+        """Index position of the nearest key within ``tolerance`` octaves per peak, else -1
+        
+        Peaks are taken in order (loudest first). When an earlier peak has
+        already claimed the nearest particle, a later peak falls back to the
+        key on the other side if that one is free and within tolerance;
+        otherwise it stays unmatched.
+        """
+        keys = self._key(frequencies)
+        positions = np.full(len(keys), -1, dtype=np.int64)
+        n = len(self.keys)
+        if n == 0 or len(keys) == 0:
+            return positions
+        right = np.minimum(np.searchsorted(self.keys, keys), n - 1)
+        left = np.maximum(right - 1, 0)
+        d_left = np.abs(keys - self.keys[left])
+        d_right = np.abs(self.keys[right] - keys)
+        nearest = np.where(d_right < d_left, right, left)
+        hits = np.flatnonzero(np.minimum(d_left, d_right) <= tolerance)  # NaN keys never hit
+        _, first = np.unique(nearest[hits], return_index=True)
+        if len(first) == len(hits):
+            positions[hits] = nearest[hits]
+            return positions
+        
+        # Some peaks share a nearest key: resolve the k peaks one by one, loudest first
+        other = np.where(nearest == right, left, right)
+        other_ok = (other != nearest) & (np.maximum(d_left, d_right) <= tolerance)
+        claimed = set()
+        for i in hits.tolist():
+            for pos in (int(nearest[i]), int(other[i]) if other_ok[i] else -1):
+                if pos >= 0 and pos not in claimed:
+                    claimed.add(pos)
+                    positions[i] = pos
+                    break
+        return positions
+    
+    def move(self, positions: np.ndarray, frequencies):
+        """Retune the particles at index ``positions`` to new (positive) frequencies"""
+        if len(positions) == 0:
+            return
+        keys = self.keys
+        keys[positions] = self._key(frequencies)
+        n = len(keys)
+        ordered = (((positions == 0) | (keys[positions - 1] <= keys[positions]))
+                   & ((positions == n - 1) | (keys[np.minimum(positions + 1, n - 1)] >= keys[positions])))
+        if not np.all(ordered):
+            order = np.argsort(keys, kind='stable')
+            self.keys = keys[order]
+            self.rows = self.rows[order]
+    
+    def insert(self, row: int, frequency: float):
+        """Index a new particle row (ignored for a non-positive frequency)"""
+        if not frequency > 0:
+            return
+        key = float(np.log2(frequency))
+        pos = int(np.searchsorted(self.keys, key, side='right'))
+        self.keys = np.insert(self.keys, pos, key)
+        self.rows = np.insert(self.rows, pos, row)
+
+
+# CST v2.0 additive: Pipeline stages timed from audio capture (in pipeline order)
+LATENCY_STAGES = ("features", "ingest", "tokens", "tick")
+
+
+class LatencyHistogram:
+    """CST v2.0 additive: HDR-style log-bucketed latency histogram
+    
+    Buckets grow geometrically so every recorded value keeps a bounded
+    relative error (``precision``) from ``min_value`` up to ``max_value``
+    seconds, with constant memory and O(1) recording.
+    """
+    
+    def __init__(self, min_value: float = 1e-6, max_value: float = 100.0,
+                 precision: float = 0.01):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_base = math.log1p(precision)
+        n_buckets = int(math.ceil(math.log(max_value / min_value) / self._log_base)) + 2
+        self.counts = np.zeros(n_buckets, dtype=np.int64)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+    
+    def record(self, value: float):
+        """Record one latency sample (seconds)"""
+        if not np.isfinite(value):
+            return
+        value = max(value, 0.0)
+        if value <= self.min_value:
+            idx = 0
+        else:
+            idx = int(math.log(value / self.min_value) / self._log_base) + 1
+            idx = min(idx, len(self.counts) - 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+    
+    def _bucket_value(self, idx: int) -> float:
+        """Representative (upper-edge) value for a bucket"""
+        if idx == 0:
+            return self.min_value
+        return self.min_value * math.exp(idx * self._log_base)
+    
+    def percentile(self, q: float) -> float:
+        """Value at percentile q (0-100), within the histogram precision"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        idx = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._bucket_value(idx), self.max)
+    
+    def summary(self) -> Dict:
+        """Count, mean, p50, p99 and max in seconds"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count > 0 else 0.0,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
+    
+    def reset(self):
+        """Clear all samples"""
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class LatencyTracker:
+    """CST v2.0 additive: Audio-to-token/particle latency per pipeline stage
+    
+    Each stage histogram holds the time from capture to that stage, so
+    ``tokens`` is capture-to-TokenStream and ``tick`` is capture-to-the
+    first tick that moves particles with the frame applied.
+    """
+    
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram() for stage in LATENCY_STAGES
+        }
+        # Optional SLO thresholds (seconds) on p99, keyed by stage
+        self.slo: Dict[str, float] = {}
+    
+    def stamp(self, frame: AudioFrame, stage: str, now: Optional[float] = None):
+        """Stamp a frame at a stage and record its capture-relative latency"""
+        if now is None:
+            now = time.monotonic()
+        frame.stageTimes[stage] = now
+        t0 = frame.stageTimes.get("capture")
+        if t0 is not None and stage in self.histograms:
+            self.histograms[stage].record(now - t0)
+    
+    def record_frame(self, frame: AudioFrame):
+        """Record latencies for stages stamped upstream (e.g. in the audio thread)"""
+        t0 = frame.stageTimes.get("capture")
+        if t0 is None:
+            return
+        for stage, t in frame.stageTimes.items():
+            if stage in self.histograms:
+                self.histograms[stage].record(t - t0)
+    
+    def summary(self) -> Dict:
+        """Per-stage latency summary with SLO status"""
+        stages = {}
+        for stage, hist in self.histograms.items():
+            stats = hist.summary()
+            limit = self.slo.get(stage)
+            stats["slo"] = limit
+            stats["sloOk"] = limit is None or stats["p99"] <= limit
+            stages[stage] = stats
+        return {
+            "stages": stages,
+            "sloOk": all(s["sloOk"] for s in stages.values())
+        }
+    
+    def reset(self):
+        """Clear all histograms"""
+        for hist in self.histograms.values():
+            hist.reset()
+
+
+def _json_default(value):
+    """JSON fallback for NumPy scalars/arrays inside tokens"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_token(token: Dict) -> bytes:
+    """CST v2.0 additive: Compact JSON encoding of one token"""
+    return json.dumps(token, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+# CST v2.0 additive: Export compression options -> (file suffix, MIME type)
+EXPORT_COMPRESSIONS = {
+    "none": ("", "application/json"),
+    "gzip": (".gz", "application/gzip"),
+    "lzma": (".xz", "application/x-xz")
+}
+
+
+def compress_chunks(chunks: Iterable[bytes], compression: str = "none") -> Iterator[bytes]:
+    """CST v2.0 additive: Stream-compress byte chunks (none/gzip/lzma)"""
+    if compression == "none":
+        yield from chunks
+        return
+    if compression == "gzip":
+        # wbits=31 writes a gzip container
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    elif compression == "lzma":
+        compressor = lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=1)
+    else:
+        raise ValueError(f"Unknown compression '{compression}'")
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def iter_json_array_document(head: Dict, key: str, items: Iterable[Dict],
+                             chunk_size: int = 1000) -> Iterator[bytes]:
+    """CST v2.0 additive: Stream ``{**head, key: [items...]}`` as compact JSON chunks"""
+    prefix = json.dumps(head, separators=(',', ':'), default=_json_default)[:-1]
+    yield (prefix + ("," if head else "") + json.dumps(key) + ":[").encode('utf-8')
+    batch: List[bytes] = []
+    first = True
+    for item in items:
+        batch.append(encode_token(item))
+        if len(batch) >= chunk_size:
+            yield (b"" if first else b",") + b",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]}"
+
+
+class MappedTokenList(collections.abc.MutableSequence):
+    """CST v2.0 additive: Token list backed by a memory-mapped checkpoint
+    
+    Archived tokens stay as encoded bytes (``blob`` sliced by ``offsets``)
+    and are decoded on access; new tokens are appended to an ordinary list.
+    Anything other than appending materializes the archive first.
+    """
+    
+    def __init__(self, blob, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.archived_count = len(offsets) - 1
+        self.tail: List[Dict] = []
+        self._materialized: Optional[List[Dict]] = None
+    
+    def _decode(self, i: int) -> Dict:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return json.loads(bytes(self.blob[start:end]))
+    
+    def _materialize(self) -> List[Dict]:
+        if self._materialized is None:
+            self._materialized = [self._decode(i) for i in range(self.archived_count)] + self.tail
+            self.tail = self._materialized
+        return self._materialized
+    
+    def __len__(self) -> int:
+        if self._materialized is not None:
+            return len(self._materialized)
+        return self.archived_count + len(self.tail)
+    
+    def __getitem__(self, index):
+        if self._materialized is not None:
+            return self._materialized[index]
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("token index out of range")
+        if index < self.archived_count:
+            return self._decode(index)
+        return self.tail[index - self.archived_count]
+    
+    def __iter__(self):
+        if self._materialized is not None:
+            yield from self._materialized
+            return
+        for i in range(self.archived_count):
+            yield self._decode(i)
+        yield from self.tail
+    
+    def __setitem__(self, index, value):
+        self._materialize()[index] = value
+    
+    def __delitem__(self, index):
+        del self._materialize()[index]
+    
+    def insert(self, index, value):
+        self._materialize().insert(index, value)
+    
+    def append(self, value):
+        if self._materialized is not None:
+            self._materialized.append(value)
+        else:
+            self.tail.append(value)
+
+
+class GrowableArray:
+    """CST v2.0 additive: Append-only NumPy array with amortized doubling
+    
+    ``view()`` returns a zero-copy view of the filled prefix; a view taken
+    earlier stays valid (it keeps the old buffer) after later appends.
+    """
+    
+    def __init__(self, dtype=np.int64, capacity: int = 64):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+    
+    @classmethod
+    def adopt(cls, values: np.ndarray) -> 'GrowableArray':
+        """Use ``values`` (e.g. a read-only memory map) as the filled prefix
+        
+        Zero-copy until the first append, which moves into a fresh buffer.
+        """
+        grown = cls(values.dtype)
+        if len(values) > 0:
+            grown._data = values
+            grown._size = len(values)
+        return grown
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, value):
+        if self._size == len(self._data):
+            grown = np.empty(2 * len(self._data), dtype=self._data.dtype)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = value
+        self._size += 1
+    
+    def extend(self, values):
+        if len(values) == 0:
+            return
+        end = self._size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+    
+    def view(self) -> np.ndarray:
+        return self._data[:self._size]
+
+
+class TokenView(collections.abc.Sequence):
+    """CST v2.0 additive: Lazy view of tokens at the given stream positions"""
+    
+    def __init__(self, tokens, positions: np.ndarray):
+        self.tokens = tokens
+        self.positions = positions
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TokenView(self.tokens, self.positions[index])
+        return self.tokens[int(self.positions[index])]
+    
+    def __iter__(self):
+        tokens = self.tokens
+        for pos in self.positions.tolist():
+            yield tokens[pos]
 
 
 class TokenStream:
-    """CST v2.0 additive: Token stream with rolling window rate calculation"""
+    """CST v2.0 additive: Token stream with rolling window rate calculation
+    
+    Secondary indexes (per type, per particleId, and by timestamp) are
+    maintained on insert and back the query API (``query``, ``by_type``,
+    ``by_particle``, ``in_time_range``, ``recent``). Tokens added by other
+    means (e.g. assigning ``tokens``) are indexed on the next query; a
+    restored checkpoint brings its indexes along (``load_checkpoint_state``).
+    """
     
     def __init__(self, window_size: float = 2.0):
         self.tokens: List[Dict] = []
@@ -116,13 +687,216 @@ class TokenStream:
         self.window_size: float = window_size  # seconds
         self.last_window_counts: collections.deque = collections.deque()
         self.max_tokens_display: int = 200
+        self.keep_encoded: bool = False  # see track_encoding
+        self._reset_indexes()
+    
+    def _reset_indexes(self):
+        self._indexed_tokens = self.tokens
+        self._by_type: Dict[str, GrowableArray] = {}
+        self._by_particle: Dict[str, GrowableArray] = {}
+        self._timestamps = GrowableArray(np.float64)
+        self._time_sorted: bool = True  # timestamps non-decreasing in insertion order
+        self._time_order: Optional[np.ndarray] = None  # argsort cache when not sorted
+        # encode_token bytes of every token, sliced by offsets (only while keep_encoded)
+        self._encoded: Optional[GrowableArray] = None
+        self._encoded_offsets: Optional[GrowableArray] = None
+        if self.keep_encoded:
+            self._encoded = GrowableArray(np.uint8, 4096)
+            self._encoded_offsets = GrowableArray()
+            self._encoded_offsets.append(0)
+    
+    def _encoded_count(self) -> int:
+        return len(self._encoded_offsets) - 1 if self._encoded is not None else 0
+    
+    def _encode_tokens(self, tokens: List[Dict]):
+        """Append the encodings of tokens at the next stream positions"""
+        chunks = [encode_token(token) for token in tokens]
+        ends = np.cumsum([len(chunk) for chunk in chunks]) + len(self._encoded)
+        self._encoded.extend(np.frombuffer(b"".join(chunks), dtype=np.uint8))
+        self._encoded_offsets.extend(ends)
+    
+    def _index_token(self, pos: int, token: Dict):
+        token_type = token.get("type")
+        if token_type not in self._by_type:
+            self._by_type[token_type] = GrowableArray()
+        self._by_type[token_type].append(pos)
+        particle_id = token.get("particleId")
+        if particle_id is not None:
+            if particle_id not in self._by_particle:
+                self._by_particle[particle_id] = GrowableArray()
+            self._by_particle[particle_id].append(pos)
+        ts = token.get("timestamp")
+        ts = float(ts) if ts is not None else np.nan
+        n = len(self._timestamps)
+        if n > 0 and self._time_sorted and not ts >= self._timestamps.view()[n - 1]:
+            self._time_sorted = False
+        self._timestamps.append(ts)
+        self._time_order = None
+    
+    def _index_tokens(self, start: int, tokens: List[Dict]):
+        """Index tokens appended at positions start, start + 1, ... in one pass"""
+        by_type: Dict[str, List[int]] = {}
+        by_particle: Dict[str, List[int]] = {}
+        ts = np.empty(len(tokens), dtype=np.float64)
+        for k, token in enumerate(tokens):
+            by_type.setdefault(token.get("type"), []).append(start + k)
+            particle_id = token.get("particleId")
+            if particle_id is not None:
+                by_particle.setdefault(particle_id, []).append(start + k)
+            t = token.get("timestamp")
+            ts[k] = float(t) if t is not None else np.nan
+        for index, groups in ((self._by_type, by_type), (self._by_particle, by_particle)):
+            for key, positions in groups.items():
+                if key not in index:
+                    index[key] = GrowableArray()
+                index[key].extend(positions)
+        n = len(self._timestamps)
+        if self._time_sorted and len(ts) > 0:
+            # Same test as _index_token, NaN included: every step must be >=
+            steps_ok = np.all(ts[1:] >= ts[:-1])
+            if not steps_ok or (n > 0 and not ts[0] >= self._timestamps.view()[n - 1]):
+                self._time_sorted = False
+        self._timestamps.extend(ts)
+        self._time_order = None
+    
+    def _sync_indexes(self):
+        """Index (and encode) any tokens not yet covered, or rebuild if tokens was replaced"""
+        tokens = self.tokens
+        if self._indexed_tokens is not tokens:
+            self._reset_indexes()
+        for pos in range(len(self._timestamps), len(tokens)):
+            self._index_token(pos, tokens[pos])
+        if self._encoded is not None and self._encoded_count() < len(tokens):
+            self._encode_tokens([tokens[pos] for pos in range(self._encoded_count(), len(tokens))])
+    
+    def track_encoding(self):
+        """CST v2.0 additive: Keep every token's encode_token bytes, updated on insert
+        
+        Checkpoints copy this buffer as-is, so the writer never re-encodes
+        the stream. Tokens already in the stream are encoded here, once.
+        """
+        if not self.keep_encoded:
+            self.keep_encoded = True
+            self._encoded = GrowableArray(np.uint8, 4096)
+            self._encoded_offsets = GrowableArray()
+            self._encoded_offsets.append(0)
+        self._sync_indexes()
     
     def add_token(self, token: Dict):
         """Add token and record timestamp"""
-        self.tokens.append(token)
+        tokens = self.tokens
+        tokens.append(token)
+        if self._indexed_tokens is tokens and len(self._timestamps) == len(tokens) - 1:
+            self._index_token(len(tokens) - 1, token)
+            if self._encoded is not None and self._encoded_count() == len(tokens) - 1:
+                self._encode_tokens([token])
         self.last_window_counts.append(time.time())
         self._clean_old_timestamps()
     
+    def add_tokens(self, tokens: List[Dict]):
+        """CST v2.0 additive: Append many tokens with one bulk index update"""
+        if not tokens:
+            return
+        stream = self.tokens
+        start = len(stream)
+        stream.extend(tokens)
+        if self._indexed_tokens is stream and len(self._timestamps) == start:
+            self._index_tokens(start, tokens)
+            if self._encoded is not None and self._encoded_count() == start:
+                self._encode_tokens(tokens)
+        self.last_window_counts.extend([time.time()] * len(tokens))
+        self._clean_old_timestamps()
+    
+    def _time_range_positions(self, t_start: Optional[float], t_end: Optional[float]) -> np.ndarray:
+        """Positions with t_start <= timestamp <= t_end, in time order"""
+        ts = self._timestamps.view()
+        lo_val = -np.inf if t_start is None else t_start
+        hi_val = np.inf if t_end is None else t_end
+        if self._time_sorted:
+            lo = int(np.searchsorted(ts, lo_val, side='left'))
+            hi = int(np.searchsorted(ts, hi_val, side='right'))
+            return np.arange(lo, hi, dtype=np.int64)
+        if self._time_order is None:
+            self._time_order = np.argsort(ts, kind='stable')  # NaNs sort last
+        sorted_ts = ts[self._time_order]
+        lo = int(np.searchsorted(sorted_ts, lo_val, side='left'))
+        hi = int(np.searchsorted(sorted_ts, hi_val, side='right'))
+        return self._time_order[lo:hi]
+    
+    def query_positions(self, token_type: Optional[str] = None, particle_id: Optional[str] = None,
+                        t_start: Optional[float] = None, t_end: Optional[float] = None) -> np.ndarray:
+        """CST v2.0 additive: Stream positions of matching tokens, in insertion order
+        
+        Single-key lookups (and type/particle + time range while timestamps
+        are in insertion order) return zero-copy views of the index arrays.
+        """
+        self._sync_indexes()
+        empty = np.empty(0, dtype=np.int64)
+        has_time = t_start is not None or t_end is not None
+        keyed = []  # increasing position arrays, one per requested key
+        if token_type is not None:
+            arr = self._by_type.get(token_type)
+            keyed.append(arr.view() if arr is not None else empty)
+        if particle_id is not None:
+            arr = self._by_particle.get(particle_id)
+            keyed.append(arr.view() if arr is not None else empty)
+        
+        if not keyed:
+            if has_time:
+                positions = self._time_range_positions(t_start, t_end)
+                return positions if self._time_sorted else np.sort(positions)
+            return np.arange(len(self._timestamps), dtype=np.int64)
+        
+        if any(len(arr) == 0 for arr in keyed):
+            return empty
+        if has_time and self._time_sorted:
+            # Time order is position order, so the window [lo, hi) is a contiguous slice of each key
+            ts = self._timestamps.view()
+            lo = np.searchsorted(ts, -np.inf if t_start is None else t_start, side='left')
+            hi = np.searchsorted(ts, np.inf if t_end is None else t_end, side='right')
+            keyed = [arr[np.searchsorted(arr, lo, side='left'):np.searchsorted(arr, hi, side='left')]
+                     for arr in keyed]
+        result = keyed[0]
+        for arr in keyed[1:]:
+            result = np.intersect1d(result, arr, assume_unique=True)
+        if has_time and not self._time_sorted:
+            result = np.intersect1d(result, self._time_range_positions(t_start, t_end),
+                                    assume_unique=True)
+        return result
+    
+    def query(self, token_type: Optional[str] = None, particle_id: Optional[str] = None,
+              t_start: Optional[float] = None, t_end: Optional[float] = None) -> TokenView:
+        """CST v2.0 additive: Tokens by type, particle and/or time range (lazy view)"""
+        positions = self.query_positions(token_type, particle_id, t_start, t_end)
+        return TokenView(self.tokens, positions)
+    
+    def by_type(self, token_type: str) -> TokenView:
+        """CST v2.0 additive: All tokens of one type, in insertion order"""
+        return self.query(token_type=token_type)
+    
+    def by_particle(self, particle_id: str) -> TokenView:
+        """CST v2.0 additive: All tokens referencing one particleId"""
+        return self.query(particle_id=particle_id)
+    
+    def in_time_range(self, t_start: Optional[float], t_end: Optional[float],
+                      token_type: Optional[str] = None) -> TokenView:
+        """CST v2.0 additive: Tokens with t_start <= timestamp <= t_end"""
+        return self.query(token_type=token_type, t_start=t_start, t_end=t_end)
+    
+    def recent(self, n: int, token_type: Optional[str] = None) -> TokenView:
+        """CST v2.0 additive: Last n tokens (optionally of one type), oldest first"""
+        if n <= 0:
+            return TokenView(self.tokens, np.empty(0, dtype=np.int64))
+        if token_type is None:
+            total = len(self.tokens)
+            return TokenView(self.tokens, np.arange(max(0, total - n), total, dtype=np.int64))
+        return TokenView(self.tokens, self.query_positions(token_type=token_type)[-n:])
+    
+    def token_types(self) -> List[str]:
+        """CST v2.0 additive: Token types seen so far"""
+        self._sync_indexes()
+        return [t for t in self._by_type if t is not None]
+    
     def _clean_old_timestamps(self):
         """Remove timestamps outside the window"""
         cutoff = time.time() - self.window_size
@@ -144,24 +918,1565 @@ class TokenStream:
         if window_span > 0:
             self.count_per_sec = len(self.last_window_counts) / window_span
         else:
-            self.count_per_sec = len(self.last_window_counts)
-        
-        return self.count_per_sec
+            self.count_per_sec = len(self.last_window_counts)
+        
+        return self.count_per_sec
+    
+    def iter_export_chunks(self, metadata: Optional[Dict] = None, chunk_size: int = 1000,
+                           count: Optional[int] = None) -> Iterator[bytes]:
+        """CST v2.0 additive: Stream the export document as JSON byte chunks
+        
+        ``count`` bounds the export to the first ``count`` tokens, so a
+        stream that keeps growing exports a consistent prefix.
+        """
+        tokens = self.tokens
+        n = len(tokens) if count is None else min(count, len(tokens))
+        items = (tokens[i] for i in range(n))
+        return iter_json_array_document({"metadata": metadata or {}}, "tokens", items, chunk_size)
+    
+    def export_json(self, path: str, metadata: Optional[Dict] = None,
+                    compression: str = "none"):
+        """Export tokens to JSON with metadata (streamed, optionally compressed)"""
+        with open(path, 'wb') as f:
+            for chunk in compress_chunks(self.iter_export_chunks(metadata), compression):
+                f.write(chunk)
+    
+    def clear(self):
+        """Clear all tokens"""
+        self.tokens = []
+        self.last_window_counts.clear()
+        self.count_per_sec = 0.0
+        self._reset_indexes()
+    
+    # --- checkpoint ---
+    
+    def checkpoint_state(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Index metadata and arrays (encoded tokens, positions, timestamps)
+        
+        Turns on ``track_encoding``, so after the first checkpoint only
+        tokens added since are encoded, on insert. Array views stay valid:
+        appends never rewrite the filled prefix.
+        """
+        self.track_encoding()
+        meta = {
+            "tokenCount": len(self.tokens),
+            "types": list(self._by_type),
+            "particleCount": len(self._by_particle),
+            "timeSorted": self._time_sorted
+        }
+        arrays = {
+            "tokenBlob": self._encoded.view(),
+            "tokenOffsets": self._encoded_offsets.view(),
+            "tokenTimestamps": self._timestamps.view(),
+            "tokenParticleIds": _pack_strings(list(self._by_particle))
+        }
+        for name, index in (("tokenType", self._by_type), ("tokenParticle", self._by_particle)):
+            positions = [arr.view() for arr in index.values()]
+            offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+            np.cumsum([len(arr) for arr in positions], out=offsets[1:])
+            arrays[name + "Offsets"] = offsets
+            arrays[name + "Positions"] = (np.concatenate(positions) if positions
+                                          else np.empty(0, dtype=np.int64))
+        return meta, arrays
+    
+    def load_checkpoint_state(self, meta: Optional[Dict], arrays: Dict[str, np.ndarray]):
+        """Resume from ``checkpoint_state`` output without re-indexing
+        
+        Tokens and index arrays stay in the (memory-mapped) ``arrays`` until
+        appended to. Without ``meta`` (older checkpoints) only the encoded
+        tokens are restored and the indexes rebuild on the next query.
+        """
+        self.clear()
+        self.tokens = MappedTokenList(arrays["tokenBlob"], arrays["tokenOffsets"])
+        self.keep_encoded = True
+        self._reset_indexes()
+        self._encoded = GrowableArray.adopt(arrays["tokenBlob"])
+        self._encoded_offsets = GrowableArray.adopt(arrays["tokenOffsets"])
+        if meta is None:
+            return
+        particle_ids = _unpack_strings(arrays["tokenParticleIds"], meta["particleCount"])
+        for name, index, keys in (("tokenType", self._by_type, meta["types"]),
+                                  ("tokenParticle", self._by_particle, particle_ids)):
+            offsets = arrays[name + "Offsets"].tolist()
+            positions = arrays[name + "Positions"]
+            for key, start, end in zip(keys, offsets[:-1], offsets[1:]):
+                index[key] = GrowableArray.adopt(positions[start:end])
+        self._timestamps = GrowableArray.adopt(arrays["tokenTimestamps"])
+        self._time_sorted = meta["timeSorted"]
+
+
+# CST v2.0 additive: Archive record kinds for lossless token reconstruction
+_KIND_VERBATIM, _KIND_AUDIO_FRAME, _KIND_HARMONIC, _KIND_FREQ_UPDATE = 0, 1, 2, 3
+_AUDIO_FRAME_KEYS = ("id", "type", "timestamp", "rmsEnergy", "spectralCentroid", "frequencyCount",
+                     "topFrequencies", "phiHarmonics", "seed")
+_HARMONIC_KEYS = ("id", "type", "timestamp", "harmonic", "magnitude", "harmonicIndex", "phiRatio")
+_FREQ_UPDATE_KEYS = ("id", "type", "particleId", "timestamp", "frequency", "magnitude")
+
+
+def delta_encode(previous: Optional[Dict], current: Dict, fields: Tuple[str, ...]) -> Dict:
+    """CST v2.0 additive: Changed numeric fields as exact deltas
+    
+    Unchanged fields are omitted. A field goes in ``d`` as ``current - previous``
+    only if adding it back reproduces ``current`` bit-for-bit; otherwise the
+    absolute value goes in ``v``.
+    """
+    deltas, values = {}, {}
+    for name in fields:
+        value = current[name]
+        prev = previous.get(name) if previous is not None else None
+        if prev is not None and value == prev:
+            continue
+        if prev is not None and prev + (value - prev) == value:
+            deltas[name] = value - prev
+        else:
+            values[name] = value
+    encoded = {}
+    if deltas:
+        encoded["d"] = deltas
+    if values:
+        encoded["v"] = values
+    return encoded
+
+
+def delta_decode(previous: Optional[Dict], encoded: Dict) -> Dict:
+    """CST v2.0 additive: Inverse of delta_encode"""
+    state = dict(previous) if previous is not None else {}
+    for name, delta in encoded.get("d", {}).items():
+        state[name] = state[name] + delta
+    state.update(encoded.get("v", {}))
+    return state
+
+
+class TokenCoalescer:
+    """CST v2.0 additive: Coalesce redundant frame-to-frame tokens
+    
+    Full tokens go in; compact tokens come out:
+    - ``audio_frame`` -> ``audio_frame_delta`` (numeric fields delta-encoded)
+    - a frame's ``phi_harmonic`` tokens -> one ``phi_harmonic_set`` token, only
+      when the set moved beyond ``harmonicTolerance``
+    - per-particle ``frequency_update`` tokens merge over ``frequencyWindow``
+      seconds (latest values plus a ``merged`` count)
+    - anything else passes through unchanged
+    
+    Every input token is also appended to a columnar binary archive, from
+    which ``expand()`` reconstructs the full stream losslessly. Tokens that
+    don't match a known schema exactly are archived verbatim.
+    """
+    
+    AUDIO_DELTA_FIELDS = ("rmsEnergy", "spectralCentroid", "frequencyCount")
+    
+    def __init__(self, config: Optional[CoalescingConfig] = None):
+        self.config = config if config is not None else CoalescingConfig()
+        self.tokens_in: int = 0
+        self.tokens_out: int = 0
+        # Live coalescing state
+        self._last_audio_frame: Optional[Dict] = None
+        self._harmonic_batch: List[Dict] = []
+        self._last_harmonic_set: Optional[List[float]] = None
+        self._pending_updates: Dict[str, Dict] = {}
+        # Archive: one kind per token, plus flat float/int columns in schema order
+        self._kinds = GrowableArray(np.uint8)
+        self._floats = GrowableArray(np.float64)
+        self._ints = GrowableArray(np.int64)
+        self._verbatim: List[Dict] = []
+        self._particle_ids: List[str] = []
+        self._particle_index: Dict[str, int] = {}
+    
+    # --- checkpoint ---
+    
+    def checkpoint_state(self) -> Tuple[Dict, Dict[str, np.ndarray]]:
+        """Live state (JSON-safe) and archive columns, detached from later adds"""
+        meta = {
+            "tokensIn": self.tokens_in,
+            "tokensOut": self.tokens_out,
+            "lastAudioFrame": self._last_audio_frame,
+            "harmonicBatch": list(self._harmonic_batch),
+            "lastHarmonicSet": self._last_harmonic_set,
+            "pendingUpdates": {pid: dict(p) for pid, p in self._pending_updates.items()},
+            "verbatim": list(self._verbatim),
+            "particleIds": list(self._particle_ids)
+        }
+        # Archive views stay valid: appends never rewrite the filled prefix
+        arrays = {
+            "coalescerKinds": self._kinds.view(),
+            "coalescerFloats": self._floats.view(),
+            "coalescerInts": self._ints.view()
+        }
+        return meta, arrays
+    
+    def load_checkpoint_state(self, meta: Dict, arrays: Dict[str, np.ndarray]):
+        """Resume from ``checkpoint_state`` output"""
+        self.tokens_in = meta["tokensIn"]
+        self.tokens_out = meta["tokensOut"]
+        self._last_audio_frame = meta["lastAudioFrame"]
+        self._harmonic_batch = meta["harmonicBatch"]
+        self._last_harmonic_set = meta["lastHarmonicSet"]
+        self._pending_updates = meta["pendingUpdates"]
+        self._verbatim = meta["verbatim"]
+        self._particle_ids = meta["particleIds"]
+        self._particle_index = {pid: k for k, pid in enumerate(self._particle_ids)}
+        self._kinds = GrowableArray(np.uint8)
+        self._kinds.extend(arrays["coalescerKinds"])
+        self._floats = GrowableArray(np.float64)
+        self._floats.extend(arrays["coalescerFloats"])
+        self._ints = GrowableArray(np.int64)
+        self._ints.extend(arrays["coalescerInts"])
+    
+    # --- archive ---
+    
+    def _archive(self, token: Dict):
+        kind = self._classify(token)
+        self._kinds.append(kind)
+        if kind == _KIND_AUDIO_FRAME:
+            for name in ("timestamp", "rmsEnergy", "spectralCentroid"):
+                self._floats.append(token[name])
+            top, harmonics, seed = token["topFrequencies"], token["phiHarmonics"], token["seed"]
+            for value in (token["frequencyCount"], len(top), len(harmonics),
+                          0 if seed is None else 1, 0 if seed is None else seed):
+                self._ints.append(value)
+            for f in top:
+                self._floats.append(f["frequency"])
+                self._floats.append(f["magnitude"])
+            for h in harmonics:
+                self._floats.append(h)
+        elif kind == _KIND_HARMONIC:
+            for name in ("timestamp", "harmonic", "magnitude"):
+                self._floats.append(token[name])
+            self._ints.append(token["harmonicIndex"])
+        elif kind == _KIND_FREQ_UPDATE:
+            pid = token["particleId"]
+            if pid not in self._particle_index:
+                self._particle_index[pid] = len(self._particle_ids)
+                self._particle_ids.append(pid)
+            self._ints.append(self._particle_index[pid])
+            for name in ("timestamp", "frequency", "magnitude"):
+                self._floats.append(token[name])
+        else:
+            self._verbatim.append(token)
+    
+    @staticmethod
+    def _classify(token: Dict) -> int:
+        """Archive kind whose schema reproduces ``token`` exactly"""
+        keys = tuple(token.keys())
+        token_type = token.get("type")
+        ts = token.get("timestamp")
+        if type(ts) is not float:
+            return _KIND_VERBATIM
+        if token_type == "audio_frame" and keys == _AUDIO_FRAME_KEYS:
+            top = token["topFrequencies"]
+            ok = (token["id"] == f"audio_frame_{int(ts * 1000)}"
+                  and type(token["rmsEnergy"]) is float
+                  and type(token["spectralCentroid"]) is float
+                  and type(token["frequencyCount"]) is int
+                  and (token["seed"] is None or type(token["seed"]) is int)
+                  and type(top) is list and type(token["phiHarmonics"]) is list
+                  and all(type(f) is dict and tuple(f.keys()) == ("frequency", "magnitude")
+                          and type(f["frequency"]) is float and type(f["magnitude"]) is float
+                          for f in top)
+                  and all(type(h) is float for h in token["phiHarmonics"]))
+            return _KIND_AUDIO_FRAME if ok else _KIND_VERBATIM
+        if token_type == "phi_harmonic" and keys == _HARMONIC_KEYS:
+            idx = token["harmonicIndex"]
+            ok = (type(idx) is int and token["id"] == f"harmonic_{int(ts * 1000)}_{idx}"
+                  and type(token["harmonic"]) is float and type(token["magnitude"]) is float
+                  and token["phiRatio"] == phi_ratio(idx))
+            return _KIND_HARMONIC if ok else _KIND_VERBATIM
+        if token_type == "frequency_update" and keys == _FREQ_UPDATE_KEYS:
+            pid = token["particleId"]
+            ok = (type(pid) is str and token["id"] == f"freq_update_{int(ts * 1000)}_{pid}"
+                  and type(token["frequency"]) is float and type(token["magnitude"]) is float)
+            return _KIND_FREQ_UPDATE if ok else _KIND_VERBATIM
+        return _KIND_VERBATIM
+    
+    def expand(self) -> List[Dict]:
+        """Reconstruct every token that went through the coalescer, in order"""
+        floats = self._floats.view().tolist()
+        ints = self._ints.view().tolist()
+        fi = ii = vi = 0
+        out: List[Dict] = []
+        for kind in self._kinds.view().tolist():
+            if kind == _KIND_AUDIO_FRAME:
+                ts, rms, centroid = floats[fi:fi + 3]
+                fi += 3
+                freq_count, n_top, n_harm, has_seed, seed = ints[ii:ii + 5]
+                ii += 5
+                top = [{"frequency": floats[fi + 2 * k], "magnitude": floats[fi + 2 * k + 1]}
+                       for k in range(n_top)]
+                fi += 2 * n_top
+                harmonics = floats[fi:fi + n_harm]
+                fi += n_harm
+                out.append({
+                    "id": f"audio_frame_{int(ts * 1000)}",
+                    "type": "audio_frame",
+                    "timestamp": ts,
+                    "rmsEnergy": rms,
+                    "spectralCentroid": centroid,
+                    "frequencyCount": freq_count,
+                    "topFrequencies": top,
+                    "phiHarmonics": harmonics,
+                    "seed": seed if has_seed else None
+                })
+            elif kind == _KIND_HARMONIC:
+                ts, harmonic, magnitude = floats[fi:fi + 3]
+                fi += 3
+                idx = ints[ii]
+                ii += 1
+                out.append({
+                    "id": f"harmonic_{int(ts * 1000)}_{idx}",
+                    "type": "phi_harmonic",
+                    "timestamp": ts,
+                    "harmonic": harmonic,
+                    "magnitude": magnitude,
+                    "harmonicIndex": idx,
+                    "phiRatio": phi_ratio(idx)
+                })
+            elif kind == _KIND_FREQ_UPDATE:
+                pid = self._particle_ids[ints[ii]]
+                ii += 1
+                ts, frequency, magnitude = floats[fi:fi + 3]
+                fi += 3
+                out.append({
+                    "id": f"freq_update_{int(ts * 1000)}_{pid}",
+                    "type": "frequency_update",
+                    "particleId": pid,
+                    "timestamp": ts,
+                    "frequency": frequency,
+                    "magnitude": magnitude
+                })
+            else:
+                out.append(self._verbatim[vi])
+                vi += 1
+        return out
+    
+    # --- live coalescing ---
+    
+    def add(self, token: Dict) -> List[Dict]:
+        """Archive a full token; return the compact tokens to emit now"""
+        self.tokens_in += 1
+        self._archive(token)
+        out: List[Dict] = []
+        token_type = token.get("type")
+        if token_type != "phi_harmonic" and self._harmonic_batch:
+            out.extend(self._flush_harmonics())
+        
+        if token_type == "audio_frame":
+            compact = {"type": "audio_frame_delta", "timestamp": token["timestamp"]}
+            compact.update(delta_encode(self._last_audio_frame, token, self.AUDIO_DELTA_FIELDS))
+            self._last_audio_frame = token
+            out.append(compact)
+        elif token_type == "phi_harmonic":
+            self._harmonic_batch.append(token)
+        elif token_type == "frequency_update":
+            out.extend(self._merge_update(token))
+        else:
+            out.append(token)
+        self.tokens_out += len(out)
+        return out
+    
+    def _flush_harmonics(self) -> List[Dict]:
+        batch, self._harmonic_batch = self._harmonic_batch, []
+        harmonics = [t["harmonic"] for t in batch]
+        last = self._last_harmonic_set
+        tol = self.config.harmonicTolerance
+        if last is not None and len(last) == len(harmonics) and all(
+                abs(h - p) <= tol * abs(p) for h, p in zip(harmonics, last)):
+            return []
+        self._last_harmonic_set = harmonics
+        return [{
+            "type": "phi_harmonic_set",
+            "timestamp": batch[0]["timestamp"],
+            "harmonics": harmonics,
+            "magnitudes": [t["magnitude"] for t in batch]
+        }]
+    
+    def _merge_update(self, token: Dict) -> List[Dict]:
+        pid = token["particleId"]
+        pending = self._pending_updates.get(pid)
+        out = []
+        if pending is not None and token["timestamp"] - pending["windowStart"] >= self.config.frequencyWindow:
+            out.append(self._merged_token(pending))
+            pending = None
+        if pending is None:
+            pending = {"windowStart": token["timestamp"], "count": 0}
+            self._pending_updates[pid] = pending
+        pending["latest"] = token
+        pending["count"] += 1
+        return out
+    
+    @staticmethod
+    def _merged_token(pending: Dict) -> Dict:
+        latest = pending["latest"]
+        return {
+            "type": "frequency_update",
+            "particleId": latest["particleId"],
+            "timestamp": latest["timestamp"],
+            "frequency": latest["frequency"],
+            "magnitude": latest["magnitude"],
+            "merged": pending["count"]
+        }
+    
+    def expire(self, now: float) -> List[Dict]:
+        """Close merge windows at least ``frequencyWindow`` old at frame time ``now``
+        
+        A window otherwise only closes on its particle's next update, so a
+        particle that goes quiet would hold its last value back until flush.
+        """
+        window = self.config.frequencyWindow
+        expired = [pid for pid, pending in self._pending_updates.items()
+                   if now - pending["windowStart"] >= window]
+        out = [self._merged_token(self._pending_updates.pop(pid)) for pid in expired]
+        self.tokens_out += len(out)
+        return out
+    
+    def flush(self) -> List[Dict]:
+        """Emit everything still held back (harmonic batch, open merge windows)"""
+        out = self._flush_harmonics() if self._harmonic_batch else []
+        out.extend(self._merged_token(p) for p in self._pending_updates.values())
+        self._pending_updates = {}
+        self.tokens_out += len(out)
+        return out
+    
+    def stats(self) -> Dict:
+        """Token counts in/out and archive size"""
+        return {
+            "tokensIn": self.tokens_in,
+            "tokensOut": self.tokens_out,
+            "archiveBytes": (self._kinds.view().nbytes + self._floats.view().nbytes +
+                             self._ints.view().nbytes),
+            "verbatimTokens": len(self._verbatim)
+        }
+
+
+# CST v2.0 additive: Timed phases of Simulator.tick() (in execution order)
+TICK_PHASES = ("audio", "neighbors", "gravity", "darkMatter", "synaptic", "adaptive",
+               "phase", "integration", "energy", "psi", "adaptiveDt", "clusters")
+
+
+class TickProfiler:
+    """CST v2.0 additive: Lightweight per-phase tick profiler
+    
+    Tick count and total tick time are always counted. Per-phase timers
+    only run when ``detailed`` is True; otherwise ``mark``/``lap`` return
+    immediately, so the disabled cost is one attribute check per phase.
+    """
+    
+    def __init__(self, detailed: bool = False):
+        self.detailed = detailed
+        self.ticks: int = 0
+        self.total_seconds: float = 0.0
+        self.last_tick_seconds: float = 0.0
+        self.phase_seconds: Dict[str, float] = {name: 0.0 for name in TICK_PHASES}
+        self.phase_calls: Dict[str, int] = {name: 0 for name in TICK_PHASES}
+        self.phase_last: Dict[str, float] = {name: 0.0 for name in TICK_PHASES}
+    
+    def mark(self) -> float:
+        """Start timing the next phase (0.0 when detailed mode is off)"""
+        return time.perf_counter() if self.detailed else 0.0
+    
+    def lap(self, phase: str, start: float) -> float:
+        """Charge time since ``start`` to ``phase`` and start the next phase"""
+        if not self.detailed:
+            return 0.0
+        now = time.perf_counter()
+        self.add(phase, now - start)
+        return now
+    
+    def add(self, phase: str, elapsed: float):
+        """Charge ``elapsed`` seconds measured elsewhere to ``phase``"""
+        self.phase_seconds[phase] += elapsed
+        self.phase_calls[phase] += 1
+        self.phase_last[phase] = elapsed
+    
+    def record_tick(self, elapsed: float):
+        """Always-on tick counter"""
+        self.ticks += 1
+        self.total_seconds += elapsed
+        self.last_tick_seconds = elapsed
+    
+    def stats(self) -> Dict:
+        """Structured profiler statistics (seconds)"""
+        phased_total = sum(self.phase_seconds.values())
+        phases = {
+            name: {
+                "calls": self.phase_calls[name],
+                "totalSeconds": self.phase_seconds[name],
+                "meanSeconds": (self.phase_seconds[name] / self.phase_calls[name]
+                                if self.phase_calls[name] > 0 else 0.0),
+                "lastSeconds": self.phase_last[name],
+                "fraction": (self.phase_seconds[name] / phased_total
+                             if phased_total > 0 else 0.0)
+            }
+            for name in TICK_PHASES
+        }
+        return {
+            "detailed": self.detailed,
+            "ticks": self.ticks,
+            "totalSeconds": self.total_seconds,
+            "meanTickSeconds": self.total_seconds / self.ticks if self.ticks > 0 else 0.0,
+            "lastTickSeconds": self.last_tick_seconds,
+            "phases": phases
+        }
+    
+    def reset(self):
+        """Clear all counters"""
+        self.ticks = 0
+        self.total_seconds = 0.0
+        self.last_tick_seconds = 0.0
+        for name in TICK_PHASES:
+            self.phase_seconds[name] = 0.0
+            self.phase_calls[name] = 0
+            self.phase_last[name] = 0.0
+
+
+class MetricsExporter:
+    """CST v2.0 additive: Prometheus text-format exporter for a Simulator
+    
+    Serves ``/metrics`` from a local port and/or periodically writes the
+    same text to a file (atomically, for node_exporter's textfile collector).
+    """
+    
+    def __init__(self, simulator: 'Simulator'):
+        self.simulator = simulator
+        self._server = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._file_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+    
+    def render(self) -> str:
+        """Current metrics in Prometheus text exposition format"""
+        return self.simulator.prometheus_metrics()
+    
+    def serve(self, port: int = 9108, host: str = "127.0.0.1"):
+        """Serve /metrics over HTTP from a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        exporter = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server_thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._server_thread.start()
+        return self._server.server_address
+    
+    def write_file(self, path: str):
+        """Write current metrics to ``path`` atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+    
+    def start_file_writer(self, path: str, interval: float = 5.0):
+        """Periodically write metrics to ``path`` from a daemon thread"""
+        self._stop_file_writer()
+        self._stop_event.clear()
+        
+        def _loop():
+            while not self._stop_event.wait(interval):
+                self.write_file(path)
+        
+        self.write_file(path)
+        self._file_thread = threading.Thread(target=_loop, daemon=True)
+        self._file_thread.start()
+    
+    def _stop_file_writer(self):
+        self._stop_event.set()
+        if self._file_thread is not None:
+            self._file_thread.join(timeout=2.0)
+            self._file_thread = None
+    
+    def stop(self):
+        """Stop the HTTP server and file writer"""
+        self._stop_file_writer()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# CST v2.0 additive: Shared-memory state segment layout. A 128-byte header
+# (magic, seqlock counter, frame number, capacity, count, stale flag) and a
+# float64 diagnostics block are followed by one float64 column of
+# ``capacity`` entries per SHARED_STATE_COLUMNS name.
+SHARED_STATE_MAGIC = b"CSTSHM01"
+SHARED_STATE_COLUMNS = ("x", "y", "z", "vx", "vy", "vz", "theta", "omega", "x12", "Ec")
+SHARED_STATE_DIAGNOSTICS = ("dt", "syncR", "meanTheta", "totalEnergy", "tokenCount", "publishedAt")
+_SHM_SEQ, _SHM_FRAME, _SHM_CAPACITY, _SHM_COUNT, _SHM_STALE = 8, 16, 24, 28, 32
+_SHM_DIAGNOSTICS_OFFSET = 64
+_SHM_COLUMNS_OFFSET = 128
+
+
+def _attach_shared_memory(name: str):
+    """Attach to an existing segment without letting this process's resource
+    tracker unlink it at exit (the publisher owns the segment)"""
+    from multiprocessing import shared_memory
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _close_shared_memory(shm):
+    try:
+        shm.close()
+    except BufferError:
+        pass  # caller still holds zero-copy views; the mapping goes when they do
+
+
+class _SharedStateViews:
+    """numpy views of the header fields, diagnostics and columns of a segment"""
+    
+    def __init__(self, buf, capacity: int):
+        self.seq = np.ndarray((1,), np.uint64, buf, _SHM_SEQ)
+        self.frame = np.ndarray((1,), np.uint64, buf, _SHM_FRAME)
+        self.capacity = np.ndarray((1,), np.uint32, buf, _SHM_CAPACITY)
+        self.count = np.ndarray((1,), np.uint32, buf, _SHM_COUNT)
+        self.stale = np.ndarray((1,), np.uint32, buf, _SHM_STALE)
+        self.diagnostics = np.ndarray((len(SHARED_STATE_DIAGNOSTICS),), np.float64, buf,
+                                      _SHM_DIAGNOSTICS_OFFSET)
+        self.columns = np.ndarray((len(SHARED_STATE_COLUMNS), capacity), np.float64, buf,
+                                  _SHM_COLUMNS_OFFSET)
+
+
+def state_snapshot(sim: 'Simulator') -> Tuple[np.ndarray, Tuple[float, ...]]:
+    """CST v2.0 additive: N x SHARED_STATE_COLUMNS float64 particle state and
+    the SHARED_STATE_DIAGNOSTICS values, in one pass over the particles"""
+    state = np.array([(p.x, p.y, p.z, p.velocity[0], p.velocity[1], p.velocity[2],
+                       p.theta, p.omega, p.x12, p.Ec) for p in list(sim.particles)],
+                     dtype=np.float64).reshape(-1, len(SHARED_STATE_COLUMNS))
+    order = np.exp(1j * state[:, 6]).mean() if len(state) else 0j
+    diagnostics = (sim.timestep.dt, abs(order), float(np.angle(order)),
+                   float(state[:, 9].sum()), len(sim.token_stream.tokens), time.time())
+    return state, diagnostics
+
+
+class SharedStatePublisher:
+    """CST v2.0 additive: Publish particle state to shared memory each tick
+    
+    Writers bump the seqlock counter to odd, write, then bump it to even;
+    readers retry if the counter was odd or changed while they copied, so
+    the integrator never waits on a reader. If the particle count outgrows
+    the segment, it is marked stale and re-created under the same name with
+    twice the capacity; readers reattach on their next read.
+    """
+    
+    def __init__(self, simulator: 'Simulator', name: Optional[str] = None, capacity: int = 4096):
+        self.simulator = simulator
+        self.name = name if name is not None else f"cosmic_state_{os.getpid()}"
+        self.frames_published: int = 0
+        self._shm = None
+        self._views: Optional[_SharedStateViews] = None
+        self._create(max(1, capacity))
+    
+    @staticmethod
+    def segment_size(capacity: int) -> int:
+        return _SHM_COLUMNS_OFFSET + len(SHARED_STATE_COLUMNS) * capacity * 8
+    
+    def _create(self, capacity: int):
+        from multiprocessing import shared_memory
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True,
+                                             size=self.segment_size(capacity))
+        except FileExistsError:
+            # Left over from a publisher that died without unlinking
+            stale = _attach_shared_memory(self.name)
+            stale.unlink()
+            stale.close()
+            shm = shared_memory.SharedMemory(name=self.name, create=True,
+                                             size=self.segment_size(capacity))
+        shm.buf[:8] = SHARED_STATE_MAGIC
+        self._shm = shm
+        self._views = _SharedStateViews(shm.buf, capacity)
+        self._views.capacity[0] = capacity
+    
+    def _retire(self, replacement_capacity: Optional[int] = None):
+        """Unlink the current segment, create its replacement (if any), then
+        mark the old one stale so readers only ever reattach to a live name"""
+        views, shm = self._views, self._shm
+        self._views = self._shm = None
+        shm.unlink()
+        if replacement_capacity is not None:
+            frame = int(views.frame[0])
+            self._create(replacement_capacity)
+            self._views.frame[0] = frame
+        views.stale[0] = 1
+        del views
+        _close_shared_memory(shm)
+    
+    def publish(self):
+        """Write the current particle state and diagnostics under the seqlock"""
+        state, diagnostics = state_snapshot(self.simulator)
+        n = len(state)
+        if n > int(self._views.capacity[0]):
+            capacity = int(self._views.capacity[0])
+            while capacity < n:
+                capacity *= 2
+            self._retire(capacity)
+        
+        views = self._views
+        views.seq[0] += 1  # odd: write in progress
+        views.columns[:, :n] = state.T
+        views.count[0] = n
+        views.diagnostics[:] = diagnostics
+        views.frame[0] += 1
+        views.seq[0] += 1  # even: consistent
+        self.frames_published += 1
+    
+    def close(self):
+        """Unlink the segment; attached readers see it go stale"""
+        if self._shm is not None:
+            self._retire()
+
+
+class SharedStateReader:
+    """CST v2.0 additive: Read a SharedStatePublisher segment from any local process"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._shm = None
+        self._views: Optional[_SharedStateViews] = None
+        self._attach()
+    
+    def _attach(self, timeout: float = 1.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                shm = _attach_shared_memory(self.name)
+                break
+            except FileNotFoundError:
+                # The publisher may be between unlinking and re-creating
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.001)
+        if bytes(shm.buf[:8]) != SHARED_STATE_MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory segment {self.name!r} is not a simulator state segment")
+        capacity = int(np.ndarray((1,), np.uint32, shm.buf, _SHM_CAPACITY)[0])
+        self._shm = shm
+        self._views = _SharedStateViews(shm.buf, capacity)
+    
+    def _reattach_if_stale(self):
+        if self._views.stale[0]:
+            self.close()
+            self._attach()
+    
+    def views(self) -> Tuple[int, Dict[str, np.ndarray]]:
+        """Zero-copy column views of the current frame plus the seqlock value
+        
+        The views alias live memory: check ``is_consistent(seq)`` after using
+        them, and retry if it returns False.
+        """
+        self._reattach_if_stale()
+        views = self._views
+        while True:
+            seq = int(views.seq[0])
+            if seq % 2 == 0:
+                break
+            time.sleep(0)
+        n = int(views.count[0])
+        return seq, {name: views.columns[k, :n] for k, name in enumerate(SHARED_STATE_COLUMNS)}
+    
+    def is_consistent(self, seq: int) -> bool:
+        """True if no publish started since ``seq`` was read"""
+        return not self._views.stale[0] and int(self._views.seq[0]) == seq
+    
+    def read(self, timeout: float = 1.0) -> Optional[Dict]:
+        """Consistent copy of the latest frame, or None if none arrives in ``timeout``"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self._reattach_if_stale()
+            views = self._views
+            seq = int(views.seq[0])
+            if seq == 0 or seq % 2:
+                time.sleep(0)
+                continue
+            n = int(views.count[0])
+            frame = int(views.frame[0])
+            columns = views.columns[:, :n].copy()
+            diagnostics = views.diagnostics.tolist()
+            if self.is_consistent(seq):
+                return {
+                    "frame": frame,
+                    "count": n,
+                    "diagnostics": dict(zip(SHARED_STATE_DIAGNOSTICS, diagnostics)),
+                    "columns": dict(zip(SHARED_STATE_COLUMNS, columns))
+                }
+        return None
+    
+    def close(self):
+        if self._shm is not None:
+            self._views = None
+            _close_shared_memory(self._shm)
+            self._shm = None
+
+
+# CST v2.0 additive: Quantized particle frame format. Layout (little-endian):
+#   header   PARTICLE_FRAME_HEADER: magic, version, flags, position bits,
+#            count, frame number, timestamp, 3 per-axis position scales
+#   ids      keyframes only: uint32 byte length + newline-joined UTF-8 ids
+#   x, y, z  count int16/int32, absolute on keyframes, delta vs. the last
+#            keyframe otherwise (value = q * scale [+ keyframe value])
+#   per PARTICLE_FRAME_ATTRIBUTES: packed changed-mask + changed values
+# Flag bit 0 marks a keyframe, bit 1 a zlib-compressed body.
+PARTICLE_FRAME_MAGIC = b"CSTF"
+PARTICLE_FRAME_VERSION = 1
+PARTICLE_FRAME_HEADER = struct.Struct("<4sBBBxIQd3d")
+# name -> (wire dtype, quantization step or None for raw)
+PARTICLE_FRAME_ATTRIBUTES = {
+    "frequency": ("<f4", None),
+    "omega": ("<f4", None),
+    "theta": ("<u2", 2 * np.pi / 65536)
+}
+_FRAME_KEYFRAME, _FRAME_COMPRESSED = 0x1, 0x2
+TRAJECTORY_MAGIC = b"CSTTRJ01"
+
+
+def _quantize_attribute(name: str, values: np.ndarray) -> np.ndarray:
+    dtype, step = PARTICLE_FRAME_ATTRIBUTES[name]
+    if step is None:
+        return values.astype(dtype)
+    limit = np.iinfo(np.dtype(dtype)).max + 1
+    return (np.round(np.mod(values, limit * step) / step).astype(np.int64) % limit).astype(dtype)
+
+
+def _dequantize_attribute(name: str, wire: np.ndarray) -> np.ndarray:
+    step = PARTICLE_FRAME_ATTRIBUTES[name][1]
+    return wire.astype(np.float64) if step is None else wire.astype(np.float64) * step
+
+
+class ParticleFrameEncoder:
+    """CST v2.0 additive: Quantized, keyframe-delta particle frame encoder
+    
+    Positions are quantized per frame and axis to int16 (or int32) with a
+    scale fitted to the largest magnitude; between keyframes they are sent
+    as deltas against the last keyframe, so quantization error never
+    accumulates. Frequency, Ω and θ are sent only for particles whose wire
+    value changed since the previous frame. A keyframe is forced every
+    ``keyframe_interval`` frames and whenever the particle set changes.
+    """
+    
+    def __init__(self, keyframe_interval: int = 30, position_bits: int = 16,
+                 compress: bool = False):
+        if position_bits not in (16, 32):
+            raise ValueError("position_bits must be 16 or 32")
+        self.keyframe_interval = keyframe_interval
+        self.position_bits = position_bits
+        self.compress = compress
+        self.frames_encoded: int = 0
+        self.last_keyframe: bool = False
+        self._qmax = np.iinfo(np.int16 if position_bits == 16 else np.int32).max
+        self._ids: Optional[List[str]] = None
+        self._keyframe_positions: Optional[np.ndarray] = None
+        self._since_keyframe: int = 0
+        self._last_attributes: Dict[str, np.ndarray] = {}
+    
+    def encode_simulator(self, sim: 'Simulator', timestamp: Optional[float] = None) -> bytes:
+        """Encode the simulator's current particles"""
+        particles = list(sim.particles)
+        positions = np.array([(p.x, p.y, p.z) for p in particles], dtype=np.float64).reshape(-1, 3)
+        attributes = {name: np.array([getattr(p, name) for p in particles], dtype=np.float64)
+                      for name in PARTICLE_FRAME_ATTRIBUTES}
+        return self.encode([p.id for p in particles], positions, attributes, timestamp)
+    
+    def _quantize_positions(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        peak = np.max(np.abs(values), axis=0) if len(values) else np.zeros(3)
+        scales = np.where(peak > 0, peak / self._qmax, 1.0)
+        wire_dtype = '<i2' if self.position_bits == 16 else '<i4'
+        return np.round(values / scales).astype(wire_dtype), scales
+    
+    def encode(self, ids: List[str], positions: np.ndarray, attributes: Dict[str, np.ndarray],
+               timestamp: Optional[float] = None) -> bytes:
+        """Encode one frame from ids, N x 3 positions and per-particle attributes"""
+        ids = list(ids)
+        n = len(ids)
+        keyframe = (ids != self._ids or self._since_keyframe >= self.keyframe_interval)
+        self.last_keyframe = keyframe
+        body = []
+        if keyframe:
+            q, scales = self._quantize_positions(positions)
+            # Deltas are taken against what the decoder reconstructs
+            self._keyframe_positions = q.astype(np.float64) * scales
+            self._ids = list(ids)
+            self._since_keyframe = 0
+            self._last_attributes = {}
+            id_bytes = "\n".join(ids).encode('utf-8')
+            body.append(struct.pack("<I", len(id_bytes)) + id_bytes)
+        else:
+            q, scales = self._quantize_positions(positions - self._keyframe_positions)
+        self._since_keyframe += 1
+        body.append(np.ascontiguousarray(q.T).tobytes())
+        
+        for name in PARTICLE_FRAME_ATTRIBUTES:
+            wire = _quantize_attribute(name, np.asarray(attributes[name], dtype=np.float64))
+            previous = self._last_attributes.get(name)
+            if previous is None:
+                changed = np.ones(n, dtype=bool)
+            else:
+                changed = wire.view(f"u{wire.itemsize}") != previous.view(f"u{wire.itemsize}")
+            self._last_attributes[name] = wire
+            body.append(np.packbits(changed, bitorder='little').tobytes())
+            body.append(wire[changed].tobytes())
+        
+        flags = _FRAME_KEYFRAME if keyframe else 0
+        payload = b"".join(body)
+        if self.compress:
+            flags |= _FRAME_COMPRESSED
+            payload = zlib.compress(payload, 1)
+        header = PARTICLE_FRAME_HEADER.pack(
+            PARTICLE_FRAME_MAGIC, PARTICLE_FRAME_VERSION, flags, self.position_bits, n,
+            self.frames_encoded, time.time() if timestamp is None else timestamp, *scales)
+        self.frames_encoded += 1
+        return header + payload
+
+
+class ParticleFrameDecoder:
+    """CST v2.0 additive: Decode ParticleFrameEncoder output
+    
+    Delta frames need the keyframe they refer to; ``decode`` raises
+    ValueError for a delta frame before any keyframe has been seen.
+    """
+    
+    def __init__(self):
+        self._ids: Optional[List[str]] = None
+        self._keyframe_positions: Optional[np.ndarray] = None
+        self._attributes: Dict[str, np.ndarray] = {}
+    
+    def decode(self, data: bytes) -> Dict:
+        (magic, version, flags, position_bits, n, frame, timestamp,
+         *scales) = PARTICLE_FRAME_HEADER.unpack_from(data)
+        if magic != PARTICLE_FRAME_MAGIC or version != PARTICLE_FRAME_VERSION:
+            raise ValueError("Not a particle frame (or unsupported version)")
+        body = memoryview(data)[PARTICLE_FRAME_HEADER.size:]
+        if flags & _FRAME_COMPRESSED:
+            body = memoryview(zlib.decompress(body))
+        keyframe = bool(flags & _FRAME_KEYFRAME)
+        offset = 0
+        if keyframe:
+            (id_len,) = struct.unpack_from("<I", body, 0)
+            ids_text = bytes(body[4:4 + id_len]).decode('utf-8')
+            self._ids = ids_text.split("\n") if n else []
+            offset = 4 + id_len
+            self._attributes = {}
+        elif self._keyframe_positions is None or len(self._ids) != n:
+            raise ValueError("Delta frame without its keyframe")
+        
+        wire_dtype = np.dtype('<i2' if position_bits == 16 else '<i4')
+        q = np.frombuffer(body, dtype=wire_dtype, count=3 * n, offset=offset).reshape(3, n).T
+        offset += 3 * n * wire_dtype.itemsize
+        positions = q.astype(np.float64) * np.asarray(scales)
+        if keyframe:
+            self._keyframe_positions = positions
+        else:
+            positions = positions + self._keyframe_positions
+        
+        mask_bytes = (n + 7) // 8
+        attributes = {}
+        for name, (dtype, _) in PARTICLE_FRAME_ATTRIBUTES.items():
+            changed = np.unpackbits(np.frombuffer(body, dtype=np.uint8, count=mask_bytes,
+                                                  offset=offset),
+                                    count=n, bitorder='little').astype(bool)
+            offset += mask_bytes
+            dtype = np.dtype(dtype)
+            count = int(changed.sum())
+            values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+            offset += count * dtype.itemsize
+            current = self._attributes.get(name)
+            current = np.zeros(n, dtype=dtype) if current is None else current.copy()
+            current[changed] = values
+            self._attributes[name] = current
+            attributes[name] = _dequantize_attribute(name, current)
+        return {
+            "frame": frame,
+            "timestamp": timestamp,
+            "keyframe": keyframe,
+            "ids": self._ids,
+            "positions": positions,
+            **attributes
+        }
+
+
+class TrajectoryWriter:
+    """CST v2.0 additive: Append encoded particle frames to a trajectory file
+    
+    File layout: TRAJECTORY_MAGIC, then uint32 length-prefixed frames.
+    """
+    
+    def __init__(self, path: str, keyframe_interval: int = 30, position_bits: int = 16,
+                 compress: bool = True):
+        self.path = path
+        self.encoder = ParticleFrameEncoder(keyframe_interval, position_bits, compress)
+        self.bytes_written: int = 0
+        self._file = open(path, 'wb')
+        self._file.write(TRAJECTORY_MAGIC)
+    
+    def write(self, sim: 'Simulator', timestamp: Optional[float] = None):
+        frame = self.encoder.encode_simulator(sim, timestamp)
+        self._file.write(struct.pack("<I", len(frame)))
+        self._file.write(frame)
+        self.bytes_written += 4 + len(frame)
+    
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+def iter_trajectory(path: str) -> Iterator[Dict]:
+    """CST v2.0 additive: Decoded frames of a TrajectoryWriter file, in order"""
+    decoder = ParticleFrameDecoder()
+    with open(path, 'rb') as f:
+        if f.read(len(TRAJECTORY_MAGIC)) != TRAJECTORY_MAGIC:
+            raise ValueError(f"{path} is not a particle trajectory file")
+        while True:
+            prefix = f.read(4)
+            if len(prefix) < 4:
+                return
+            (length,) = struct.unpack("<I", prefix)
+            yield decoder.decode(f.read(length))
+
+
+# CST v2.0 additive: Binary streaming protocol. Every message is a 24-byte
+# little-endian header (topic id, flags, reserved, item count, frame number,
+# timestamp) followed by the payload:
+#   particles:   count x len(STREAM_PARTICLE_COLUMNS) float32, row-major
+#   tokens:      count compact-JSON tokens joined by b"\n"
+#   diagnostics: len(SHARED_STATE_DIAGNOSTICS) float64
+#   frames:      one ParticleFrameEncoder frame (quantized, keyframe deltas)
+STREAM_TOPICS = {"particles": 1, "tokens": 2, "diagnostics": 3, "frames": 4}
+STREAM_PARTICLE_COLUMNS = ("x", "y", "z", "vx", "vy", "vz", "theta", "omega")
+STREAM_HEADER = struct.Struct("<BBHIQd")
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def encode_stream_message(topic: str, frame: int, count: int, payload: bytes,
+                          timestamp: Optional[float] = None) -> bytes:
+    """CST v2.0 additive: Header + payload for one streaming message"""
+    ts = time.time() if timestamp is None else timestamp
+    return STREAM_HEADER.pack(STREAM_TOPICS[topic], 0, 0, count, frame, ts) + payload
+
+
+def decode_stream_message(message: bytes) -> Dict:
+    """CST v2.0 additive: Inverse of encode_stream_message (for Python clients)"""
+    topic_id, _, _, count, frame, ts = STREAM_HEADER.unpack_from(message)
+    topic = next(name for name, tid in STREAM_TOPICS.items() if tid == topic_id)
+    payload = memoryview(message)[STREAM_HEADER.size:]
+    if topic == "particles":
+        data = np.frombuffer(payload, dtype='<f4').reshape(count, len(STREAM_PARTICLE_COLUMNS))
+    elif topic == "tokens":
+        data = [json.loads(line) for line in bytes(payload).split(b"\n")] if count else []
+    elif topic == "frames":
+        data = bytes(payload)  # feed to a ParticleFrameDecoder
+    else:
+        data = dict(zip(SHARED_STATE_DIAGNOSTICS, np.frombuffer(payload, dtype='<f8').tolist()))
+    return {"topic": topic, "frame": frame, "timestamp": ts, "count": count, "data": data}
+
+
+def _websocket_frame(payload: bytes, opcode: int = 0x2) -> bytes:
+    """Unmasked server-to-client WebSocket frame"""
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _WebSocketClose(ValueError):
+    """Client frame the server refuses; close the connection with ``code``"""
+    
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+
+
+def _read_websocket_frame(rfile, max_size: int) -> Tuple[int, bytes]:
+    """(opcode, payload) of one client frame; opcode 0x8 on EOF
+    
+    The length is checked before anything is read: control frames
+    (close/ping/pong) must be final and at most 125 bytes (1002), data
+    frames at most ``max_size`` bytes (1009).
+    """
+    head = rfile.read(2)
+    if len(head) < 2:
+        return 0x8, b""
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if opcode & 0x8 and (length > 125 or not head[0] & 0x80):
+        raise _WebSocketClose(1002, "Control frame too long or fragmented")
+    if length == 126:
+        length = struct.unpack("!H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", rfile.read(8))[0]
+    if length > max_size and not opcode & 0x8:
+        raise _WebSocketClose(1009, f"Frame of {length} bytes exceeds {max_size}")
+    mask = rfile.read(4) if head[1] & 0x80 else b"\x00\x00\x00\x00"
+    data = rfile.read(length)
+    payload = bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+    return opcode, payload
+
+
+class _StreamClient:
+    """One attached viewer: its topic subscriptions and a bounded send queue"""
+    
+    def __init__(self, topics: Iterable[str], max_pending: int):
+        self.topics = set(topics)
+        self.pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.dropped: int = 0
+        self.closed = threading.Event()
+    
+    def offer(self, topic: str, message: bytes):
+        if topic not in self.topics or self.closed.is_set():
+            return
+        try:
+            self.pending.put_nowait(message)
+        except queue.Full:
+            # Slow viewer: drop its oldest message rather than stall the broadcast
+            try:
+                self.pending.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            self.pending.put_nowait(message)
+
+
+class StreamServer:
+    """CST v2.0 additive: Push particle frames, token batches and diagnostics
+    to any number of local viewers over WebSocket or chunked HTTP
+    
+    One broadcaster thread samples the simulator at ``rate`` Hz and encodes
+    each topic once per frame; every client gets the same bytes for the
+    topics it subscribed to. Endpoints:
+    
+    - ``/ws?topics=particles,diagnostics``: WebSocket, binary messages; send
+      a text message ``subscribe tokens,particles`` to change topics
+    - ``/stream?topics=...``: chunked HTTP, each message prefixed with its
+      uint32 little-endian length
+    - ``/schema``: JSON description of the message format
+    
+    WebSocket frames from a viewer larger than ``max_frame_size`` bytes
+    close the connection with status 1009.
+    """
+    
+    def __init__(self, simulator: 'Simulator', rate: float = 20.0, max_pending: int = 8,
+                 max_frame_size: int = 64 * 1024):
+        self.simulator = simulator
+        self.rate = rate
+        self.max_pending = max_pending
+        self.max_frame_size = max_frame_size
+        self.frames_sent: int = 0
+        self.frames_skipped: int = 0
+        self.last_error: Optional[BaseException] = None
+        self._clients: List[_StreamClient] = []
+        self._clients_lock = threading.Lock()
+        self._token_cursor: int = 0
+        self._token_source = None
+        # Quantized frames: new "frames" subscribers start from the last keyframe
+        self.frame_encoder = ParticleFrameEncoder()
+        self._last_keyframe: Optional[bytes] = None
+        self._server = None
+        self._server_thread: Optional[threading.Thread] = None
+        self._broadcast_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+    
+    @staticmethod
+    def schema() -> Dict:
+        return {
+            "header": {"struct": STREAM_HEADER.format,
+                       "fields": ["topic", "flags", "reserved", "count", "frame", "timestamp"]},
+            "topics": STREAM_TOPICS,
+            "particleColumns": list(STREAM_PARTICLE_COLUMNS),
+            "particleDtype": "float32",
+            "diagnostics": list(SHARED_STATE_DIAGNOSTICS),
+            "tokenEncoding": "compact JSON, newline-separated",
+            "frameHeader": PARTICLE_FRAME_HEADER.format,
+            "frameAttributes": {name: dtype for name, (dtype, _) in PARTICLE_FRAME_ATTRIBUTES.items()}
+        }
+    
+    # --- encoding ---
+    
+    def _new_tokens(self) -> List[Dict]:
+        """Tokens added since the last broadcast (resyncs if the stream was replaced)"""
+        stream = self.simulator.token_stream
+        tokens = stream.tokens
+        if tokens is not self._token_source or len(tokens) < self._token_cursor:
+            self._token_source = tokens
+            self._token_cursor = len(tokens)
+            return []
+        end = len(tokens)
+        new = [tokens[i] for i in range(self._token_cursor, end)]
+        self._token_cursor = end
+        return new
+    
+    def build_messages(self, topics: Iterable[str]) -> Dict[str, bytes]:
+        """Encode one frame for each requested topic"""
+        topics = set(topics)
+        frame = self.frames_sent
+        now = time.time()
+        messages = {}
+        if "frames" in topics:
+            payload = self.frame_encoder.encode_simulator(self.simulator, now)
+            message = encode_stream_message("frames", frame, len(self.simulator.particles),
+                                            payload, now)
+            if self.frame_encoder.last_keyframe:
+                self._last_keyframe = message
+            messages["frames"] = message
+        if topics & {"particles", "diagnostics"}:
+            state, diagnostics = state_snapshot(self.simulator)
+            if "particles" in topics:
+                columns = [SHARED_STATE_COLUMNS.index(name) for name in STREAM_PARTICLE_COLUMNS]
+                payload = np.ascontiguousarray(state[:, columns], dtype='<f4').tobytes()
+                messages["particles"] = encode_stream_message("particles", frame, len(state),
+                                                              payload, now)
+            if "diagnostics" in topics:
+                payload = np.asarray(diagnostics, dtype='<f8').tobytes()
+                messages["diagnostics"] = encode_stream_message("diagnostics", frame,
+                                                                len(diagnostics), payload, now)
+        if "tokens" in topics:
+            tokens = self._new_tokens()
+            if tokens:
+                payload = b"\n".join(encode_token(t) for t in tokens)
+                messages["tokens"] = encode_stream_message("tokens", frame, len(tokens),
+                                                           payload, now)
+        return messages
+    
+    def broadcast(self):
+        """Encode one frame and queue it for every subscribed client"""
+        with self._clients_lock:
+            clients = [c for c in self._clients if not c.closed.is_set()]
+            self._clients = clients
+        wanted = set().union(*(c.topics for c in clients)) if clients else set()
+        if not wanted:
+            self._new_tokens()  # keep the token cursor current for late subscribers
+            return
+        for topic, message in self.build_messages(wanted).items():
+            for client in clients:
+                client.offer(topic, message)
+        self.frames_sent += 1
+    
+    # --- serving ---
+    
+    def _attach(self, topics: Iterable[str]) -> _StreamClient:
+        client = _StreamClient([t for t in topics if t in STREAM_TOPICS], self.max_pending)
+        if "frames" in client.topics and self._last_keyframe is not None:
+            client.offer("frames", self._last_keyframe)
+        with self._clients_lock:
+            self._clients.append(client)
+        return client
+    
+    @property
+    def client_count(self) -> int:
+        with self._clients_lock:
+            return sum(1 for c in self._clients if not c.closed.is_set())
+    
+    def serve(self, port: int = 8765, host: str = "127.0.0.1"):
+        """Start the HTTP/WebSocket server and the broadcaster (daemon threads)"""
+        import base64
+        import hashlib
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+        server = self
+        
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def _topics(self, query) -> List[str]:
+                names = parse_qs(query).get("topics", ["particles,diagnostics"])[0]
+                return [t.strip() for t in names.split(",") if t.strip()]
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/schema":
+                    body = json.dumps(StreamServer.schema()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.send_header("Access-Control-Allow-Origin", "*")
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif url.path == "/ws" and "websocket" in self.headers.get("Upgrade", "").lower():
+                    self._serve_websocket(self._topics(url.query))
+                elif url.path == "/stream":
+                    self._serve_chunked(self._topics(url.query))
+                else:
+                    self.send_error(404)
+            
+            def _serve_chunked(self, topics: List[str]):
+                client = server._attach(topics)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                try:
+                    while not server._stop_event.is_set():
+                        try:
+                            message = client.pending.get(timeout=0.5)
+                        except queue.Empty:
+                            continue
+                        chunk = struct.pack("<I", len(message)) + message
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    client.closed.set()
+                    self.close_connection = True
+            
+            def _serve_websocket(self, topics: List[str]):
+                key = self.headers.get("Sec-WebSocket-Key", "").strip()
+                try:
+                    valid = len(base64.b64decode(key, validate=True)) == 16
+                except ValueError:
+                    valid = False
+                if not valid:
+                    self.send_error(400, "Missing or invalid Sec-WebSocket-Key")
+                    return
+                accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode("ascii"))
+                                          .digest()).decode("ascii")
+                self.send_response(101, "Switching Protocols")
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", accept)
+                self.end_headers()
+                self.close_connection = True
+                client = server._attach(topics)
+                send_lock = threading.Lock()
+                
+                def _close(payload: bytes):
+                    with send_lock:
+                        self.wfile.write(_websocket_frame(payload, 0x8))
+                        self.wfile.flush()
+                
+                def _receive():
+                    # Control messages from the viewer: subscribe / ping / close
+                    try:
+                        while not client.closed.is_set():
+                            opcode, payload = _read_websocket_frame(self.rfile,
+                                                                    server.max_frame_size)
+                            if opcode == 0x8:
+                                if payload:
+                                    _close(payload[:2])  # echo the viewer's status code
+                                break
+                            if opcode == 0x9:
+                                with send_lock:
+                                    self.wfile.write(_websocket_frame(payload, 0xA))
+                            elif opcode == 0x1:
+                                command, _, names = payload.decode("utf-8").partition(" ")
+                                if command == "subscribe":
+                                    topics = {t.strip() for t in names.split(",")
+                                              if t.strip() in STREAM_TOPICS}
+                                    resume_frames = "frames" in topics - client.topics
+                                    client.topics = topics
+                                    if resume_frames and server._last_keyframe is not None:
+                                        client.offer("frames", server._last_keyframe)
+                    except _WebSocketClose as exc:
+                        try:
+                            _close(struct.pack("!H", exc.code) + str(exc).encode("utf-8")[:123])
+                        except OSError:
+                            pass
+                    except (OSError, ValueError):
+                        pass
+                    finally:
+                        client.closed.set()
+                
+                threading.Thread(target=_receive, daemon=True).start()
+                try:
+                    while not client.closed.is_set() and not server._stop_event.is_set():
+                        try:
+                            message = client.pending.get(timeout=0.5)
+                        except queue.Empty:
+                            continue
+                        with send_lock:
+                            self.wfile.write(_websocket_frame(message))
+                            self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    client.closed.set()
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._stop_event.clear()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server_thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._server_thread.start()
+        
+        def _broadcast_loop():
+            interval = 1.0 / max(self.rate, 1e-3)
+            while not self._stop_event.wait(interval):
+                try:
+                    self.broadcast()
+                except (IndexError, RuntimeError):
+                    # The simulator was mid-tick (particle list or ψ dicts resized); skip this frame
+                    self.frames_skipped += 1
+                except Exception as exc:
+                    # Anything else is a bug: log the first one, keep serving
+                    self.frames_skipped += 1
+                    if self.last_error is None:
+                        import logging
+                        logging.getLogger(__name__).exception("Stream broadcast failed")
+                    self.last_error = exc
+        
+        self._broadcast_thread = threading.Thread(target=_broadcast_loop, daemon=True)
+        self._broadcast_thread.start()
+        return self._server.server_address
+    
+    def stop(self):
+        """Disconnect clients and stop the server and broadcaster"""
+        self._stop_event.set()
+        with self._clients_lock:
+            for client in self._clients:
+                client.closed.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._broadcast_thread is not None:
+            self._broadcast_thread.join(timeout=2.0)
+            self._broadcast_thread = None
+
+
+def lttb_downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """CST v2.0 additive: Largest-Triangle-Three-Buckets decimation
+    
+    Returns the indices of at most ``threshold`` points that preserve the
+    visual shape of ``y`` over ``x`` (first and last points always kept).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # Bucket boundaries for the n - 2 interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for b in range(threshold - 2):
+        start, end = edges[b], max(edges[b + 1], edges[b] + 1)
+        # Average of the next bucket (or the last point) as the third vertex
+        if b + 2 < len(edges):
+            nxt_start, nxt_end = edges[b + 1], max(edges[b + 2], edges[b + 1] + 1)
+            avg_x = x[nxt_start:nxt_end].mean()
+            avg_y = y[nxt_start:nxt_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+class MetricsHistory:
+    """CST v2.0 additive: Fixed-capacity multi-resolution metrics history
+    
+    Level 0 is a float64 ring buffer of the most recent raw samples. Points
+    evicted from level k are averaged in groups of ``factor`` into level
+    k + 1, so each level covers ``factor`` times the span of the previous
+    one at the same memory. Points evicted from the last level are dropped.
+    A group still filling up is reported as the mean of what it has, so
+    the history has no gap between levels.
+    """
+    
+    def __init__(self, columns: Tuple[str, ...], capacity: int = 2048, levels: int = 4,
+                 factor: int = 8):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.factor = factor
+        width = len(self.columns) + 1  # column 0 is time
+        self._buffers = [np.zeros((capacity, width), dtype=np.float64) for _ in range(levels)]
+        self._heads = [0] * levels  # next write slot
+        self._sizes = [0] * levels
+        self._pending_sum = [np.zeros(width, dtype=np.float64) for _ in range(levels)]
+        self._pending_count = [0] * levels
+    
+    def __len__(self) -> int:
+        return sum(self._sizes) + sum(1 for count in self._pending_count if count)
+    
+    def append(self, t: float, values: Dict[str, float]):
+        """Add one sample at time t"""
+        row = np.empty(len(self.columns) + 1, dtype=np.float64)
+        row[0] = t
+        for k, name in enumerate(self.columns):
+            row[k + 1] = values.get(name, np.nan)
+        self._push(0, row)
+    
+    def _push(self, level: int, row: np.ndarray):
+        buf = self._buffers[level]
+        head = self._heads[level]
+        if self._sizes[level] == self.capacity:
+            evicted = buf[head].copy()
+            if level + 1 < len(self._buffers):
+                self._pending_sum[level + 1] += evicted
+                self._pending_count[level + 1] += 1
+                if self._pending_count[level + 1] == self.factor:
+                    self._push(level + 1, self._pending_sum[level + 1] / self.factor)
+                    self._pending_sum[level + 1][:] = 0.0
+                    self._pending_count[level + 1] = 0
+        else:
+            self._sizes[level] += 1
+        buf[head] = row
+        self._heads[level] = (head + 1) % self.capacity
     
-    def export_json(self, path: str, metadata: Optional[Dict] = None):
-        """Export tokens to JSON with metadata"""
-        export_data = {
-            "metadata": metadata or {},
-            "tokens": self.tokens
-        }
-        with open(path, 'w') as f:
-            json.dump(export_data, f, indent=2)
+    def _level_rows(self, level: int) -> np.ndarray:
+        """Chronological rows of one level"""
+        size = self._sizes[level]
+        if size < self.capacity:
+            return self._buffers[level][:size]
+        head = self._heads[level]
+        return np.concatenate([self._buffers[level][head:], self._buffers[level][:head]])
+    
+    def rows(self, since: Optional[float] = None) -> np.ndarray:
+        """All retained rows, oldest (coarsest) first; column 0 is time"""
+        parts = []
+        for level in reversed(range(len(self._buffers))):
+            parts.append(self._level_rows(level))
+            # Evicted from the level below but not yet a full group here
+            count = self._pending_count[level]
+            if count:
+                parts.append((self._pending_sum[level] / count)[None, :])
+        data = np.concatenate(parts) if parts else np.empty((0, len(self.columns) + 1))
+        if since is not None:
+            data = data[data[:, 0] >= since]
+        return data
+    
+    def series(self, name: str, max_points: Optional[int] = None,
+               since: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(time, values) for one column, LTTB-decimated to max_points"""
+        data = self.rows(since)
+        t = data[:, 0]
+        y = data[:, self.columns.index(name) + 1]
+        if max_points is not None and len(t) > max_points:
+            idx = lttb_downsample(t, y, max_points)
+            t, y = t[idx], y[idx]
+        return t, y
     
     def clear(self):
-        """Clear all tokens"""
-        self.tokens = []
-        self.last_window_counts.clear()
-        self.count_per_sec = 0.0
+        """Drop all samples"""
+        for level in range(len(self._buffers)):
+            self._heads[level] = 0
+            self._sizes[level] = 0
+            self._pending_sum[level][:] = 0.0
+            self._pending_count[level] = 0
 
 
 class Recorder:
@@ -195,19 +2510,39 @@ class Recorder:
             )
             self.frames.append(frame_copy)
     
+    @staticmethod
+    def frame_to_dict(frame: AudioFrame, include_data: bool = True) -> Dict:
+        """CST v2.0 additive: JSON-serializable view of one frame"""
+        data = {
+            "timestamp": frame.timestamp,
+            "rmsEnergy": frame.rmsEnergy,
+            "frequencyData": frame.frequencyData,
+            "spectralCentroid": frame.spectralCentroid,
+            "harmonics": frame.harmonics
+        }
+        if include_data:
+            data["dataArray"] = frame.dataArray.tolist() if frame.dataArray is not None else None
+        return data
+    
+    def iter_export_chunks(self, include_data: bool = False, chunk_size: int = 100,
+                           count: Optional[int] = None) -> Iterator[bytes]:
+        """CST v2.0 additive: Stream recorded frames as a JSON array in byte chunks"""
+        frames = self.frames
+        n = len(frames) if count is None else min(count, len(frames))
+        batch: List[bytes] = []
+        yield b"["
+        first = True
+        for i in range(n):
+            batch.append(encode_token(self.frame_to_dict(frames[i], include_data)))
+            if len(batch) >= chunk_size or i == n - 1:
+                yield (b"" if first else b",") + b",".join(batch)
+                first = False
+                batch = []
+        yield b"]"
+    
     def save(self, path: str):
         """Save recorded frames to JSON"""
-        frames_data = [
-            {
-                "timestamp": f.timestamp,
-                "rmsEnergy": f.rmsEnergy,
-                "frequencyData": f.frequencyData,
-                "spectralCentroid": f.spectralCentroid,
-                "harmonics": f.harmonics,
-                "dataArray": f.dataArray.tolist() if f.dataArray is not None else None
-            }
-            for f in self.frames
-        ]
+        frames_data = [self.frame_to_dict(f) for f in self.frames]
         with open(path, 'w') as f:
             json.dump(frames_data, f, indent=2)
     
@@ -243,12 +2578,26 @@ class Recorder:
         self.replay_index = 0
 
 
+# CST v2.0 additive: 11D projection, component i = coord[i % 3] * (1 + 0.1 * i)
+PROJECTION_11D_DIMS = np.arange(11) % 3
+PROJECTION_11D_SCALE = 1 + np.arange(11) * 0.1
+
+
+def project_11d(vectors: np.ndarray) -> np.ndarray:
+    """CST v2.0 additive: 11D projection of one 3-vector or an N x 3 array, in one broadcast"""
+    vectors = np.asarray(vectors)
+    scale = PROJECTION_11D_SCALE.astype(np.float32) if vectors.dtype == np.float32 else PROJECTION_11D_SCALE
+    return vectors[..., PROJECTION_11D_DIMS] * scale
+
+
 class Particle:
     """CST v2.0 additive: Particle with 12D CST properties"""
     
     def __init__(self, x: float = 0.1, y: float = 0.0, z: float = 0.0, 
-                 frequency: float = 0.0, parent_id: Optional[str] = None):
-        self.id = self._generate_id()
+                 frequency: float = 0.0, parent_id: Optional[str] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 particle_id: Optional[str] = None, theta: Optional[float] = None):
+        self.id = particle_id if particle_id is not None else self._generate_id()
         self.x = x
         self.y = y
         self.z = z
@@ -264,29 +2613,27 @@ class Particle:
         self.Ugrav: float = 0.0  # Gravitational potential
         self.Udm: float = 0.0  # Dark matter potential
         self.vi: float = 0.0  # Characteristic frequency
-        self.theta: float = np.random.random() * 2 * np.pi  # Phase
+        # Phase (drawn from the owning simulator's RNG when given, or pre-drawn as ``theta``)
+        if theta is None:
+            theta = (rng.random() if rng is not None else np.random.random()) * 2 * np.pi
+        self.theta: float = theta
         self.omega: float = 0.0  # Synaptic strength
         self.entropyS: float = 0.0  # Entropy
         self.neighbors: List[int] = []
-        
-        # 11D projection
-        self.projection11D_pos = np.zeros(11)
-        self.projection11D_vel = np.zeros(11)
-        self._update_11d_projection()
+    
+    # CST v2.0 additive: 11D projection computed on access (nothing reads it per tick)
+    @property
+    def projection11D_pos(self) -> np.ndarray:
+        return project_11d((self.x, self.y, self.z))
+    
+    @property
+    def projection11D_vel(self) -> np.ndarray:
+        return project_11d(self.velocity)
     
     def _generate_id(self) -> str:
         """Generate deterministic ID"""
         return f"particle_{id(self)}"
     
-    def _update_11d_projection(self):
-        """Update 11D projection from 3D position"""
-        scale = 0.1
-        for i in range(11):
-            dim = i % 3
-            coord = [self.x, self.y, self.z][dim]
-            self.projection11D_pos[i] = coord * (1 + i * scale)
-            self.projection11D_vel[i] = self.velocity[dim] * (1 + i * scale)
-    
     def update_x12(self, dt: float, k: float, gamma: float):
         """Update adaptive state: dx12/dt = k * Ωi − γ * x12_i"""
         dx12 = (k * self.omega - gamma * self.x12) * dt
@@ -316,6 +2663,1038 @@ class Particle:
         self.theta = self.theta % (2 * np.pi)
 
 
+# CST v2.0 additive: Binary checkpoint format
+CHECKPOINT_MAGIC = b"CSTCKPT2"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_ALIGN = 64
+# Per-particle float64 columns, stored as one contiguous N x len(...) array
+CHECKPOINT_PARTICLE_COLUMNS = (
+    "x", "y", "z", "vx", "vy", "vz", "ax", "ay", "az", "frequency", "mass",
+    "x12", "m12", "Ec", "Ugrav", "Udm", "vi", "theta", "omega", "entropyS",
+    "gvx", "gvy", "gvz"
+)
+# Scalar attributes among them; the rest are the 3-vector triples below
+_CHECKPOINT_SCALARS = ("x", "y", "z", "frequency", "mass", "x12", "m12", "Ec", "Ugrav", "Udm",
+                       "vi", "theta", "omega", "entropyS")
+_CHECKPOINT_VECTORS = (("velocity", "vx"), ("acceleration", "ax"), ("grav_velocity", "gvx"))
+
+
+def _pack_strings(values: List[str]) -> np.ndarray:
+    """Newline-joined UTF-8 strings as a uint8 array"""
+    return np.frombuffer("\n".join(values).encode('utf-8'), dtype=np.uint8)
+
+
+def _unpack_strings(data: np.ndarray, count: int) -> List[str]:
+    if count == 0:
+        return []
+    return bytes(data).decode('utf-8').split("\n")
+
+
+class Checkpointer:
+    """CST v2.0 additive: Binary checkpoint/restore of full simulator state
+    
+    File layout: magic, uint32 version, uint32 header length, JSON header,
+    then 64-byte aligned contiguous arrays (offsets/dtypes/shapes in the
+    header). Restore memory-maps the file; tokens are not decoded until
+    accessed (see MappedTokenList). The token stream keeps its encoding
+    and query indexes current on insert, so a checkpoint copies them
+    as-is and restore maps them back without re-indexing.
+    Recorder frames are not included (use Recorder.save).
+    """
+    
+    def __init__(self, simulator: 'Simulator'):
+        self.simulator = simulator
+        self.path: Optional[str] = None
+        self.interval: float = 0.0
+        self.last_checkpoint_time: float = 0.0
+        self.checkpoints_written: int = 0
+        self.last_error: Optional[BaseException] = None
+        self._writer: Optional[threading.Thread] = None
+    
+    # --- snapshot (foreground, between ticks) ---
+    
+    def snapshot(self) -> Dict:
+        """Capture simulator state as arrays; cheap enough to run between ticks"""
+        sim = self.simulator
+        particles = sim.particles
+        n = len(particles)
+        col = {name: k for k, name in enumerate(CHECKPOINT_PARTICLE_COLUMNS)}
+        particle_array = np.empty((n, len(CHECKPOINT_PARTICLE_COLUMNS)), dtype=np.float64)
+        scalars = np.fromiter(itertools.chain.from_iterable(
+            map(operator.attrgetter(*_CHECKPOINT_SCALARS), particles)),
+            dtype=np.float64, count=n * len(_CHECKPOINT_SCALARS)).reshape(n, -1)
+        for k, name in enumerate(_CHECKPOINT_SCALARS):
+            particle_array[:, col[name]] = scalars[:, k]
+        missing = np.full(3, np.nan)
+        for attr, first in _CHECKPOINT_VECTORS:
+            if n > 0:
+                # One C-level copy of all the small per-particle arrays
+                vectors = np.concatenate([getattr(p, attr, missing) for p in particles])
+                particle_array[:, col[first]:col[first] + 3] = vectors.reshape(n, 3)
+        
+        meta = {
+            "seed": sim.seed,
+            "mode": sim.mode.value,
+            "precision": sim.precision,
+            "particleCount": len(particles),
+            "nextParticleIndex": sim._next_particle_index,
+            "rngState": sim.rng.bit_generator.state,
+            "physics": dataclasses.asdict(sim.physics),
+            "adapt": dataclasses.asdict(sim.adapt),
+            "sync": dataclasses.asdict(sim.sync),
+            "timestep": dataclasses.asdict(sim.timestep),
+            "dmParams": dataclasses.asdict(sim.dm_params),
+            "coalescing": dataclasses.asdict(sim.coalescing),
+            "frequencyMatch": dataclasses.asdict(sim.frequency_match),
+            "currentAudioEnergy": sim.current_audio_energy,
+            "currentFrequencyData": sim.current_frequency_data,
+            "audioSensitivity": sim.audio_sensitivity,
+            "conservationE0": sim.conservation_E0,
+            "conservationP0": sim.conservation_P0.tolist(),
+            "conservationL0": sim.conservation_L0.tolist(),
+            "particleColumns": list(CHECKPOINT_PARTICLE_COLUMNS),
+            "createdAt": time.time()
+        }
+        arrays = {
+            "particles": particle_array,
+            "particleIds": _pack_strings([p.id for p in particles]),
+            "parentIds": _pack_strings([p.parent_id or "" for p in particles]),
+            "psiVelocityKeys": _pack_strings(list(sim.psi_velocity_integral.keys())),
+            "psiVelocityValues": np.fromiter(sim.psi_velocity_integral.values(), dtype=np.float64),
+            "psiX12Keys": _pack_strings(list(sim.psi_x12_integral.keys())),
+            "psiX12Values": np.fromiter(sim.psi_x12_integral.values(), dtype=np.float64)
+        }
+        meta["psiVelocityCount"] = len(sim.psi_velocity_integral)
+        meta["psiX12Count"] = len(sim.psi_x12_integral)
+        meta["coalescer"], coalescer_arrays = sim.coalescer.checkpoint_state()
+        arrays.update(coalescer_arrays)
+        meta["tokenStream"], stream_arrays = sim.token_stream.checkpoint_state()
+        arrays.update(stream_arrays)
+        # Ticks replace neighbor lists rather than mutate them, so holding the
+        # lists is enough; the writer flattens them
+        return {"meta": meta, "arrays": arrays, "neighbors": [p.neighbors for p in particles]}
+    
+    # --- write (may run on a background thread) ---
+    
+    def write(self, snap: Dict, path: str):
+        """Write a snapshot to ``path`` atomically"""
+        neighbors = snap["neighbors"]
+        neighbor_offsets = np.zeros(len(neighbors) + 1, dtype=np.int64)
+        np.cumsum([len(ids) for ids in neighbors], out=neighbor_offsets[1:])
+        arrays = dict(snap["arrays"])
+        arrays["neighborOffsets"] = neighbor_offsets
+        arrays["neighborIndices"] = np.fromiter(itertools.chain.from_iterable(neighbors),
+                                                dtype=np.int64, count=int(neighbor_offsets[-1]))
+        meta = snap["meta"]
+        # Header size depends on the offsets it contains; reserve room, then lay out arrays
+        layout = {}
+        header_bytes = b""
+        reserved = 4096
+        while True:
+            offset = reserved
+            for name, arr in arrays.items():
+                layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+                offset += arr.nbytes
+                offset = -(-offset // CHECKPOINT_ALIGN) * CHECKPOINT_ALIGN
+            header_bytes = json.dumps({"meta": meta, "arrays": layout},
+                                      default=_json_default).encode('utf-8')
+            if 16 + len(header_bytes) <= reserved:
+                break
+            reserved = -(-(16 + len(header_bytes)) // CHECKPOINT_ALIGN) * CHECKPOINT_ALIGN
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(CHECKPOINT_MAGIC)
+            f.write(struct.pack("<II", CHECKPOINT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for name, arr in arrays.items():
+                f.seek(layout[name]["offset"])
+                f.write(memoryview(np.ascontiguousarray(arr)).cast('B'))
+        os.replace(tmp_path, path)
+        self.checkpoints_written += 1
+    
+    def save(self, path: str):
+        """Synchronous checkpoint"""
+        self.write(self.snapshot(), path)
+    
+    def save_async(self, path: str) -> bool:
+        """Snapshot now, write on a background thread; False if a write is in flight"""
+        if self._writer is not None and self._writer.is_alive():
+            return False
+        snap = self.snapshot()
+        
+        def _run():
+            try:
+                self.write(snap, path)
+            except Exception as e:
+                self.last_error = e
+        
+        self._writer = threading.Thread(target=_run, daemon=True)
+        self._writer.start()
+        return True
+    
+    def wait(self, timeout: Optional[float] = None):
+        """Wait for an in-flight background write"""
+        if self._writer is not None:
+            self._writer.join(timeout)
+    
+    def maybe_checkpoint(self):
+        """Periodic hook called after each tick; never blocks on I/O"""
+        if self.path is None or self.interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self.last_checkpoint_time >= self.interval:
+            if self.save_async(self.path):
+                self.last_checkpoint_time = now
+    
+    # --- restore ---
+    
+    @staticmethod
+    def restore(path: str, simulator: Optional['Simulator'] = None) -> 'Simulator':
+        """Restore a simulator from a memory-mapped checkpoint"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:8] != CHECKPOINT_MAGIC:
+            raise ValueError(f"{path} is not a simulator checkpoint")
+        version, header_len = struct.unpack("<II", mm[8:16])
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {version}")
+        header = json.loads(mm[16:16 + header_len].decode('utf-8'))
+        meta = header["meta"]
+        
+        def array(name: str) -> np.ndarray:
+            spec = header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+            if count == 0:
+                # Empty trailing arrays may start past the end of the file
+                return np.empty(spec["shape"], dtype=dtype)
+            return np.frombuffer(mm, dtype=dtype, count=count,
+                                 offset=spec["offset"]).reshape(spec["shape"])
+        
+        sim = simulator if simulator is not None else Simulator()
+        sim.seed = meta["seed"]
+        sim.mode = SimulationMode(meta["mode"])
+        sim.precision = meta.get("precision", "float64")
+        sim._next_particle_index = meta["nextParticleIndex"]
+        sim.rng = np.random.default_rng()
+        sim.rng.bit_generator.state = meta["rngState"]
+        sim.physics = PhysicsConfig(**meta["physics"])
+        sim.adapt = AdaptiveConfig(**meta["adapt"])
+        sim.sync = SyncConfig(**meta["sync"])
+        sim.timestep = TimestepConfig(**meta["timestep"])
+        sim.dm_params = DarkMatterParams(**meta["dmParams"])
+        # Checkpoints from before coalescing/frequency matching keep the defaults
+        if "coalescing" in meta:
+            sim.coalescing = CoalescingConfig(**meta["coalescing"])
+            sim.coalescer = TokenCoalescer(sim.coalescing)
+            sim.coalescer.load_checkpoint_state(meta["coalescer"], {
+                name: array(name) for name in ("coalescerKinds", "coalescerFloats", "coalescerInts")})
+        if "frequencyMatch" in meta:
+            sim.frequency_match = FrequencyMatchConfig(**meta["frequencyMatch"])
+        sim.current_audio_energy = meta["currentAudioEnergy"]
+        sim.current_frequency_data = meta["currentFrequencyData"]
+        sim.audio_sensitivity = meta["audioSensitivity"]
+        sim.conservation_E0 = meta["conservationE0"]
+        sim.conservation_P0 = np.array(meta["conservationP0"])
+        sim.conservation_L0 = np.array(meta["conservationL0"])
+        
+        n = meta["particleCount"]
+        data = np.array(array("particles"))  # one copy out of the map
+        columns = {name: data[:, k] for k, name in enumerate(meta["particleColumns"])}
+        velocities = np.ascontiguousarray(data[:, 3:6])
+        accelerations = np.ascontiguousarray(data[:, 6:9])
+        has_accel = np.isfinite(accelerations).all(axis=1)
+        if "gvx" in columns:
+            grav_velocities = np.column_stack((columns["gvx"], columns["gvy"], columns["gvz"]))
+            has_grav_velocity = np.isfinite(grav_velocities).all(axis=1)
+        else:
+            has_grav_velocity = np.zeros(n, dtype=bool)
+        neighbor_offsets = array("neighborOffsets").tolist()
+        neighbor_indices = array("neighborIndices").tolist()
+        neighbor_lists = [neighbor_indices[a:b] for a, b in zip(neighbor_offsets[:-1],
+                                                                 neighbor_offsets[1:])]
+        parent_ids = [pid or None for pid in _unpack_strings(array("parentIds"), n)]
+        
+        scalar_names = ("x", "y", "z", "frequency", "mass", "x12", "m12", "Ec", "Ugrav",
+                        "Udm", "vi", "theta", "omega", "entropyS")
+        keys = scalar_names + ("id", "parent_id", "velocity", "neighbors")
+        rows = zip(*(columns[name].tolist() for name in scalar_names),
+                   _unpack_strings(array("particleIds"), n), parent_ids,
+                   velocities, neighbor_lists)
+        
+        # Bypass Particle.__init__ (fresh ID, RNG draw, projection loop); the
+        # object churn would otherwise trigger repeated full GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            new_particle = Particle.__new__
+            particles = []
+            for row in rows:
+                p = new_particle(Particle)
+                p.__dict__.update(zip(keys, row))
+                particles.append(p)
+            for i in np.flatnonzero(has_accel).tolist():
+                particles[i].acceleration = accelerations[i]
+            for i in np.flatnonzero(has_grav_velocity).tolist():
+                particles[i].grav_velocity = grav_velocities[i]
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        sim.particles = particles
+        
+        sim.psi_velocity_integral = dict(zip(
+            _unpack_strings(array("psiVelocityKeys"), meta["psiVelocityCount"]),
+            array("psiVelocityValues").tolist()))
+        sim.psi_x12_integral = dict(zip(
+            _unpack_strings(array("psiX12Keys"), meta["psiX12Count"]),
+            array("psiX12Values").tolist()))
+        
+        # Checkpoints from before index persistence re-index on the first query
+        stream_meta = meta.get("tokenStream")
+        stream_arrays = ("tokenBlob", "tokenOffsets") + (() if stream_meta is None else (
+            "tokenTimestamps", "tokenParticleIds", "tokenTypeOffsets", "tokenTypePositions",
+            "tokenParticleOffsets", "tokenParticlePositions"))
+        sim.token_stream.load_checkpoint_state(stream_meta, {name: array(name) for name in stream_arrays})
+        return sim
+
+
+# CST v2.0 additive: Domain-decomposed particle state. One float64 column of
+# N entries per name, kept sorted by x so every domain is a
+# contiguous slab of rows and its halo a contiguous (wider) row range.
+DOMAIN_STATE_COLUMNS = (
+    "x", "y", "z", "vx", "vy", "vz", "ax", "ay", "az", "mass", "x12", "m12",
+    "Ec", "Ugrav", "Udm", "vi", "theta", "omega", "psiV", "psiX12", "degree", "index"
+)
+_DOMAIN_COL = {name: k for k, name in enumerate(DOMAIN_STATE_COLUMNS)}
+# Columns a step rewrites for the rows a domain owns
+_DOMAIN_UPDATED = ("x", "y", "z", "vx", "vy", "vz", "ax", "ay", "az", "x12", "m12",
+                   "Ec", "Ugrav", "Udm", "vi", "theta", "omega", "psiV", "psiX12", "degree")
+_CELL_OFFSETS = np.array([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                          for dz in (-1, 0, 1)], dtype=np.int64)
+
+
+class _CellIndex:
+    """Rows [halo_lo, halo_hi) bucketed into rCutoff-sized cells, sorted by cell key"""
+    
+    def __init__(self, pos: np.ndarray, halo_lo: int, halo_hi: int, r_cut: float):
+        self.halo_lo = halo_lo
+        self.r_cut = r_cut
+        self.cells = np.floor(pos[:, halo_lo:halo_hi] / r_cut).astype(np.int64)
+        self.origin = self.cells.min(axis=1) - 1
+        self.span = self.cells.max(axis=1) - self.origin + 2
+        cell_keys = self.key(self.cells)
+        by_cell = np.argsort(cell_keys, kind='stable')
+        self.sorted_keys = cell_keys[by_cell]
+        self.sorted_rows = np.arange(halo_lo, halo_hi)[by_cell]
+    
+    def key(self, c: np.ndarray) -> np.ndarray:
+        origin, span = self.origin, self.span
+        return ((c[0] - origin[0]) * span[1] + (c[1] - origin[1])) * span[2] + (c[2] - origin[2])
+
+
+def _domain_pairs(pos: np.ndarray, lo: int, hi: int,
+                  index: _CellIndex) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Neighbor pairs (i, j, x_j - x_i, |x_j - x_i|^2) with i in rows [lo, hi),
+    j among the indexed rows, i != j and distance <= r_cut
+    
+    Pairs of a row come out in the same order whatever [lo, hi) is, so
+    per-row sums don't depend on how rows are chunked.
+    """
+    r_cut = index.r_cut
+    sorted_keys, sorted_rows = index.sorted_keys, index.sorted_rows
+    query_cells = index.cells[:, lo - index.halo_lo:hi - index.halo_lo]
+    query = np.arange(lo, hi)
+    rows_i, rows_j = [], []
+    for offset in _CELL_OFFSETS:
+        keys = index.key(query_cells + offset[:, None])
+        start = np.searchsorted(sorted_keys, keys, 'left')
+        counts = np.searchsorted(sorted_keys, keys, 'right') - start
+        total = int(counts.sum())
+        if total == 0:
+            continue
+        # Concatenated ranges start[k] .. start[k] + counts[k]
+        first = np.cumsum(counts) - counts
+        rows_i.append(np.repeat(query, counts))
+        rows_j.append(sorted_rows[np.arange(total) + np.repeat(start - first, counts)])
+    if not rows_i:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros((3, 0)), np.zeros(0)
+    i = np.concatenate(rows_i)
+    j = np.concatenate(rows_j)
+    d = np.take(pos, j, axis=1) - np.take(pos, i, axis=1)
+    d2 = np.einsum('ij,ij->j', d, d)
+    keep = (d2 <= r_cut * r_cut) & (i != j)
+    return i[keep], j[keep], d[:, keep], d2[keep]
+
+
+_NO_PROFILER = TickProfiler()
+
+
+def _domain_step_rows(columns: np.ndarray, lo: int, hi: int, halo_lo: int, halo_hi: int,
+                      dt: float, params: Dict, index: Optional[_CellIndex] = None,
+                      profiler: Optional[TickProfiler] = None,
+                      pairs_out: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None
+                      ) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """One tick for rows [lo, hi), reading only rows [halo_lo, halo_hi)
+    
+    Mirrors Simulator.tick with the Euler integrator: gravity, dark matter,
+    synaptic Ω, x12/m12, Kuramoto phase, Lorenz/gravity blend, energies and
+    ψ integrals. Every update reads start-of-step state, so domains can be
+    stepped concurrently. Returns the new column values for the rows plus
+    stats (pair count, closest pair distance², fastest speed). ``index``
+    may be a prebuilt _CellIndex over the halo rows. A detailed
+    ``profiler`` gets one lap per kernel stage, and ``pairs_out`` collects
+    the (i, j) neighbor pairs of each chunk.
+    
+    Neighbor, force, adaptive, phase and integration kernels run in
+    ``params["stateDtype"]``; potential energies, Ec and the ψ increments
+    are summed in float64 whatever the state precision.
+    """
+    col = _DOMAIN_COL
+    dtype = params["stateDtype"]
+    n = hi - lo
+    
+    def column(name: str, rows: slice = slice(None)) -> np.ndarray:
+        return columns[col[name], rows].astype(dtype, copy=False)
+    
+    pos = columns[0:3].astype(dtype, copy=False)
+    mass = column("mass")
+    x12_all = column("x12")
+    theta_all = column("theta")
+    G_ = params["G"]
+    eps2 = params["epsilon"] ** 2
+    grav = params["gravEnabled"]
+    two_sigma2 = 2 * params["sigmaSimilarity"] ** 2
+    acc = np.zeros((3, n), dtype=dtype)
+    ugrav = np.zeros(n)
+    omega = np.zeros(n, dtype=dtype)
+    coupling = np.zeros(n, dtype=dtype)
+    degree = np.zeros(n, dtype=dtype)
+    pairs = 0
+    r2_min = np.inf
+    chunk = max(1, int(params["chunkSize"]))
+    prof = profiler if profiler is not None else _NO_PROFILER
+    t = prof.mark()
+    if index is None and n:
+        index = _CellIndex(pos, halo_lo, halo_hi, params["rCutoff"])
+    
+    for c0 in range(lo, hi, chunk):
+        c1 = min(hi, c0 + chunk)
+        i, j, d, d2 = _domain_pairs(pos, c0, c1, index)
+        t = prof.lap("neighbors", t)
+        if len(i) == 0:
+            continue
+        if pairs_out is not None:
+            pairs_out.append((i, j))
+        pairs += len(i)
+        r2_min = min(r2_min, float(d2.min()))
+        rows = i - c0
+        out = slice(c0 - lo, c1 - lo)
+        r_eff2 = d2 + eps2
+        gmm = G_ * mass[i] * mass[j]
+        if grav:
+            r_eff = np.sqrt(r_eff2)
+            w = G_ * mass[j] / (r_eff2 * r_eff)
+            for axis in range(3):
+                acc[axis, out] += np.bincount(rows, weights=w * d[axis], minlength=c1 - c0)
+            ugrav[out] -= np.bincount(rows, weights=gmm / r_eff, minlength=c1 - c0)
+            t = prof.lap("gravity", t)
+        similarity = np.exp(-((x12_all[i] - x12_all[j]) ** 2) / two_sigma2)
+        omega[out] += np.bincount(rows, weights=gmm / (r_eff2 * params["a0"] * params["m0"]) * similarity,
+                                  minlength=c1 - c0)
+        t = prof.lap("synaptic", t)
+        coupling[out] += np.bincount(rows, weights=np.sin(theta_all[j] - theta_all[i]),
+                                     minlength=c1 - c0)
+        degree[out] += np.bincount(rows, minlength=c1 - c0)
+        t = prof.lap("phase", t)
+    
+    own = slice(lo, hi)
+    x, y, z = pos[0, own], pos[1, own], pos[2, own]
+    x12 = np.clip(x12_all[own] + (params["k"] * omega - params["gamma"] * x12_all[own]) * dt, -1.0, 1.0)
+    m12_prev = column("m12", own)
+    m12 = m12_prev + params["alpha"] * (x12 - m12_prev) * dt
+    t = prof.lap("adaptive", t)
+    
+    # Kuramoto phase with vi from the previous tick's Ec (vi overflows float32)
+    vi_prev = columns[col["Ec"], own].astype(np.float64) / H
+    theta = theta_all[own] + (
+        vi_prev + params["Ksync"] / np.maximum(1.0, degree) * coupling) * dt
+    theta = (theta % (2 * np.pi)).astype(dtype, copy=False)
+    t = prof.lap("phase", t)
+    
+    dm = params["dmEnabled"]
+    if not grav:
+        ugrav = columns[col["Ugrav"], own]
+        acc = np.zeros((3, n), dtype=dtype) if dm else \
+            columns[col["ax"]:col["az"] + 1, own].astype(dtype, copy=False)
+    if dm:
+        phi, acc_dm = params["dmTable"].evaluate(x, y, z)
+        udm = columns[col["mass"], own] * phi
+        acc = acc + acc_dm.astype(dtype, copy=False)
+        t = prof.lap("darkMatter", t)
+    else:
+        udm = columns[col["Udm"], own]
+    
+    sigma, rho, beta = params["sigma"], params["rho"], params["beta"]
+    with np.errstate(over='ignore', invalid='ignore'):
+        step = np.stack((sigma * (y - x), x * (rho - z) - y, x * y - beta * z)) * dt
+        if grav or dm:
+            blend = params["blendLorenz"]
+            step = blend * step + (1 - blend) * acc * dt
+        new_pos = np.stack((x, y, z)) + step
+        velocity = step / dt if dt > 0 else np.zeros_like(step)
+    new_pos = np.where(np.isfinite(new_pos), np.clip(new_pos, -1000.0, 1000.0), 0.0)
+    velocity = np.where(np.isfinite(velocity), np.clip(velocity, -1000.0, 1000.0), 0.0)
+    t = prof.lap("integration", t)
+    
+    velocity64 = velocity.astype(np.float64, copy=False)
+    speed2 = np.einsum('ij,ij->j', velocity64, velocity64)
+    Ec = 0.5 * columns[col["mass"], own] * speed2 + ugrav + udm
+    speed = np.sqrt(speed2)
+    t = prof.lap("energy", t)
+    updates = {
+        "x": new_pos[0], "y": new_pos[1], "z": new_pos[2],
+        "vx": velocity[0], "vy": velocity[1], "vz": velocity[2],
+        "ax": acc[0], "ay": acc[1], "az": acc[2],
+        "x12": x12, "m12": m12, "Ec": Ec, "Ugrav": ugrav, "Udm": udm, "vi": Ec / H,
+        "theta": theta, "omega": omega,
+        "psiV": columns[col["psiV"], own] + speed / params["vref"] * dt,
+        "psiX12": columns[col["psiX12"], own] + np.abs(x12, dtype=np.float64) * dt,
+        "degree": degree
+    }
+    prof.lap("psi", t)
+    stats = {"pairs": pairs, "r2Min": r2_min, "vMax": float(speed.max()) if n else 0.0}
+    return updates, stats
+
+
+def _write_domain_rows(columns: np.ndarray, lo: int, hi: int, updates: Dict[str, np.ndarray]):
+    for name in _DOMAIN_UPDATED:
+        columns[_DOMAIN_COL[name], lo:hi] = updates[name]
+
+
+def _particle_state_columns(particles: List['Particle'], dtype: type = np.float64) -> np.ndarray:
+    """DOMAIN_STATE_COLUMNS x N state of Particle objects (ψ columns zeroed)
+    
+    In float32 the vi column (Ec / H) overflows to inf; no kernel reads it,
+    and each step rewrites it from Ec in float64.
+    """
+    with np.errstate(over='ignore'):
+        state = np.array([
+            (p.x, p.y, p.z, p.velocity[0], p.velocity[1], p.velocity[2],
+             *getattr(p, 'acceleration', (0.0, 0.0, 0.0)), p.mass, p.x12, p.m12,
+             p.Ec, p.Ugrav, p.Udm, p.vi, p.theta, p.omega, 0.0, 0.0, len(p.neighbors), k)
+            for k, p in enumerate(particles)], dtype=dtype)
+    return state.reshape(len(particles), len(DOMAIN_STATE_COLUMNS)).T.copy()
+
+
+def _neighbor_lists(n: int, i: np.ndarray, j: np.ndarray) -> List[List[int]]:
+    """Per-row neighbor lists from the (i, j) pairs of _domain_pairs, in chunk order
+    
+    _domain_pairs walks the 27 cells in the same order as
+    Simulator._query_neighbors, so each list matches what the
+    per-particle tick would have queried.
+    """
+    flat = j[np.argsort(i, kind='stable')].tolist()
+    ends = np.cumsum(np.bincount(i, minlength=n)).tolist()
+    return [flat[a:b] for a, b in zip([0] + ends[:-1], ends)]
+
+
+def _apply_particle_state(sim: 'Simulator', state: np.ndarray,
+                          neighbors: Optional[List[List[int]]] = None):
+    """Write stepped columns (in particle order) back to the simulator's
+    particles and add the ψ columns to its accumulators. Neighbor lists
+    are set from ``neighbors``, or cleared when it is None so a later
+    per-particle tick queries them afresh."""
+    rows = state.T.tolist()
+    col = _DOMAIN_COL
+    velocities = state[3:6].T.copy()
+    accelerations = state[6:9].T.copy()
+    forced = sim.physics.gravEnabled or sim.physics.dmEnabled
+    psi_v, psi_x12 = sim.psi_velocity_integral, sim.psi_x12_integral
+    for k, (p, row) in enumerate(zip(sim.particles, rows)):
+        p.x, p.y, p.z = row[0], row[1], row[2]
+        p.velocity = velocities[k]
+        if forced:
+            p.acceleration = accelerations[k]
+        (p.x12, p.m12, p.Ec, p.Ugrav, p.Udm, p.vi, p.theta,
+         p.omega) = row[col["x12"]:col["omega"] + 1]
+        p.neighbors = neighbors[k] if neighbors is not None else []
+        psi_v[p.id] = psi_v.get(p.id, 0.0) + row[col["psiV"]]
+        psi_x12[p.id] = psi_x12.get(p.id, 0.0) + row[col["psiX12"]]
+
+
+def _adaptive_dt_from_stats(timestep: TimestepConfig, stats: List[Dict]) -> float:
+    """Simulator._compute_adaptive_dt from per-chunk closest-pair / speed stats"""
+    r2_min = min(s["r2Min"] for s in stats)
+    v_max = max(s["vMax"] for s in stats)
+    r_min = 1.0 if r2_min == np.inf else float(np.sqrt(r2_min))
+    v_max = v_max if v_max > 0 else 1.0
+    return max(1e-4, min(timestep.dtMax, 0.1 * r_min / v_max))
+
+
+_KERNEL_POOL = None
+_KERNEL_POOL_THREADS = 0
+_KERNEL_POOL_LOCK = threading.Lock()
+
+
+def _kernel_pool(threads: int):
+    """CST v2.0 additive: Process-wide thread pool for chunked kernels
+    
+    Returns None for a single thread. The pool is shared by every simulator
+    in the process and re-created when the requested size changes.
+    """
+    global _KERNEL_POOL, _KERNEL_POOL_THREADS
+    threads = threads or os.cpu_count() or 1
+    if threads <= 1:
+        return None
+    with _KERNEL_POOL_LOCK:
+        if _KERNEL_POOL is None or _KERNEL_POOL_THREADS != threads:
+            from concurrent.futures import ThreadPoolExecutor
+            if _KERNEL_POOL is not None:
+                _KERNEL_POOL.shutdown(wait=False)
+            _KERNEL_POOL = ThreadPoolExecutor(max_workers=threads,
+                                              thread_name_prefix="cosmic-kernel")
+            _KERNEL_POOL_THREADS = threads
+        return _KERNEL_POOL
+
+
+def _domain_params(sim: 'Simulator', chunk_size: int) -> Dict:
+    """Kernel parameters from a simulator's configs and audio state"""
+    params = dataclasses.asdict(sim.physics)
+    params.update(dataclasses.asdict(sim.adapt))
+    params.update(dataclasses.asdict(sim.dm_params))
+    params.update({
+        "Ksync": sim.sync.Ksync,
+        "beta": 2.667,
+        "stateDtype": sim.state_dtype,
+        "chunkSize": chunk_size,
+        "dmTable": sim.dark_matter_table() if sim.physics.dmEnabled else None
+    })
+    params.update(_domain_step_params(sim))
+    return params
+
+
+def _domain_step_params(sim: 'Simulator') -> Dict:
+    """The parameters that follow the audio: Lorenz sigma and rho"""
+    audio = sim.current_audio_energy * sim.audio_sensitivity
+    return {"sigma": 10.0 * (1.0 + audio), "rho": 28.0 * (1.0 + audio * 0.3)}
+
+
+def _domain_worker(rank: int, conn, barrier, buffers: List[np.ndarray], order: np.ndarray,
+                   params: Dict):
+    """Worker loop: gather own rows into x order, step them, write them back
+    
+    ``params`` (configs, NFW table) arrive once, with the fork; each step's
+    message carries only the slab layout, dt and _domain_step_params.
+    Two barriers per step: after the gather (halo rows are written by other
+    workers) and after the compute (nobody overwrites state still being read).
+    """
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        src, dst, n, bounds, halos, dt, step_params = message
+        params.update(step_params)
+        lo, hi = bounds[rank], bounds[rank + 1]
+        try:
+            start = time.perf_counter()
+            buffers[dst][:, lo:hi] = buffers[src][:, order[lo:hi]]
+            barrier.wait()
+            updates, stats = _domain_step_rows(buffers[dst][:, :n], lo, hi, *halos[rank],
+                                               dt, params)
+            barrier.wait()
+            _write_domain_rows(buffers[dst], lo, hi, updates)
+            stats["seconds"] = time.perf_counter() - start
+            conn.send(stats)
+        except Exception as exc:  # report instead of hanging the other workers
+            barrier.abort()
+            conn.send({"error": f"domain {rank}: {exc!r}"})
+
+
+class DistributedStepper:
+    """CST v2.0 additive: Spatial domain decomposition across a process pool
+    
+    Particle state lives in two shared-memory column buffers (see
+    DOMAIN_STATE_COLUMNS). Every step the parent sorts particles by x; each
+    worker gathers its slab of rows into the other buffer (that re-sort is
+    the migration of particles between domains), steps its rows reading a
+    halo of rows within ``rCutoff`` of its slab, and writes them back.
+    Slab boundaries are index ranges, rebalanced every ``rebalanceInterval``
+    steps so each worker gets an equal share of last step's neighbor pairs.
+    
+    Workers are forked, so the state and the kernel parameters (configs,
+    NFW table) are inherited rather than pickled; where fork is unavailable
+    (or ``workers`` is 1) the same domains are stepped in-process. Only the
+    Euler integrator is supported, the particle set is fixed and configs
+    are read once when the stepper starts (audio energy is read every
+    step), and queued audio frames are not processed.
+    """
+    
+    def __init__(self, simulator: 'Simulator', config: Optional[DomainConfig] = None,
+                 positions: Optional[np.ndarray] = None):
+        if simulator.timestep.integrator != "euler" or simulator.timestep.blockSteps:
+            raise ValueError("Distributed stepping supports the Euler integrator without block steps")
+        self.simulator = simulator
+        self.config = config if config is not None else simulator.domain
+        self.workers = self.config.workers or os.cpu_count() or 1
+        self.steps: int = 0
+        self.migrations: int = 0
+        self.rebalances: int = 0
+        self._last_stats: List[Dict] = []
+        self._last_cost: Optional[np.ndarray] = None
+        
+        state = self._initial_state(positions)
+        self.n = n = state.shape[1]
+        self.workers = max(1, min(self.workers, n))
+        nbytes = max(8, len(DOMAIN_STATE_COLUMNS) * n * 8)
+        # Anonymous shared mappings, inherited by forked workers
+        self._maps = [mmap.mmap(-1, nbytes), mmap.mmap(-1, nbytes), mmap.mmap(-1, max(8, n * 8))]
+        self._buffers = [np.ndarray((len(DOMAIN_STATE_COLUMNS), n), np.float64, buf)
+                         for buf in self._maps[:2]]
+        self._order = np.ndarray((n,), np.int64, self._maps[2])
+        self._current = 0
+        self._buffers[0][:] = state
+        self.bounds = np.linspace(0, n, self.workers + 1).round().astype(np.int64)
+        self._params = _domain_params(simulator, self.config.chunkSize)
+        
+        self._procs = []
+        self._conns = []
+        import multiprocessing
+        if self.workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+            barrier = ctx.Barrier(self.workers)
+            for rank in range(self.workers):
+                parent_conn, child_conn = ctx.Pipe()
+                proc = ctx.Process(target=_domain_worker, daemon=True,
+                                   args=(rank, child_conn, barrier, self._buffers, self._order,
+                                         self._params))
+                proc.start()
+                child_conn.close()
+                self._procs.append(proc)
+                self._conns.append(parent_conn)
+    
+    def _initial_state(self, positions: Optional[np.ndarray]) -> np.ndarray:
+        sim = self.simulator
+        if positions is not None:
+            positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+            state = np.zeros((len(DOMAIN_STATE_COLUMNS), len(positions)))
+            state[0:3] = positions.T
+            state[_DOMAIN_COL["mass"]] = 1.0
+            state[_DOMAIN_COL["theta"]] = sim.rng.random(len(positions)) * 2 * np.pi
+        else:
+            state = _particle_state_columns(sim.particles)
+        state[_DOMAIN_COL["index"]] = np.arange(state.shape[1])
+        return state
+    
+    @property
+    def columns(self) -> np.ndarray:
+        """Current state buffer (rows in the x order of the last step)"""
+        return self._buffers[self._current]
+    
+    def _rebalance(self, order: np.ndarray):
+        """Slab boundaries at equal shares of per-particle cost (1 + neighbors)"""
+        cost = 1.0 + self.columns[_DOMAIN_COL["degree"]][order]
+        cumulative = np.cumsum(cost)
+        targets = cumulative[-1] * np.arange(1, self.workers) / self.workers
+        inner = np.searchsorted(cumulative, targets) + 1
+        bounds = np.concatenate(([0], inner, [self.n]))
+        # Keep every domain non-empty
+        for k in range(1, self.workers):
+            bounds[k] = min(max(bounds[k], bounds[k - 1] + 1), self.n - self.workers + k)
+        self.bounds = bounds.astype(np.int64)
+        self.rebalances += 1
+    
+    def step(self, dt: Optional[float] = None) -> Dict:
+        """Advance every domain by one tick; returns per-step stats"""
+        sim = self.simulator
+        if dt is None:
+            dt = sim.timestep.dt
+        n = self.n
+        if n == 0:
+            return {"pairs": 0}
+        src = self._current
+        dst = 1 - src
+        x = self._buffers[src][0]
+        order = np.argsort(x, kind='stable')
+        self._order[:] = order
+        interval = self.config.rebalanceInterval
+        if interval and self.steps and self.steps % interval == 0:
+            self._rebalance(order)
+        bounds = self.bounds
+        # Particles whose owning domain changed with the re-sort
+        owner = np.searchsorted(bounds, np.arange(n), 'right')
+        self.migrations += int(np.count_nonzero(owner != owner[order]))
+        sorted_x = x[order]
+        margin = sim.physics.rCutoff * (1 + 1e-9)
+        halos = [(int(np.searchsorted(sorted_x, sorted_x[lo] - margin, 'left')),
+                  int(np.searchsorted(sorted_x, sorted_x[hi - 1] + margin, 'right')))
+                 for lo, hi in zip(bounds[:-1], bounds[1:])]
+        step_params = _domain_step_params(sim)
+        
+        if self._procs:
+            message = (src, dst, n, bounds.tolist(), halos, dt, step_params)
+            for conn in self._conns:
+                conn.send(message)
+            stats = [conn.recv() for conn in self._conns]
+            errors = [s["error"] for s in stats if "error" in s]
+            if errors:
+                self.close()
+                raise RuntimeError("; ".join(errors))
+        else:
+            buffer = self._buffers[dst]
+            buffer[:] = self._buffers[src][:, order]
+            params = self._params
+            params.update(step_params)
+            stats, results = [], []
+            for rank, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+                start = time.perf_counter()
+                updates, s = _domain_step_rows(buffer, lo, hi, *halos[rank], dt, params)
+                s["seconds"] = time.perf_counter() - start
+                results.append(updates)
+                stats.append(s)
+            for (lo, hi), updates in zip(zip(bounds[:-1], bounds[1:]), results):
+                _write_domain_rows(buffer, lo, hi, updates)
+        
+        self._current = dst
+        self.steps += 1
+        self._last_stats = stats
+        if sim.timestep.adaptive:
+            sim.timestep.dt = _adaptive_dt_from_stats(sim.timestep, stats)
+        return {"pairs": sum(s["pairs"] for s in stats)}
+    
+    def state(self) -> Dict[str, np.ndarray]:
+        """Copy of every column in original particle order"""
+        columns = self.columns
+        order = np.argsort(columns[_DOMAIN_COL["index"]], kind='stable')
+        return {name: columns[k][order] for k, name in enumerate(DOMAIN_STATE_COLUMNS)}
+    
+    def sync_to_simulator(self):
+        """Write the stepped state back to the simulator's Particle objects
+        
+        ψ integrals accumulated since the last sync are added to the
+        simulator's accumulators. Neighbor lists are cleared so the next
+        ``Simulator.tick`` queries them afresh.
+        """
+        sim = self.simulator
+        if len(sim.particles) != self.n:
+            raise ValueError("Stepper was built from positions, not the simulator's particles")
+        state = self.state()
+        _apply_particle_state(sim, np.stack([state[name] for name in DOMAIN_STATE_COLUMNS]))
+        sim.sync_clusters.set_pairs(None, None)
+        self.columns[_DOMAIN_COL["psiV"]] = 0.0
+        self.columns[_DOMAIN_COL["psiX12"]] = 0.0
+    
+    def get_stats(self) -> Dict:
+        """Per-domain sizes, halo pairs and compute time from the last step"""
+        seconds = [s.get("seconds", 0.0) for s in self._last_stats]
+        mean = sum(seconds) / len(seconds) if seconds else 0.0
+        return {
+            "workers": self.workers,
+            "processes": len(self._procs),
+            "steps": self.steps,
+            "migrations": self.migrations,
+            "rebalances": self.rebalances,
+            "domainSizes": np.diff(self.bounds).tolist(),
+            "domainPairs": [s["pairs"] for s in self._last_stats],
+            "domainSeconds": seconds,
+            "loadImbalance": max(seconds) / mean if mean > 0 else 1.0
+        }
+    
+    def close(self):
+        """Stop the worker processes"""
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._procs = []
+        self._conns = []
+    
+    def __enter__(self) -> 'DistributedStepper':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SyncClusterTracker:
+    """CST v2.0 additive: Phase-locked particle clusters, maintained incrementally
+    
+    Two particles are locked when they are neighbors and their wrapped
+    phase difference is below ``sync.clusterPhaseTolerance``. Neighbors are
+    the pairs handed over by the last chunked tick (``set_pairs``), else
+    the particles' neighbor lists, else (after a distributed step) a cell
+    search within rCutoff over all particles. Components of the
+    locked-edge graph live in a union-find. Each update diffs the edge set
+    against the previous one: new edges are unions, and only components
+    that lost an edge are reset and re-joined from their surviving edges.
+    Particles are tracked by id, so spawned particles extend the
+    structure; any other change to the particle list rebuilds it.
+    """
+    
+    def __init__(self, sim: 'Simulator'):
+        self.simulator = sim
+        self.set_pairs(None, None)
+        self.reset()
+    
+    def reset(self):
+        self._ids: List[str] = []
+        self._parent: List[int] = []
+        self._edges = np.zeros(0, dtype=np.int64)  # sorted keys (i << 32) | j with i < j
+        self.last_update: Dict = {}
+    
+    def set_pairs(self, i: Optional[np.ndarray], j: Optional[np.ndarray]):
+        """Neighbor pairs (both directions) the last tick coupled, or None to
+        fall back to neighbor lists; valid while the particle ids are unchanged"""
+        if i is None:
+            self._pair_keys: Optional[np.ndarray] = None
+            self._pair_ids: List[str] = []
+            return
+        keep = i < j
+        self._pair_keys = np.sort((i[keep] << 32) | j[keep])
+        self._pair_ids = [p.id for p in self.simulator.particles]
+    
+    def _find(self, i: int) -> int:
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # path halving
+            i = parent[i]
+        return i
+    
+    def _union_edges(self, keys: np.ndarray):
+        parent = self._parent
+        find = self._find
+        for key in keys.tolist():
+            ri, rj = find(key >> 32), find(key & 0xFFFFFFFF)
+            if ri != rj:
+                # Smallest index is the root, so labels don't depend on edge order
+                parent[max(ri, rj)] = min(ri, rj)
+    
+    def _labels(self) -> np.ndarray:
+        """Root of every particle (also fully compresses the union-find)"""
+        parent = np.array(self._parent, dtype=np.int64)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        self._parent = parent.tolist()
+        return parent
+    
+    def _locked_edges(self, particles: List['Particle'], ids: List[str],
+                      theta: np.ndarray) -> np.ndarray:
+        n = len(particles)
+        if n < 2:
+            return np.zeros(0, dtype=np.int64)
+        keys = self._pair_keys
+        if keys is not None and ids[:len(self._pair_ids)] == self._pair_ids:
+            # The chunked tick's own pairs: already unique and sorted
+            i, j = keys >> 32, keys & 0xFFFFFFFF
+            dtheta = np.mod(theta[j] - theta[i] + np.pi, 2 * np.pi) - np.pi
+            return keys[np.abs(dtheta) < self.simulator.sync.clusterPhaseTolerance]
+        counts = np.fromiter((len(p.neighbors) for p in particles), dtype=np.int64, count=n)
+        if counts.any():
+            # The coupling graph the tick used (stale indices skipped as in tick)
+            i = np.repeat(np.arange(n), counts)
+            j = np.fromiter((j for p in particles for j in p.neighbors), dtype=np.int64,
+                            count=int(counts.sum()))
+            keep = (j < n) & (i != j)
+            i, j = np.minimum(i[keep], j[keep]), np.maximum(i[keep], j[keep])
+        else:
+            # Distributed steps leave no neighbor lists: search within rCutoff
+            pos = np.array([(p.x, p.y, p.z) for p in particles], dtype=np.float64).T
+            index = _CellIndex(pos, 0, n, self.simulator.physics.rCutoff)
+            i, j, _, _ = _domain_pairs(pos, 0, n, index)
+            keep = i < j
+            i, j = i[keep], j[keep]
+        dtheta = np.mod(theta[j] - theta[i] + np.pi, 2 * np.pi) - np.pi
+        locked = np.abs(dtheta) < self.simulator.sync.clusterPhaseTolerance
+        return np.unique((i[locked] << 32) | j[locked])
+    
+    def update(self) -> np.ndarray:
+        """Bring the components up to date; returns every particle's root"""
+        particles = self.simulator.particles
+        ids = [p.id for p in particles]
+        known = len(self._ids)
+        rebuilt = ids[:known] != self._ids
+        if rebuilt:
+            self.reset()
+            known = 0
+        self._ids = ids
+        self._parent.extend(range(known, len(ids)))
+        
+        theta = np.array([p.theta for p in particles], dtype=np.float64)
+        edges = self._locked_edges(particles, ids, theta)
+        added = np.setdiff1d(edges, self._edges, assume_unique=True)
+        removed = np.setdiff1d(self._edges, edges, assume_unique=True)
+        self._edges = edges
+        
+        dirty_roots = np.zeros(0, dtype=np.int64)
+        dirty = np.zeros(0, dtype=np.int64)
+        if len(removed):
+            # Re-split only the components that lost an edge. Their surviving
+            # edges stay inside them (an edge to another component would have
+            # merged the two), so both endpoints are dirty.
+            labels = self._labels()
+            dirty_roots = np.unique(labels[removed >> 32])
+            dirty = np.flatnonzero(np.isin(labels, dirty_roots))
+            parent = self._parent
+            for i in dirty.tolist():
+                parent[i] = i
+            self._union_edges(edges[np.isin(edges >> 32, dirty)])
+        self._union_edges(added)
+        
+        self.last_update = {
+            "edges": int(len(edges)),
+            "added": int(len(added)),
+            "removed": int(len(removed)),
+            "dirtyComponents": int(len(dirty_roots)),
+            "dirtyParticles": int(len(dirty)),
+            "rebuilt": bool(rebuilt)
+        }
+        return self._labels()
+    
+    def report(self) -> Dict:
+        """Clusters of at least ``sync.clusterMinSize`` particles, largest first,
+        each with its size, order parameter r, mean θ and particle ids"""
+        labels = self.update()
+        particles = self.simulator.particles
+        if len(particles) == 0:
+            return {"clusters": [], "clusterCount": 0, "lockedParticles": 0, "largest": 0,
+                    "update": self.last_update}
+        theta = np.array([p.theta for p in particles], dtype=np.float64)
+        roots, inverse, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+        re = np.bincount(inverse, weights=np.cos(theta))
+        im = np.bincount(inverse, weights=np.sin(theta))
+        r = np.hypot(re, im) / sizes
+        mean_theta = np.arctan2(im, re)
+        members = np.split(np.argsort(inverse, kind='stable'), np.cumsum(sizes)[:-1])
+        order = np.lexsort((roots, -sizes))
+        clusters = [
+            {
+                "size": int(sizes[c]),
+                "r": float(r[c]),
+                "meanTheta": float(mean_theta[c]),
+                "particleIds": [self._ids[i] for i in members[c].tolist()]
+            }
+            for c in order.tolist() if sizes[c] >= self.simulator.sync.clusterMinSize
+        ]
+        return {
+            "clusters": clusters,
+            "clusterCount": len(clusters),
+            "lockedParticles": sum(c["size"] for c in clusters),
+            "largest": clusters[0]["size"] if clusters else 0,
+            "update": self.last_update
+        }
+
+
 class Simulator:
     """CST v2.0 additive: Main simulation engine"""
     
@@ -329,12 +3708,20 @@ class Simulator:
         self.sync = SyncConfig()
         self.timestep = TimestepConfig()
         self.dm_params = DarkMatterParams()
+        # CST v2.0 additive: NFW lookup table, rebuilt when dm_params change
+        self._dm_table: Optional[NFWTable] = None
         
         self.particles: List[Particle] = []
         self.token_stream = TokenStream()
         self.recorder = Recorder()
         self.mode: SimulationMode = SimulationMode.LIVE
         self.seed: Optional[int] = None
+        # CST v2.0 additive: Per-simulator RNG and particle ID counter, so
+        # simulators in one process never share random streams
+        self.rng: np.random.Generator = np.random.default_rng()
+        self._next_particle_index: int = 0
+        # CST v2.0 additive: Bulk particle state precision (see PRECISIONS)
+        self.precision: str = "float64"
         
         # CST v2.0 additive: Audio state for real-time modulation
         self.current_audio_energy: float = 0.0
@@ -349,12 +3736,79 @@ class Simulator:
         self.conservation_E0: float = 0.0
         self.conservation_P0: np.ndarray = np.zeros(3)
         self.conservation_L0: np.ndarray = np.zeros(3)
+        
+        # CST v2.0 additive: End-to-end latency instrumentation
+        self.latency = LatencyTracker()
+        self._frames_awaiting_tick: List[AudioFrame] = []
+        
+        # CST v2.0 additive: Block timestep levels from the last macro step
+        self.block_levels: np.ndarray = np.zeros(0, dtype=np.int64)
+        
+        # CST v2.0 additive: Per-phase tick profiler
+        self.profiler = TickProfiler()
+        
+        # CST v2.0 additive: Audio peak-to-particle matching by frequency
+        self.frequency_match = FrequencyMatchConfig()
+        
+        # CST v2.0 additive: Optional token coalescing (off by default)
+        self.coalescing = CoalescingConfig()
+        self.coalescer = TokenCoalescer(self.coalescing)
+        
+        # CST v2.0 additive: Binary checkpointing (periodic when configured)
+        self.checkpointer = Checkpointer(self)
+        
+        # CST v2.0 additive: Shared-memory publication for out-of-process readers
+        self.shared_publisher: Optional[SharedStatePublisher] = None
+        
+        # CST v2.0 additive: Process-pool domain decomposition (run_distributed)
+        self.domain = DomainConfig()
+        
+        # CST v2.0 additive: Chunked array kernels on a shared thread pool
+        self.parallel = ParallelConfig()
+        
+        # CST v2.0 additive: Incremental phase-locked cluster detection
+        self.sync_clusters = SyncClusterTracker(self)
     
     def set_seed(self, seed: int):
         """CST v2.0 additive: Set deterministic seed"""
         self.seed = seed
-        np.random.seed(seed)
-        # Note: If using torch, also set torch.manual_seed(seed)
+        self.rng = np.random.default_rng(seed)
+        # Note: If using torch, use a per-simulator torch.Generator seeded here
+    
+    def set_precision(self, precision: str):
+        """CST v2.0 additive: Select float64 or float32 particle state"""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision {precision!r}; expected one of {tuple(PRECISIONS)}")
+        self.precision = precision
+        if precision == "float32":
+            self._quantize_particle_state()
+    
+    @property
+    def state_dtype(self) -> type:
+        """CST v2.0 additive: dtype of bulk particle arrays in the vectorized kernels"""
+        return PRECISIONS[self.precision]
+    
+    def _quantize_particle_state(self):
+        """CST v2.0 additive: Round particle state to float32 in one array pass"""
+        particles = self.particles
+        if not particles:
+            return
+        state = np.array([(p.x, p.y, p.z, p.velocity[0], p.velocity[1], p.velocity[2],
+                           p.x12, p.m12, p.theta) for p in particles], dtype=np.float32)
+        for p, row, velocity in zip(particles, state.tolist(),
+                                    state[:, 3:6].astype(np.float64)):
+            p.x, p.y, p.z = row[0], row[1], row[2]
+            p.velocity = velocity
+            p.x12, p.m12, p.theta = row[6], row[7], row[8]
+    
+    def add_particle(self, x: float, y: float, z: float, frequency: float = 0.0,
+                     parent_id: Optional[str] = None, theta: Optional[float] = None) -> Particle:
+        """CST v2.0 additive: Create a particle from this simulator's RNG and ID sequence"""
+        particle = Particle(x, y, z, frequency, parent_id, rng=self.rng,
+                            particle_id=f"particle_{self._next_particle_index}", theta=theta)
+        self._next_particle_index += 1
+        self.particles.append(particle)
+        return particle
     
     def start_audio(self):
         """Start audio capture thread"""
@@ -371,13 +3825,25 @@ class Simulator:
         if dt is None:
             dt = self.timestep.dt
         
+        prof = self.profiler
+        tick_start = time.perf_counter()
+        t = prof.mark()
+        
         # Process audio frames from queue
+        frames = []
         while not self.processed_audio_queue.empty():
-            frame = self.processed_audio_queue.get()
-            self._process_audio_frame(frame)
+            frames.append(self.processed_audio_queue.get())
+        self.process_audio_frames(frames)
+        t = prof.lap("audio", t)
         
         # Update particles
-        if len(self.particles) > 0:
+        if len(self.particles) > 0 and self._use_chunked_kernels():
+            # CST v2.0 additive: Every particle phase as chunked array kernels
+            t = self._tick_chunked(dt, t)
+        elif len(self.particles) > 0:
+            # Neighbor lists are the coupling graph from here on
+            self.sync_clusters.set_pairs(None, None)
+            
             # Build spatial index
             spatial_index = self._build_spatial_index()
             
@@ -386,22 +3852,27 @@ class Simulator:
                 if not pi.neighbors:
                     pi.neighbors = self._query_neighbors(i, self.particles, spatial_index, 
                                                          self.physics.rCutoff)
+            t = prof.lap("neighbors", t)
             
             # Compute forces and energies
             if self.physics.gravEnabled:
                 self._compute_gravitational_forces(spatial_index)
                 self._compute_gravitational_energy(spatial_index)
+                t = prof.lap("gravity", t)
             
             if self.physics.dmEnabled:
                 self._compute_dark_matter_potential()
+                t = prof.lap("darkMatter", t)
             
             # Compute synaptic strength (neighbors already set above)
             self._compute_synaptic_strength(spatial_index)
+            t = prof.lap("synaptic", t)
             
             # Update adaptive states
             for p in self.particles:
                 p.update_x12(dt, self.adapt.k, self.adapt.gamma)
                 p.update_memory_state(dt, self.adapt.alpha)
+            t = prof.lap("adaptive", t)
             
             # Update phases
             for i, p in enumerate(self.particles):
@@ -411,9 +3882,16 @@ class Simulator:
                 else:
                     neighbors = []
                 p.update_phase(dt, neighbors, self.sync.Ksync)
+            t = prof.lap("phase", t)
             
             # Update particle positions (Lorenz + gravity blend)
-            self._update_particle_positions(dt)
+            if self.timestep.blockSteps:
+                self._integrate_block_steps(dt)
+            else:
+                self._update_particle_positions(dt)
+            if self.precision == "float32":
+                self._quantize_particle_state()
+            t = prof.lap("integration", t)
             
             # Update cosmic energies
             for p in self.particles:
@@ -421,14 +3899,229 @@ class Simulator:
                 K = 0.5 * p.mass * v2
                 p.Ec = K + p.Ugrav + p.Udm
                 p.vi = p.Ec / H if H > 0 else 0.0
-                p._update_11d_projection()
+            t = prof.lap("energy", t)
             
             # Update ψ accumulators
             self._update_psi_accumulators(dt)
+            t = prof.lap("psi", t)
             
             # Adaptive timestep
             if self.timestep.adaptive:
                 self.timestep.dt = self._compute_adaptive_dt()
+                t = prof.lap("adaptiveDt", t)
+        
+        # CST v2.0 additive: Keep the phase-locked clusters current
+        if self.sync.clusterEveryTick:
+            self.sync_clusters.update()
+            t = prof.lap("clusters", t)
+        
+        # Frames ingested since the last tick have now moved their particles
+        if self._frames_awaiting_tick:
+            now = time.monotonic()
+            for frame in self._frames_awaiting_tick:
+                self.latency.stamp(frame, "tick", now)
+            self._frames_awaiting_tick = []
+        
+        prof.record_tick(time.perf_counter() - tick_start)
+        self.checkpointer.maybe_checkpoint()
+        if self.shared_publisher is not None:
+            self.shared_publisher.publish()
+    
+    def _use_chunked_kernels(self) -> bool:
+        """CST v2.0 additive: Chunked kernels cover the Euler, single-level step only"""
+        return (self.parallel.enabled and self.timestep.integrator == "euler"
+                and not self.timestep.blockSteps)
+    
+    def _tick_chunked(self, dt: float, t: float) -> float:
+        """CST v2.0 additive: Neighbor, force, adaptive, phase, integration,
+        energy and ψ phases over fixed particle chunks on the kernel pool
+        
+        Each chunk reads start-of-step state and writes only its own rows,
+        and chunk boundaries depend only on ``parallel.chunkSize``, so results
+        are identical for any thread count. Unlike the per-particle path,
+        neighbor lists are rebuilt every tick and phases couple to
+        start-of-step neighbor phases; the rebuilt lists are left on the
+        particles and the pairs go to the cluster tracker. ``t`` is the
+        profiler mark, returned advanced: in detailed mode each chunk laps
+        its own stages, and the pooled wall time is split across phases in
+        proportion.
+        """
+        prof = self.profiler
+        spent: Dict[str, float] = {}  # detailed mode: this tick's seconds per phase
+        state = _particle_state_columns(self.particles, self.state_dtype)
+        n = state.shape[1]
+        chunk = max(1, self.parallel.chunkSize)
+        params = _domain_params(self, chunk)
+        index = _CellIndex(state[0:3], 0, n, self.physics.rCutoff)
+        ranges = [(lo, min(n, lo + chunk)) for lo in range(0, n, chunk)]
+        if prof.detailed:
+            now = prof.mark()
+            spent["neighbors"] = now - t
+            t = now
+        
+        profilers = [TickProfiler(detailed=True) if prof.detailed else None for _ in ranges]
+        chunk_pairs: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in ranges]
+        
+        def run(k: int):
+            lo, hi = ranges[k]
+            return _domain_step_rows(state, lo, hi, 0, n, dt, params, index,
+                                     profilers[k], chunk_pairs[k])
+        
+        pool = _kernel_pool(self.parallel.threads)
+        results = list(pool.map(run, range(len(ranges)))) if pool is not None and len(ranges) > 1 \
+            else [run(k) for k in range(len(ranges))]
+        if prof.detailed:
+            now = prof.mark()
+            chunk_seconds = {name: sum(cp.phase_seconds[name] for cp in profilers)
+                             for name in TICK_PHASES}
+            total = sum(chunk_seconds.values())
+            for name, seconds in chunk_seconds.items():
+                if seconds > 0:
+                    spent[name] = spent.get(name, 0.0) + (now - t) * seconds / total
+            t = now
+        # float32 kernel outputs are exact in float64; energies and ψ keep full precision
+        stepped = state.astype(np.float64, copy=False)
+        for (lo, hi), (updates, _) in zip(ranges, results):
+            _write_domain_rows(stepped, lo, hi, updates)
+        pairs = [p for chunk in chunk_pairs for p in chunk]
+        pair_i = np.concatenate([p[0] for p in pairs]) if pairs else np.zeros(0, dtype=np.int64)
+        pair_j = np.concatenate([p[1] for p in pairs]) if pairs else np.zeros(0, dtype=np.int64)
+        _apply_particle_state(self, stepped, _neighbor_lists(n, pair_i, pair_j))
+        self.sync_clusters.set_pairs(pair_i, pair_j)
+        if prof.detailed:
+            now = prof.mark()
+            spent["integration"] = spent.get("integration", 0.0) + now - t
+            t = now
+            for name, seconds in spent.items():
+                prof.add(name, seconds)
+        if self.timestep.adaptive:
+            self.timestep.dt = _adaptive_dt_from_stats(self.timestep, [r[1] for r in results])
+            t = prof.lap("adaptiveDt", t)
+        return t
+    
+    def save_checkpoint(self, path: str, background: bool = False) -> bool:
+        """CST v2.0 additive: Dump full simulator state to a binary checkpoint
+        
+        With ``background=True`` only the in-memory snapshot happens here and
+        the file is written on a worker thread (returns False if one is busy).
+        """
+        if background:
+            return self.checkpointer.save_async(path)
+        self.checkpointer.save(path)
+        return True
+    
+    @classmethod
+    def from_checkpoint(cls, path: str) -> 'Simulator':
+        """CST v2.0 additive: Warm-start a simulator from a checkpoint file"""
+        return Checkpointer.restore(path, cls())
+    
+    def start_periodic_checkpoint(self, path: str, interval: float = 30.0):
+        """CST v2.0 additive: Checkpoint to ``path`` every ``interval`` seconds after ticks"""
+        self.checkpointer.path = path
+        self.checkpointer.interval = interval
+        self.checkpointer.last_checkpoint_time = time.monotonic()
+        # Encode the backlog now rather than in the first checkpoint's tick
+        self.token_stream.track_encoding()
+    
+    def stop_periodic_checkpoint(self):
+        """CST v2.0 additive: Stop periodic checkpointing and flush any in-flight write"""
+        self.checkpointer.path = None
+        self.checkpointer.wait()
+    
+    def start_shared_state(self, name: Optional[str] = None,
+                           capacity: int = 4096) -> 'SharedStatePublisher':
+        """CST v2.0 additive: Publish state to shared memory after every tick"""
+        self.stop_shared_state()
+        self.shared_publisher = SharedStatePublisher(self, name, capacity)
+        self.shared_publisher.publish()
+        return self.shared_publisher
+    
+    def stop_shared_state(self):
+        """CST v2.0 additive: Stop publishing and unlink the segment"""
+        if self.shared_publisher is not None:
+            self.shared_publisher.close()
+            self.shared_publisher = None
+    
+    def run_distributed(self, steps: int, dt: Optional[float] = None) -> Dict:
+        """CST v2.0 additive: Advance ``steps`` ticks across a process pool
+        
+        Spatial domains are stepped in parallel by DistributedStepper (see
+        ``self.domain``); the result is written back to the particles.
+        Returns the stepper's stats.
+        """
+        with DistributedStepper(self, self.domain) as stepper:
+            for _ in range(steps):
+                stepper.step(dt)
+            stepper.sync_to_simulator()
+            return stepper.get_stats()
+    
+    def get_latency_stats(self) -> Dict:
+        """CST v2.0 additive: Per-stage audio-to-token/tick latency (seconds)"""
+        return self.latency.summary()
+    
+    def get_tick_stats(self) -> Dict:
+        """CST v2.0 additive: Tick profiler statistics (seconds)"""
+        return self.profiler.stats()
+    
+    def prometheus_metrics(self) -> str:
+        """CST v2.0 additive: Engine metrics in Prometheus text format"""
+        stats = self.profiler.stats()
+        lines = [
+            "# HELP cosmic_ticks_total Simulator ticks executed.",
+            "# TYPE cosmic_ticks_total counter",
+            f"cosmic_ticks_total {stats['ticks']}",
+            "# HELP cosmic_tick_seconds_total Wall time spent in Simulator.tick().",
+            "# TYPE cosmic_tick_seconds_total counter",
+            f"cosmic_tick_seconds_total {stats['totalSeconds']:.9g}",
+            "# HELP cosmic_tick_last_seconds Duration of the most recent tick.",
+            "# TYPE cosmic_tick_last_seconds gauge",
+            f"cosmic_tick_last_seconds {stats['lastTickSeconds']:.9g}",
+            "# HELP cosmic_tick_detailed Whether per-phase timers are enabled.",
+            "# TYPE cosmic_tick_detailed gauge",
+            f"cosmic_tick_detailed {int(stats['detailed'])}",
+            "# HELP cosmic_tick_phase_seconds_total Wall time per tick phase (detailed mode).",
+            "# TYPE cosmic_tick_phase_seconds_total counter"
+        ]
+        for name, phase in stats["phases"].items():
+            lines.append(f'cosmic_tick_phase_seconds_total{{phase="{name}"}} {phase["totalSeconds"]:.9g}')
+        lines += [
+            "# HELP cosmic_tick_phase_calls_total Timed executions per tick phase (detailed mode).",
+            "# TYPE cosmic_tick_phase_calls_total counter"
+        ]
+        for name, phase in stats["phases"].items():
+            lines.append(f'cosmic_tick_phase_calls_total{{phase="{name}"}} {phase["calls"]}')
+        
+        lines += [
+            "# HELP cosmic_pipeline_latency_seconds Capture-to-stage latency.",
+            "# TYPE cosmic_pipeline_latency_seconds summary"
+        ]
+        for stage, hist in self.latency.histograms.items():
+            summary = hist.summary()
+            lines.append(f'cosmic_pipeline_latency_seconds{{stage="{stage}",quantile="0.5"}} {summary["p50"]:.9g}')
+            lines.append(f'cosmic_pipeline_latency_seconds{{stage="{stage}",quantile="0.99"}} {summary["p99"]:.9g}')
+            lines.append(f'cosmic_pipeline_latency_seconds_sum{{stage="{stage}"}} {hist.total:.9g}')
+            lines.append(f'cosmic_pipeline_latency_seconds_count{{stage="{stage}"}} {hist.count}')
+        
+        lines += [
+            "# HELP cosmic_particles Live particle count.",
+            "# TYPE cosmic_particles gauge",
+            f"cosmic_particles {len(self.particles)}",
+            "# HELP cosmic_tokens_total Tokens in the token stream.",
+            "# TYPE cosmic_tokens_total counter",
+            f"cosmic_tokens_total {len(self.token_stream.tokens)}",
+            "# HELP cosmic_timestep_seconds Current simulation dt.",
+            "# TYPE cosmic_timestep_seconds gauge",
+            f"cosmic_timestep_seconds {self.timestep.dt:.9g}"
+        ]
+        return "\n".join(lines) + "\n"
+    
+    def get_11d_projection(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CST v2.0 additive: N x 11 position and velocity projections for all particles"""
+        particles = self.particles
+        dtype = self.state_dtype
+        positions = np.array([(p.x, p.y, p.z) for p in particles], dtype=dtype).reshape(-1, 3)
+        velocities = np.array([p.velocity for p in particles], dtype=dtype).reshape(-1, 3)
+        return project_11d(positions), project_11d(velocities)
     
     def _build_spatial_index(self) -> Dict:
         """Build spatial index for neighbor queries"""
@@ -544,6 +4237,13 @@ class Simulator:
             
             pi.Ugrav = U
     
+    def dark_matter_table(self) -> NFWTable:
+        """CST v2.0 additive: NFW lookup table for the current dm_params"""
+        key = (self.dm_params.rho0, self.dm_params.rs, self.physics.G)
+        if self._dm_table is None or self._dm_table.key != key:
+            self._dm_table = NFWTable(*key)
+        return self._dm_table
+    
     def _compute_dark_matter_potential(self):
         """Compute dark matter potential (NFW profile)"""
         if not self.physics.dmEnabled:
@@ -551,15 +4251,15 @@ class Simulator:
                 p.Udm = 0.0
             return
         
-        for p in self.particles:
-            r = np.sqrt(p.x ** 2 + p.y ** 2 + p.z ** 2)
-            r_rs = r / self.dm_params.rs
-            
-            # NFW density profile
-            rho = self.dm_params.rho0 / (r_rs * (1 + r_rs) ** 2)
-            
-            # Simplified potential
-            p.Udm = -self.physics.G * p.mass * rho * 4 * np.pi * r ** 2 / 3
+        # CST v2.0 additive: One vectorized lookup-table pass; the NFW pull is
+        # added to the acceleration the integrators blend with the Lorenz flow
+        particles = self.particles
+        positions = np.array([(p.x, p.y, p.z) for p in particles], dtype=np.float64).reshape(-1, 3)
+        phi, acc = self.dark_matter_table().evaluate(*positions.T)
+        grav = self.physics.gravEnabled
+        for p, u, a in zip(particles, phi.tolist(), acc.T.copy()):
+            p.Udm = p.mass * u
+            p.acceleration = p.acceleration + a if grav and hasattr(p, 'acceleration') else a
     
     def _compute_synaptic_strength(self, spatial_index: Dict):
         """Compute synaptic strength Ω with similarity"""
@@ -589,7 +4289,7 @@ class Simulator:
             
             pi.omega = omega_sum
     
-    def _update_particle_positions(self, dt: float):
+    def _update_particle_positions(self, dt: float, particles: Optional[List[Particle]] = None):
         """Update particle positions with Lorenz + gravity blend, audio-modulated"""
         # CST v2.0 additive: Audio-modulated Lorenz parameters
         base_sigma = 10.0
@@ -601,14 +4301,20 @@ class Simulator:
         sigma = base_sigma * audio_modulation
         rho = base_rho * (1.0 + self.current_audio_energy * self.audio_sensitivity * 0.3)
         
-        for p in self.particles:
+        # CST v2.0 additive: Higher-order / symplectic integrators
+        if self.timestep.integrator != "euler":
+            self._integrate_positions(dt, self.particles if particles is None else particles,
+                                      sigma, rho, beta)
+            return
+        
+        for p in (self.particles if particles is None else particles):
             # Lorenz equations with audio modulation
             dx_lorenz = sigma * (p.y - p.x) * dt
             dy_lorenz = (p.x * (rho - p.z) - p.y) * dt
             dz_lorenz = (p.x * p.y - beta * p.z) * dt
             
             # Blend with gravity
-            if self.physics.gravEnabled and hasattr(p, 'acceleration'):
+            if (self.physics.gravEnabled or self.physics.dmEnabled) and hasattr(p, 'acceleration'):
                 dx_grav = p.acceleration[0] * dt
                 dy_grav = p.acceleration[1] * dt
                 dz_grav = p.acceleration[2] * dt
@@ -642,11 +4348,166 @@ class Simulator:
             
             p.velocity = np.array([vx, vy, vz])
     
+    def _integrate_positions(self, dt: float, particles: List[Particle], sigma: float,
+                             rho: float, beta: float):
+        """CST v2.0 additive: Vectorized RK4 / split leapfrog position update
+        
+        ``rk4`` integrates the same blended flow as Euler (gravity held at its
+        start-of-step value). ``leapfrog`` applies a Lorenz half-step (RK4),
+        a kick-drift-kick gravity step on ``grav_velocity`` with accelerations
+        refreshed at the drifted positions, then another Lorenz half-step.
+        Velocity is the net displacement over dt, as in the Euler path.
+        """
+        if self.timestep.integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator {self.timestep.integrator!r}; "
+                             f"expected one of {INTEGRATORS}")
+        if not particles:
+            return
+        blend = self.physics.blendLorenz
+        # CST v2.0 additive: Gravity and the NFW pull share p.acceleration
+        grav = self.physics.gravEnabled or self.physics.dmEnabled
+        
+        def lorenz(X: np.ndarray) -> np.ndarray:
+            x, y, z = X[:, 0], X[:, 1], X[:, 2]
+            return np.column_stack((sigma * (y - x), x * (rho - z) - y, x * y - beta * z))
+        
+        def rk4(f, X: np.ndarray, h: float) -> np.ndarray:
+            k1 = f(X)
+            k2 = f(X + 0.5 * h * k1)
+            k3 = f(X + 0.5 * h * k2)
+            k4 = f(X + h * k3)
+            return X + (h / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+        
+        dtype = self.state_dtype
+        
+        def accelerations() -> np.ndarray:
+            return np.array([getattr(p, 'acceleration', (0.0, 0.0, 0.0)) for p in particles],
+                            dtype=dtype).reshape(len(particles), 3)
+        
+        X0 = np.array([(p.x, p.y, p.z) for p in particles], dtype=dtype)
+        with np.errstate(over='ignore', invalid='ignore'):
+            if not grav:
+                X = rk4(lorenz, X0, dt)
+            elif self.timestep.integrator == "rk4":
+                A = accelerations()
+                X = rk4(lambda Y: blend * lorenz(Y) + (1 - blend) * A, X0, dt)
+            else:
+                lorenz_part = lambda Y: blend * lorenz(Y)
+                V = np.array([getattr(p, 'grav_velocity', (0.0, 0.0, 0.0)) for p in particles],
+                             dtype=dtype).reshape(len(particles), 3)
+                X = rk4(lorenz_part, X0, 0.5 * dt)
+                V = V + 0.5 * dt * accelerations()
+                X = X + (1 - blend) * dt * V
+                X = np.where(np.isfinite(X), np.clip(X, -1000.0, 1000.0), 0.0)
+                for p, (x, y, z) in zip(particles, X.tolist()):
+                    p.x, p.y, p.z = x, y, z
+                self._refresh_gravitational_accelerations(particles)
+                V = V + 0.5 * dt * accelerations()
+                X = rk4(lorenz_part, X, 0.5 * dt)
+                V = np.where(np.isfinite(V), np.clip(V, -1000.0, 1000.0), 0.0)
+                for p, v in zip(particles, V):
+                    p.grav_velocity = v
+        
+        # CST v2.0 additive: Clamp positions/velocities as in the Euler path
+        X = np.where(np.isfinite(X), np.clip(X, -1000.0, 1000.0), 0.0)
+        with np.errstate(over='ignore', invalid='ignore'):
+            velocities = (X - X0) / dt if dt > 0 else np.zeros_like(X)
+        velocities = np.where(np.isfinite(velocities), np.clip(velocities, -1000.0, 1000.0), 0.0)
+        for p, (x, y, z), v in zip(particles, X.tolist(), velocities):
+            p.x, p.y, p.z = x, y, z
+            p.velocity = v
+    
+    def _compute_block_levels(self, dt: float) -> np.ndarray:
+        """CST v2.0 additive: Power-of-two sub-step level per particle
+        
+        Each particle's own step is ``blockEta * min(r_nn / |v|, sqrt(r_nn / |a|))``
+        from its nearest neighbor distance, velocity and acceleration; level k
+        means 2**k sub-steps of ``dt / 2**k`` within the macro step.
+        """
+        particles = self.particles
+        n = len(particles)
+        positions = np.array([(p.x, p.y, p.z) for p in particles], dtype=self.state_dtype)
+        speeds = np.array([np.sqrt(np.sum(p.velocity ** 2)) for p in particles])
+        r_nn = np.full(n, self.physics.rCutoff)
+        for i, p in enumerate(particles):
+            neighbors = [j for j in p.neighbors if j < n] if p.neighbors else []
+            if neighbors:
+                r = np.sqrt(np.sum((positions[neighbors] - positions[i]) ** 2, axis=1))
+                r_nn[i] = max(r.min(), self.physics.epsilon)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            local_dt = np.where(speeds > 0, r_nn / speeds, np.inf)
+            if self.physics.gravEnabled or self.physics.dmEnabled:
+                accels = np.array([np.sqrt(np.sum(np.asarray(p.acceleration) ** 2))
+                                   if hasattr(p, 'acceleration') else 0.0 for p in particles])
+                local_dt = np.minimum(local_dt, np.where(accels > 0, np.sqrt(r_nn / accels), np.inf))
+            local_dt *= self.timestep.blockEta
+            levels = np.ceil(np.log2(dt / local_dt))
+        levels = np.nan_to_num(levels, nan=0.0, posinf=self.timestep.maxBlockLevel, neginf=0.0)
+        return np.clip(levels, 0, self.timestep.maxBlockLevel).astype(np.int64)
+    
+    def _refresh_gravitational_accelerations(self, particles: List[Particle]):
+        """CST v2.0 additive: Recompute gravity for a subset from its neighbor
+        lists, plus the NFW pull at their current positions"""
+        G = self.physics.G
+        eps2 = self.physics.epsilon ** 2
+        all_particles = self.particles
+        for pi in particles:
+            if not pi.neighbors or not self.physics.gravEnabled:
+                pi.acceleration = np.zeros(3)
+                continue
+            others = [all_particles[j] for j in pi.neighbors if j < len(all_particles)]
+            dx = np.array([(pj.x - pi.x, pj.y - pi.y, pj.z - pi.z) for pj in others],
+                          dtype=self.state_dtype)
+            masses = np.array([pj.mass for pj in others], dtype=self.state_dtype)
+            r_eff2 = np.sum(dx ** 2, axis=1) + eps2
+            pi.acceleration = np.sum((G * masses / (r_eff2 * np.sqrt(r_eff2)))[:, None] * dx, axis=0)
+        if self.physics.dmEnabled and particles:
+            positions = np.array([(p.x, p.y, p.z) for p in particles], dtype=np.float64)
+            _, acc = self.dark_matter_table().evaluate(*positions.T)
+            for p, a in zip(particles, acc.T.copy()):
+                p.acceleration = p.acceleration + a
+    
+    def _integrate_block_steps(self, dt: float):
+        """CST v2.0 additive: Advance positions with hierarchical block timesteps
+        
+        Particles at level k take 2**k sub-steps of ``dt / 2**k``; everyone is
+        back in sync at the end of the macro step, so token and diagnostics
+        cadence is unchanged. Gravity is re-evaluated for the particles being
+        sub-stepped, using the others' latest positions.
+        """
+        levels = self._compute_block_levels(dt)
+        self.block_levels = levels
+        max_level = int(levels.max())
+        groups = [(level, [self.particles[i] for i in np.flatnonzero(levels == level)])
+                  for level in np.unique(levels).tolist()]
+        for step in range(1 << max_level):
+            for level, group in groups:
+                if step % (1 << (max_level - level)):
+                    continue
+                if step > 0 and (self.physics.gravEnabled or self.physics.dmEnabled):
+                    self._refresh_gravitational_accelerations(group)
+                self._update_particle_positions(dt / (1 << level), group)
+    
+    def get_block_stats(self) -> Dict:
+        """CST v2.0 additive: Particle counts per block level and sub-step total"""
+        counts = np.bincount(self.block_levels, minlength=self.timestep.maxBlockLevel + 1)
+        return {
+            "enabled": self.timestep.blockSteps,
+            "levelCounts": counts.tolist(),
+            "particleSteps": int(np.sum(counts * (1 << np.arange(len(counts)))))
+        }
+    
     def _compute_adaptive_dt(self) -> float:
         """Compute adaptive timestep"""
         if not self.timestep.adaptive or len(self.particles) == 0:
             return self.timestep.dt
         
+        # CST v2.0 additive: With block timesteps, fine steps are per particle
+        # and the synchronized macro step stays at dtMax
+        if self.timestep.blockSteps:
+            return self.timestep.dtMax
+        
         r_min = float('inf')
         v_max = 0.0
         
@@ -714,21 +4575,75 @@ class Simulator:
     
     def _process_audio_frame(self, frame: AudioFrame):
         """Process audio frame and generate tokens, create/update particles"""
+        self.process_audio_frames([frame])
+    
+    def process_audio_frames(self, frames: Iterable[AudioFrame]):
+        """CST v2.0 additive: Ingest a batch of audio frames in one call
+        
+        Leaves particles, RNG state and the token stream exactly as
+        processing the frames one at a time would: peaks are matched to
+        particles through one frequency index for the whole batch, and all
+        tokens reach the stream in one bulk append.
+        """
+        frames = list(frames)
+        if not frames:
+            return
+        # Only captured frames seen for the first time are timed: recorded
+        # frames are never stamped, and a frame ingested again (already
+        # stamped "ingest") would overwrite its stamps and count twice
+        timed = [frame for frame in frames
+                 if "capture" in frame.stageTimes and "ingest" not in frame.stageTimes]
+        now = time.monotonic()
+        for frame in timed:
+            self.latency.record_frame(frame)
+            self.latency.stamp(frame, "ingest", now)
+        
         # Record if recording
         if self.recorder.recording:
-            self.recorder.add_frame(frame)
+            for frame in frames:
+                self.recorder.add_frame(frame)
         
-        # Generate tokens
-        self._generate_audio_frame_token(frame)
-        self._generate_harmonic_tokens(frame)
+        # Per frame: audio frame token, φ-harmonic tokens, then particle events
+        frame_tokens = [[self._generate_audio_frame_token(frame)] + self._generate_harmonic_tokens(frame)
+                        for frame in frames]
         
         # CST v2.0 additive: Create/update particles from audio frequencies
-        self._create_or_update_particles_from_audio(frame)
+        self._apply_audio_frames_to_particles(frames, frame_tokens)
+        self._emit_tokens(frame_tokens, [frame.timestamp for frame in frames])
+        now = time.monotonic()
+        for frame in timed:
+            self.latency.stamp(frame, "tokens", now)
+        self._frames_awaiting_tick.extend(timed)
+    
+    def _emit_tokens(self, frame_tokens: List[List[Dict]], timestamps: List[float]):
+        """CST v2.0 additive: Route each frame's tokens to the stream in one bulk append
+        
+        When coalescing, merge windows that have expired by a frame's
+        timestamp are closed before that frame's tokens go in.
+        """
+        if not self.coalescing.enabled:
+            self.token_stream.add_tokens([token for tokens in frame_tokens for token in tokens])
+            return
+        out: List[Dict] = []
+        for tokens, timestamp in zip(frame_tokens, timestamps):
+            out.extend(self.coalescer.expire(timestamp))
+            for token in tokens:
+                out.extend(self.coalescer.add(token))
+        self.token_stream.add_tokens(out)
+    
+    def flush_coalesced_tokens(self):
+        """CST v2.0 additive: Emit tokens the coalescer is still holding back"""
+        for compact in self.coalescer.flush():
+            self.token_stream.add_token(compact)
     
-    def _generate_audio_frame_token(self, frame: AudioFrame):
+    def expand_coalesced_tokens(self) -> List[Dict]:
+        """CST v2.0 additive: Lossless full token stream for everything coalesced"""
+        return self.coalescer.expand()
+    
+    def _generate_audio_frame_token(self, frame: AudioFrame) -> Dict:
         """Generate audio frame token"""
-        token = {
-            "id": f"audio_frame_{int(time.time() * 1000)}",
+        return {
+            "id": f"audio_frame_{int(frame.timestamp * 1000)}",
             "type": "audio_frame",
             "timestamp": frame.timestamp,
             "rmsEnergy": frame.rmsEnergy,
@@ -738,94 +4653,103 @@ class Simulator:
             "phiHarmonics": frame.harmonics[:5],
             "seed": self.seed
         }
-        self.token_stream.add_token(token)
     
-    def _generate_harmonic_tokens(self, frame: AudioFrame):
+    def _generate_harmonic_tokens(self, frame: AudioFrame) -> List[Dict]:
         """Generate φ-harmonic tokens"""
+        tokens = []
         for idx, harmonic in enumerate(frame.harmonics):
             if idx < len(frame.frequencyData):
                 magnitude = frame.frequencyData[idx]["magnitude"]
-                token = {
-                    "id": f"harmonic_{int(time.time() * 1000)}_{idx}",
+                tokens.append({
+                    "id": f"harmonic_{int(frame.timestamp * 1000)}_{idx}",
                     "type": "phi_harmonic",
                     "timestamp": frame.timestamp,
                     "harmonic": harmonic,
                     "magnitude": magnitude,
                     "harmonicIndex": idx,
-                    "phiRatio": PHI ** (idx / 2)
-                }
-                self.token_stream.add_token(token)
+                    "phiRatio": phi_ratio(idx)
+                })
+        return tokens
     
-    def _create_or_update_particles_from_audio(self, frame: AudioFrame):
-        """CST v2.0 additive: Create or update particles based on audio frequencies"""
-        if len(frame.frequencyData) == 0:
-            return
+    def _apply_audio_frames_to_particles(self, frames: List[AudioFrame],
+                                         frame_tokens: List[List[Dict]]):
+        """CST v2.0 additive: Create or update particles from a batch of audio frames
         
-        # Store current audio state for modulation
-        self.current_audio_energy = frame.rmsEnergy
-        self.current_frequency_data = frame.frequencyData
-        
-        # Create new particles if we have space (max 20 particles)
+        Each peak retunes the particle nearest to it in log-frequency when one
+        lies within ``frequency_match.toleranceOctaves`` (louder peaks claim
+        first), so particle identities follow the sound from frame to frame.
+        Unmatched peaks among the top 5 above threshold spawn particles while
+        there are fewer than 20. The FrequencyIndex is built once per batch;
+        after that each frame costs O(k log N) for k peaks. Particle event
+        tokens are appended to ``frame_tokens`` of their frame.
+        """
+        index = None
         max_particles = 20
-        if len(self.particles) < max_particles:
-            for freq_data in frame.frequencyData[:5]:  # Top 5 frequencies
-                if freq_data["magnitude"] > 0.1:  # Threshold for creation
-                    # Sound-to-color mapping (frequency to hue)
-                    hue = (freq_data["frequency"] / 20000.0) * 360.0
-                    
-                    # Create particle with frequency-based properties
-                    particle = Particle(
-                        x=np.random.random() * 10 - 5,
-                        y=np.random.random() * 10 - 5,
-                        z=np.random.random() * 10 - 5,
-                        frequency=freq_data["frequency"],
-                        parent_id=None
-                    )
-                    
-                    # Set mass based on magnitude
-                    particle.mass = 1.0 + freq_data["magnitude"] * 5.0
-                    particle.Ec = freq_data["magnitude"] * 50.0
-                    
-                    self.particles.append(particle)
-                    
-                    # Generate particle creation token
-                    self._generate_particle_token(particle, "audio_creation")
-        
-        # Update existing particles with frequency assignments
-        for idx, freq_data in enumerate(frame.frequencyData):
-            if idx < len(self.particles):
-                particle = self.particles[idx]
-                self._update_particle_from_audio(particle, freq_data)
-    
-    def _update_particle_from_audio(self, particle: Particle, freq_data: Dict[str, float]):
-        """CST v2.0 additive: Update particle properties from audio frequency data"""
-        # Update frequency
-        particle.frequency = freq_data["frequency"]
-        
-        # Update mass based on magnitude
-        particle.mass = max(1.0, particle.mass * (0.95 + freq_data["magnitude"] * 0.1))
-        
-        # Update energy
-        particle.Ec = freq_data["magnitude"] * 50.0
-        
-        # Generate frequency update token
-        token = {
-            "id": f"freq_update_{int(time.time() * 1000)}_{particle.id}",
-            "type": "frequency_update",
-            "particleId": particle.id,
-            "timestamp": time.time(),
-            "frequency": freq_data["frequency"],
-            "magnitude": freq_data["magnitude"]
-        }
-        self.token_stream.add_token(token)
+        tolerance = self.frequency_match.toleranceOctaves
+        for frame, tokens in zip(frames, frame_tokens):
+            data = frame.frequencyData
+            if len(data) == 0:
+                continue
+            
+            # Store current audio state for modulation
+            self.current_audio_energy = frame.rmsEnergy
+            self.current_frequency_data = data
+            
+            if index is None:
+                index = FrequencyIndex(self.particles)
+            frequencies = np.array([freq_data["frequency"] for freq_data in data], dtype=np.float64)
+            positions = index.match(frequencies, tolerance)
+            timestamp = frame.timestamp
+            stamp = int(timestamp * 1000)
+            
+            # Update matched particles
+            matched = np.flatnonzero(positions >= 0)
+            for k, row in zip(matched.tolist(), index.rows[positions[matched]].tolist()):
+                freq_data = data[k]
+                particle = self.particles[row]
+                particle.frequency = freq_data["frequency"]
+                particle.mass = max(1.0, particle.mass * (0.95 + freq_data["magnitude"] * 0.1))
+                particle.Ec = freq_data["magnitude"] * 50.0
+                tokens.append({
+                    "id": f"freq_update_{stamp}_{particle.id}",
+                    "type": "frequency_update",
+                    "particleId": particle.id,
+                    "timestamp": timestamp,
+                    "frequency": freq_data["frequency"],
+                    "magnitude": freq_data["magnitude"]
+                })
+            index.move(positions[matched], frequencies[matched])
+            
+            # Spawn particles for unmatched top-5 peaks
+            if len(self.particles) >= max_particles:
+                continue
+            spawn = [k for k, freq_data in enumerate(data[:5])
+                     if positions[k] < 0 and freq_data["magnitude"] > 0.1]
+            if not spawn:
+                continue
+            # Same draws as x, y, z = random() * 10 - 5, then theta = random() * 2 * pi
+            draws = self.rng.random((len(spawn), 4))
+            draws[:, :3] = draws[:, :3] * 10 - 5
+            draws[:, 3] = draws[:, 3] * 2 * np.pi
+            for k, (x, y, z, theta) in zip(spawn, draws.tolist()):
+                freq_data = data[k]
+                particle = self.add_particle(x, y, z, frequency=freq_data["frequency"],
+                                             parent_id=None, theta=theta)
+                particle.mass = 1.0 + freq_data["magnitude"] * 5.0
+                particle.Ec = freq_data["magnitude"] * 50.0
+                index.insert(len(self.particles) - 1, frequencies[k])
+                tokens.append(self._generate_particle_token(particle, "audio_creation", timestamp))
     
-    def _generate_particle_token(self, particle: Particle, event_type: str):
+    def _generate_particle_token(self, particle: Particle, event_type: str,
+                                 timestamp: Optional[float] = None) -> Dict:
         """CST v2.0 additive: Generate particle event token"""
-        token = {
-            "id": f"particle_{event_type}_{int(time.time() * 1000)}_{particle.id}",
+        if timestamp is None:
+            timestamp = time.time()
+        return {
+            "id": f"particle_{event_type}_{int(timestamp * 1000)}_{particle.id}",
             "type": "particle_event",
             "event": event_type,
-            "timestamp": time.time(),
+            "timestamp": timestamp,
             "particleId": particle.id,
             "parentId": particle.parent_id,
             "position": [float(particle.x), float(particle.y), float(particle.z)],
@@ -842,7 +4766,6 @@ class Simulator:
             "entropyS": float(particle.entropyS),
             "mass": float(particle.mass)
         }
-        self.token_stream.add_token(token)
     
     def compute_synchronization_metric(self) -> Dict:
         """Compute Kuramoto order parameter"""
@@ -857,6 +4780,10 @@ class Simulator:
         
         return {"r": r, "meanTheta": mean_theta}
     
+    def compute_sync_clusters(self) -> Dict:
+        """CST v2.0 additive: Phase-locked clusters with per-cluster order parameters"""
+        return self.sync_clusters.report()
+    
     def compute_conservation_stats(self) -> Dict:
         """Compute conservation diagnostics"""
         Etotal = 0.0
@@ -908,7 +4835,7 @@ if __name__ == "__main__":
     sim.set_seed(12345)
     
     # Add a particle
-    sim.particles.append(Particle(0.1, 0.0, 0.0, 440.0))
+    sim.add_particle(0.1, 0.0, 0.0, 440.0)
     
     # Run simulation
     for _ in range(100):
@@ -6,10 +6,6 @@ Interactive dashboard with audio input, real-time visualization, and token expor
 
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
 import time
 import queue
 import threading
@@ -20,15 +16,22 @@ import io
 # Import the engine
 import sys
 import os
-
-# Import with proper module name handling
 import importlib.util
-engine_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "12d_cosmic_synapse_engine.py")
-spec = importlib.util.spec_from_file_location("cosmic_engine", engine_path)
-cosmic_engine = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(cosmic_engine)
+
+# CST v2.0 additive: cosmic_engine.py loads the engine once per process; on
+# reruns the import is a sys.modules lookup, so the classes stay identical to
+# those of the Simulator kept in st.session_state
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+import cosmic_engine
 
 Simulator = cosmic_engine.Simulator
+MetricsExporter = cosmic_engine.MetricsExporter
+StreamServer = cosmic_engine.StreamServer
+MetricsHistory = cosmic_engine.MetricsHistory
+EXPORT_COMPRESSIONS = cosmic_engine.EXPORT_COMPRESSIONS
+compress_chunks = cosmic_engine.compress_chunks
 Particle = cosmic_engine.Particle
 AudioFrame = cosmic_engine.AudioFrame
 TokenStream = cosmic_engine.TokenStream
@@ -38,23 +41,32 @@ PhysicsConfig = cosmic_engine.PhysicsConfig
 AdaptiveConfig = cosmic_engine.AdaptiveConfig
 SyncConfig = cosmic_engine.SyncConfig
 TimestepConfig = cosmic_engine.TimestepConfig
+INTEGRATORS = cosmic_engine.INTEGRATORS
+PRECISIONS = cosmic_engine.PRECISIONS
 DarkMatterParams = cosmic_engine.DarkMatterParams
 C = cosmic_engine.C
 PHI = cosmic_engine.PHI
+# CST v2.0 additive: Precomputed φ ladder, closed-form octave folding, LRU-cached
+generate_phi_harmonics = cosmic_engine.phi_harmonics
 H = cosmic_engine.H
 KB = cosmic_engine.KB
 G = cosmic_engine.G
 
-# Try to import pyaudio, fallback to mock if not available
-PYAUDIO_AVAILABLE = False
-FORMAT = None
-try:
-    import pyaudio
-    PYAUDIO_AVAILABLE = True
-    FORMAT = pyaudio.paInt16
-except ImportError:
-    PYAUDIO_AVAILABLE = False
-    FORMAT = None
+# CST v2.0 additive: pyaudio is only located here and imported by the capture
+# thread; fallback to mock if not available
+PYAUDIO_AVAILABLE = importlib.util.find_spec("pyaudio") is not None
+
+
+def _plotly():
+    """CST v2.0 additive: Deferred plotly import (graph_objects, make_subplots)"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    return go, make_subplots
+
+# CST v2.0 additive: Metrics history columns and chart decimation target
+HISTORY_COLUMNS = ('psi_total', 'sync_r', 'energy', 'token_rate', 'particle_count')
+CHART_MAX_POINTS = 500
+EXPORT_PREVIEW_TOKENS = 5
 
 # Audio configuration
 SAMPLE_RATE = 44100
@@ -104,20 +116,6 @@ def fft_analysis(data_array, sample_rate=SAMPLE_RATE):
     return frequency_data, rms, spectral_centroid
 
 
-def generate_phi_harmonics(fundamental, count=8):
-    """Generate φ-harmonic series"""
-    harmonics = []
-    for i in range(count):
-        freq = fundamental * (PHI ** (i / 2))
-        # Octave folding
-        while freq > fundamental * 4:
-            freq /= 2
-        while freq < fundamental / 2:
-            freq *= 2
-        harmonics.append(freq)
-    return sorted(harmonics)
-
-
 def audio_capture_thread(simulator, audio_queue, stop_event):
     """Audio capture thread"""
     if not PYAUDIO_AVAILABLE:
@@ -130,15 +128,16 @@ def audio_capture_thread(simulator, audio_queue, stop_event):
                 np.sin(2 * np.pi * 880 * (t + i / SAMPLE_RATE)) * 0.3
                 for i in range(CHUNK_SIZE)
             ], dtype=np.float32)
-            audio_queue.put(chunk)
+            audio_queue.put((chunk, time.monotonic()))
             t += CHUNK_SIZE / SAMPLE_RATE
             time.sleep(CHUNK_SIZE / SAMPLE_RATE)  # Sleep for chunk duration
         return
     
     try:
+        import pyaudio
         p = pyaudio.PyAudio()
         stream = p.open(
-            format=FORMAT,
+            format=pyaudio.paInt16,
             channels=CHANNELS,
             rate=SAMPLE_RATE,
             input=True,
@@ -147,8 +146,9 @@ def audio_capture_thread(simulator, audio_queue, stop_event):
         
         while not stop_event.is_set():
             data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+            capture_time = time.monotonic()
             audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-            audio_queue.put(audio_data)
+            audio_queue.put((audio_data, capture_time))
         
         stream.stop_stream()
         stream.close()
@@ -161,8 +161,8 @@ def process_audio_thread(simulator, audio_queue, processed_queue, stop_event):
     """Process audio frames and generate tokens"""
     while not stop_event.is_set():
         try:
-            # Get audio data (non-blocking)
-            audio_data = audio_queue.get(timeout=0.1)
+            # Get audio data (non-blocking), stamped with its monotonic capture time
+            audio_data, capture_time = audio_queue.get(timeout=0.1)
             
             # Perform FFT analysis
             frequency_data, rms, spectral_centroid = fft_analysis(audio_data)
@@ -171,6 +171,7 @@ def process_audio_thread(simulator, audio_queue, processed_queue, stop_event):
                 # Generate harmonics
                 fundamental = frequency_data[0]["frequency"]
                 harmonics = generate_phi_harmonics(fundamental, 8)
+                features_time = time.monotonic()
                 
                 # Create audio frame
                 frame = AudioFrame(
@@ -179,7 +180,8 @@ def process_audio_thread(simulator, audio_queue, processed_queue, stop_event):
                     frequencyData=frequency_data,
                     spectralCentroid=float(spectral_centroid),
                     harmonics=harmonics,
-                    dataArray=audio_data
+                    dataArray=audio_data,
+                    stageTimes={"capture": capture_time, "features": features_time}
                 )
                 
                 # Add to processed queue
@@ -212,14 +214,7 @@ def initialize_session_state():
         st.session_state.last_update = time.time()
     
     if 'history' not in st.session_state:
-        st.session_state.history = {
-            'time': [],
-            'psi_total': [],
-            'sync_r': [],
-            'energy': [],
-            'token_rate': [],
-            'particle_count': []
-        }
+        st.session_state.history = MetricsHistory(HISTORY_COLUMNS)
 
 
 def update_simulator_from_ui(simulator, physics_config, adapt_config, sync_config, timestep_config, dm_params, audio_sensitivity):
@@ -236,9 +231,15 @@ def update_simulator_from_ui(simulator, physics_config, adapt_config, sync_confi
     simulator.adapt.sigmaSimilarity = adapt_config['sigma_sim']
     
     simulator.sync.Ksync = sync_config['ksync']
+    simulator.sync.clusterPhaseTolerance = sync_config['cluster_tolerance']
     
     simulator.timestep.dtMax = timestep_config['dt_max']
     simulator.timestep.adaptive = timestep_config['adaptive']
+    simulator.timestep.blockSteps = timestep_config['block_steps']
+    simulator.timestep.integrator = timestep_config['integrator']
+    simulator.parallel.enabled = timestep_config['parallel']
+    if simulator.precision != timestep_config['precision']:
+        simulator.set_precision(timestep_config['precision'])
     
     simulator.dm_params.rho0 = dm_params['rho0']
     simulator.dm_params.rs = dm_params['rs']
@@ -247,42 +248,77 @@ def update_simulator_from_ui(simulator, physics_config, adapt_config, sync_confi
     simulator.audio_sensitivity = audio_sensitivity
 
 
-def create_3d_scatter(particles):
-    """Create 3D scatter plot of particles"""
-    if len(particles) == 0:
-        return go.Figure()
-    
-    x = [p.x for p in particles]
-    y = [p.y for p in particles]
-    z = [p.z for p in particles]
-    
-    # CST v2.0 additive: Color by frequency (sound-to-color mapping) or energy
-    colors = []
-    sizes = []
-    for p in particles:
-        if p.frequency > 0:
-            # Map frequency to hue (0-360) for color mapping
-            hue = (p.frequency / 20000.0) * 360.0
-            colors.append(hue)
-        else:
-            colors.append(p.Ec)
-        # Size based on mass/energy
-        sizes.append(5 + p.mass * 2)
-    
+# CST v2.0 additive: Level-of-detail budget for the 3D view
+DEFAULT_POINT_BUDGET = 20000
+
+
+def particle_render_arrays(particles, point_budget=DEFAULT_POINT_BUDGET):
+    """Extract float32 render arrays, decimated to at most point_budget points
+    
+    LOD policy: all particles under budget; otherwise the heaviest quarter
+    of the budget is always kept and the rest is a uniform stride over the
+    remaining particles, so dense regions thin out but dominant bodies stay.
+    """
+    n = len(particles)
+    state = np.array(
+        [(p.x, p.y, p.z, p.frequency, p.Ec, p.mass, p.omega) for p in particles],
+        dtype=np.float64
+    ).reshape(n, 7)
+    
+    if n > point_budget:
+        n_heavy = point_budget // 4
+        heavy = np.argpartition(-state[:, 5], n_heavy - 1)[:n_heavy] if n_heavy > 0 else np.array([], dtype=np.int64)
+        rest = np.setdiff1d(np.arange(n), heavy, assume_unique=True)
+        stride = rest[np.linspace(0, len(rest) - 1, point_budget - n_heavy).astype(np.int64)]
+        index = np.sort(np.concatenate([heavy, stride]))
+    else:
+        index = np.arange(n)
+    
+    shown = state[index]
+    freq, ec, mass = shown[:, 3], shown[:, 4], shown[:, 5]
+    # Color by frequency (sound-to-color hue) or energy for silent particles
+    colors = np.where(freq > 0, (freq / 20000.0) * 360.0, ec)
+    return {
+        "x": shown[:, 0].astype(np.float32),
+        "y": shown[:, 1].astype(np.float32),
+        "z": shown[:, 2].astype(np.float32),
+        "color": colors.astype(np.float32),
+        "size": (5 + mass * 2).astype(np.float32),
+        # index, frequency, Ec, Ω for client-side hover formatting
+        "customdata": np.column_stack([index, freq, ec, shown[:, 6]]).astype(np.float32),
+        "shown": len(index),
+        "total": n
+    }
+
+
+def cached_export(cache, kind, count, compression, make_chunks):
+    """Build an export payload once per (kind, count, compression)
+    
+    ``cache`` is a plain dict (safe to use from the download worker thread);
+    older payloads of the same kind are dropped when the count changes.
+    """
+    key = (kind, count, compression)
+    if key not in cache:
+        for stale in [k for k in cache if k[0] == kind]:
+            del cache[stale]
+        cache[key] = b"".join(compress_chunks(make_chunks(), compression))
+    return cache[key]
+
+
+def create_3d_figure_layout():
+    """Build the static 3D figure once; reruns only swap trace arrays"""
+    go, _ = _plotly()
     fig = go.Figure(data=go.Scatter3d(
-        x=x, y=y, z=z,
+        x=[], y=[], z=[],
         mode='markers',
         marker=dict(
-            size=sizes,
-            color=colors,
             colorscale='Viridis',
             showscale=True,
             colorbar=dict(title="Frequency/Energy"),
             line=dict(width=0.5, color='rgba(0,0,0,0.3)')
         ),
-        text=[f"Particle {i}<br>Freq: {p.frequency:.1f}Hz<br>Ec: {p.Ec:.2e}<br>Ω: {p.omega:.3f}" 
-              for i, p in enumerate(particles)],
-        hovertemplate='%{text}<extra></extra>'
+        hovertemplate=("Particle %{customdata[0]:.0f}<br>Freq: %{customdata[1]:.1f}Hz<br>"
+                       "Ec: %{customdata[2]:.2e}<br>Ω: %{customdata[3]:.3f}<extra></extra>")
     ))
     
     fig.update_layout(
@@ -294,12 +330,39 @@ def create_3d_scatter(particles):
             aspectmode='cube',
             camera=dict(eye=dict(x=1.5, y=1.5, z=1.5))
         ),
+        # Keep the user's camera/zoom across reruns
+        uirevision="particles",
         height=600
     )
     
     return fig
 
 
+def create_3d_scatter(particles, point_budget=DEFAULT_POINT_BUDGET, fig=None):
+    """Create or update the 3D scatter plot of particles
+    
+    Arrays are float32 NumPy, which Plotly serializes as compact base64
+    typed arrays instead of per-point JSON numbers.
+    """
+    if fig is None:
+        fig = create_3d_figure_layout()
+    if len(particles) == 0:
+        return fig
+    
+    arrays = particle_render_arrays(particles, point_budget)
+    fig.data[0].update(
+        x=arrays["x"], y=arrays["y"], z=arrays["z"],
+        customdata=arrays["customdata"],
+        marker=dict(size=arrays["size"], color=arrays["color"])
+    )
+    title = "3D Particle Visualization - Audio-Reactive"
+    if arrays["shown"] < arrays["total"]:
+        title += f" (showing {arrays['shown']:,} of {arrays['total']:,})"
+    fig.layout.title.text = title
+    
+    return fig
+
+
 def main():
     st.set_page_config(
         page_title="12D Cosmic Synapse Engine",
@@ -379,6 +442,23 @@ def main():
             else:
                 st.error("No recorded frames available!")
         
+        # CST v2.0 additive: Binary checkpoint/restore of full simulator state
+        checkpoint_path = st.text_input("Checkpoint Path", "cosmic_simulator.ckpt")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Checkpoint"):
+                simulator.save_checkpoint(checkpoint_path, background=True)
+                st.success("Checkpoint writing in background")
+        with col2:
+            if st.button("♻️ Restore"):
+                if os.path.exists(checkpoint_path):
+                    simulator = Simulator.from_checkpoint(checkpoint_path)
+                    st.session_state.simulator = simulator
+                    st.success(f"Restored {len(simulator.particles)} particles, "
+                               f"{len(simulator.token_stream.tokens)} tokens")
+                else:
+                    st.error(f"No checkpoint at {checkpoint_path}")
+        
         # Physics controls
         st.subheader("⚛️ Physics")
         physics_config = {
@@ -401,14 +481,19 @@ def main():
         # Synchronization controls
         st.subheader("🔄 Synchronization")
         sync_config = {
-            'ksync': st.slider("K_sync", 0.0, 1.0, 0.1, 0.01)
+            'ksync': st.slider("K_sync", 0.0, 1.0, 0.1, 0.01),
+            'cluster_tolerance': st.slider("Phase-Lock Tolerance (rad)", 0.01, 1.0, 0.1, 0.01)
         }
         
         # Timestep controls
         st.subheader("⏱️ Timestep")
         timestep_config = {
             'dt_max': st.slider("Max dt", 0.001, 0.1, 0.01, 0.001),
-            'adaptive': st.checkbox("Adaptive Timestep", True)
+            'adaptive': st.checkbox("Adaptive Timestep", True),
+            'block_steps': st.checkbox("Block Timesteps (per-particle sub-steps)", False),
+            'integrator': st.selectbox("Integrator", list(INTEGRATORS)),
+            'precision': st.selectbox("Particle Precision", list(PRECISIONS)),
+            'parallel': st.checkbox("Chunked Parallel Kernels (Euler)", False)
         }
         
         # Dark matter controls
@@ -418,15 +503,76 @@ def main():
             'rs': st.slider("r_s", 1.0, 20.0, 5.0, 0.5)
         }
         
+        # CST v2.0 additive: 3D view level of detail
+        st.subheader("🖥️ Rendering")
+        point_budget = st.slider("3D Point Budget", 1000, 200000, DEFAULT_POINT_BUDGET, 1000)
+        
+        # CST v2.0 additive: Tick profiling and metrics export
+        st.subheader("📈 Profiling")
+        simulator.profiler.detailed = st.checkbox("Detailed Tick Profiling", False)
+        metrics_port = st.number_input("Metrics Port", value=9108, step=1)
+        if st.session_state.get('metrics_exporter') is None:
+            if st.button("Serve Prometheus Metrics"):
+                exporter = MetricsExporter(simulator)
+                try:
+                    exporter.serve(int(metrics_port))
+                    st.session_state.metrics_exporter = exporter
+                    st.success(f"Metrics at http://127.0.0.1:{int(metrics_port)}/metrics")
+                except OSError as e:
+                    st.error(f"Could not start metrics server: {e}")
+        elif st.button("Stop Metrics Server"):
+            st.session_state.metrics_exporter.stop()
+            st.session_state.metrics_exporter = None
+            st.success("Metrics server stopped!")
+        
+        # CST v2.0 additive: Shared-memory state for out-of-process readers
+        if simulator.shared_publisher is None:
+            if st.button("Publish Shared Memory State"):
+                publisher = simulator.start_shared_state()
+                st.success(f"Publishing to shared memory segment '{publisher.name}'")
+        else:
+            st.caption(f"Shared memory: '{simulator.shared_publisher.name}', "
+                       f"{simulator.shared_publisher.frames_published} frames")
+            if st.button("Stop Shared Memory State"):
+                simulator.stop_shared_state()
+                st.success("Shared memory publishing stopped!")
+        
+        # CST v2.0 additive: Binary streaming server for browser viewers
+        stream_port = st.number_input("Stream Port", value=8765, step=1)
+        stream_rate = st.slider("Stream Rate (Hz)", 1, 60, 20)
+        if st.session_state.get('stream_server') is None:
+            if st.button("Start Stream Server"):
+                server = StreamServer(simulator, rate=float(stream_rate))
+                try:
+                    server.serve(int(stream_port))
+                    st.session_state.stream_server = server
+                    st.success(f"Streaming at ws://127.0.0.1:{int(stream_port)}/ws")
+                except OSError as e:
+                    st.error(f"Could not start stream server: {e}")
+        else:
+            st.session_state.stream_server.rate = float(stream_rate)
+            st.caption(f"Stream: {st.session_state.stream_server.client_count} viewers")
+            if st.button("Stop Stream Server"):
+                st.session_state.stream_server.stop()
+                st.session_state.stream_server = None
+                st.success("Stream server stopped!")
+        
+        # CST v2.0 additive: Token coalescing (lossless archive kept in simulator.coalescer)
+        st.subheader("🎫 Tokens")
+        coalesce = st.checkbox("Coalesce Tokens", simulator.coalescing.enabled)
+        if simulator.coalescing.enabled and not coalesce:
+            simulator.flush_coalesced_tokens()
+        simulator.coalescing.enabled = coalesce
+        
         # Particle controls
         st.subheader("⚛️ Particles")
         if st.button("➕ Add Particle"):
-            simulator.particles.append(Particle(
-                np.random.random() * 10 - 5,
-                np.random.random() * 10 - 5,
-                np.random.random() * 10 - 5,
-                440.0 + np.random.random() * 200
-            ))
+            simulator.add_particle(
+                simulator.rng.random() * 10 - 5,
+                simulator.rng.random() * 10 - 5,
+                simulator.rng.random() * 10 - 5,
+                440.0 + simulator.rng.random() * 200
+            )
             st.success(f"Added particle! Total: {len(simulator.particles)}")
         
         if st.button("🗑️ Clear Particles"):
@@ -454,16 +600,15 @@ def main():
     
     # Run simulation - CST v2.0 additive: Real-time audio-reactive processing
     if st.session_state.audio_running or len(simulator.particles) > 0:
-        # Process audio frames continuously (limit to prevent blocking)
-        frames_processed = 0
+        # Process audio frames continuously (limit to prevent blocking), as one batch
+        frames = []
         max_frames_per_tick = 10
-        while not simulator.processed_audio_queue.empty() and frames_processed < max_frames_per_tick:
+        while not simulator.processed_audio_queue.empty() and len(frames) < max_frames_per_tick:
             try:
-                frame = simulator.processed_audio_queue.get_nowait()
-                simulator._process_audio_frame(frame)
-                frames_processed += 1
+                frames.append(simulator.processed_audio_queue.get_nowait())
             except queue.Empty:
                 break
+        simulator.process_audio_frames(frames)
         
         # Run simulation tick - particles respond to audio in real-time
         if len(simulator.particles) > 0:
@@ -476,18 +621,14 @@ def main():
             sync = simulator.compute_synchronization_metric()
             cons = simulator.compute_conservation_stats()
             
-            st.session_state.history['time'].append(now)
-            st.session_state.history['psi_total'].append(psi['psiTotal'])
-            st.session_state.history['sync_r'].append(sync['r'])
-            st.session_state.history['energy'].append(cons['Etotal'])
-            st.session_state.history['token_rate'].append(token_rate)
-            st.session_state.history['particle_count'].append(len(simulator.particles))
-            
-            # Keep only last 200 points
-            max_points = 200
-            for key in st.session_state.history:
-                if len(st.session_state.history[key]) > max_points:
-                    st.session_state.history[key] = st.session_state.history[key][-max_points:]
+            # Fixed-capacity ring buffer; older samples roll into coarser levels
+            st.session_state.history.append(now, {
+                'psi_total': psi['psiTotal'],
+                'sync_r': sync['r'],
+                'energy': cons['Etotal'],
+                'token_rate': token_rate,
+                'particle_count': len(simulator.particles)
+            })
             
             st.session_state.last_update = now
     
@@ -498,7 +639,10 @@ def main():
         # Create placeholder for continuous updates (like a live TV show)
         plot_placeholder = st.empty()
         if len(simulator.particles) > 0:
-            fig_3d = create_3d_scatter(simulator.particles)
+            if 'scatter3d_fig' not in st.session_state:
+                st.session_state.scatter3d_fig = create_3d_figure_layout()
+            fig_3d = create_3d_scatter(simulator.particles, point_budget,
+                                       st.session_state.scatter3d_fig)
             plot_placeholder.plotly_chart(fig_3d, use_container_width=True, key="live_3d_plot")
         else:
             plot_placeholder.info("Add particles to see 3D visualization")
@@ -506,9 +650,12 @@ def main():
     with tab2:
         # Create placeholder for continuous streaming metrics (like a heart monitor)
         metrics_placeholder = st.empty()
-        if len(st.session_state.history['time']) > 0:
-            df = pd.DataFrame(st.session_state.history)
+        history = st.session_state.history
+        if len(history) > 0:
+            # LTTB-decimated series: constant render cost regardless of history length
+            series = {name: history.series(name, CHART_MAX_POINTS) for name in HISTORY_COLUMNS}
             
+            go, make_subplots = _plotly()
             fig = make_subplots(
                 rows=3, cols=2,
                 subplot_titles=("Psi Total", "Synchronization (r)", "Energy", "Token Rate", "Particle Count"),
@@ -519,35 +666,35 @@ def main():
             
             # Psi total - streaming line
             fig.add_trace(
-                go.Scatter(x=df['time'], y=df['psi_total'], name="Psi Total", 
+                go.Scatter(x=series['psi_total'][0], y=series['psi_total'][1], name="Psi Total", 
                           line=dict(color='#00d4ff', width=2), mode='lines'),
                 row=1, col=1
             )
             
             # Sync r - streaming line
             fig.add_trace(
-                go.Scatter(x=df['time'], y=df['sync_r'], name="Sync r", 
+                go.Scatter(x=series['sync_r'][0], y=series['sync_r'][1], name="Sync r", 
                           line=dict(color='#7b2ff7', width=2), mode='lines'),
                 row=1, col=2
             )
             
             # Energy - streaming line
             fig.add_trace(
-                go.Scatter(x=df['time'], y=df['energy'], name="Energy", 
+                go.Scatter(x=series['energy'][0], y=series['energy'][1], name="Energy", 
                           line=dict(color='#f06eaa', width=2), mode='lines'),
                 row=2, col=1
             )
             
             # Token rate - streaming line
             fig.add_trace(
-                go.Scatter(x=df['time'], y=df['token_rate'], name="Token Rate", 
+                go.Scatter(x=series['token_rate'][0], y=series['token_rate'][1], name="Token Rate", 
                           line=dict(color='#00ff00', width=2), mode='lines'),
                 row=2, col=2
             )
             
             # Particle count - streaming line
             fig.add_trace(
-                go.Scatter(x=df['time'], y=df['particle_count'], name="Particle Count", 
+                go.Scatter(x=series['particle_count'][0], y=series['particle_count'][1], name="Particle Count", 
                           line=dict(color='#ff8c00', width=2), mode='lines'),
                 row=3, col=1
             )
@@ -595,6 +742,15 @@ def main():
                 st.metric("Order Parameter (r)", f"{sync['r']:.3f}")
                 st.metric("Mean Theta", f"{sync['meanTheta']:.3f} rad")
                 
+                # CST v2.0 additive: Phase-locked clusters (incremental union-find)
+                clusters = simulator.compute_sync_clusters()
+                st.metric("Locked Clusters", f"{clusters['clusterCount']} (largest {clusters['largest']})")
+                if clusters['clusters']:
+                    st.dataframe([
+                        {"Size": c["size"], "r": c["r"], "Mean θ (rad)": c["meanTheta"]}
+                        for c in clusters['clusters'][:10]
+                    ], hide_index=True, use_container_width=True)
+                
                 st.subheader("Conservation")
                 st.metric("Total Energy", f"{cons['Etotal']:.3e}")
                 st.metric("Energy Drift", f"{cons['drift']['E']*100:.2f}%")
@@ -603,14 +759,54 @@ def main():
                 st.metric("Virial Ratio", f"{virial['ratio']:.3f} {'✓' if virial['ok'] else '✗'}")
         else:
             st.info("Add particles to see diagnostics")
+        
+        # CST v2.0 additive: Per-phase tick profile
+        st.subheader("Tick Profile")
+        tick_stats = simulator.get_tick_stats()
+        st.metric("Mean Tick", f"{tick_stats['meanTickSeconds']*1000:.2f} ms ({tick_stats['ticks']} ticks)")
+        if tick_stats['detailed']:
+            phase_rows = [
+                {
+                    "Phase": name,
+                    "Mean (ms)": phase["meanSeconds"] * 1000,
+                    "Last (ms)": phase["lastSeconds"] * 1000,
+                    "Share (%)": phase["fraction"] * 100
+                }
+                for name, phase in tick_stats["phases"].items() if phase["calls"] > 0
+            ]
+            st.dataframe(phase_rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("Enable 'Detailed Tick Profiling' in the sidebar for per-phase timings")
+        
+        # CST v2.0 additive: Audio-to-token/tick latency per pipeline stage
+        st.subheader("Pipeline Latency")
+        latency = simulator.get_latency_stats()
+        latency_rows = [
+            {
+                "Stage": stage,
+                "Frames": stats["count"],
+                "p50 (ms)": stats["p50"] * 1000,
+                "p99 (ms)": stats["p99"] * 1000,
+                "Max (ms)": stats["max"] * 1000,
+                "SLO": "✓" if stats["sloOk"] else "✗"
+            }
+            for stage, stats in latency["stages"].items()
+        ]
+        if any(row["Frames"] > 0 for row in latency_rows):
+            st.dataframe(latency_rows, hide_index=True, use_container_width=True)
+        else:
+            st.info("Start audio to measure capture-to-token latency")
     
     with tab4:
         st.subheader("Token Stream")
         
         if len(simulator.token_stream.tokens) > 0:
-            # Show recent tokens
-            recent_tokens = simulator.token_stream.tokens[-50:]
-            for token in reversed(recent_tokens):
+            # Show recent tokens (indexed by type, no scan of the full stream)
+            type_filter = st.selectbox("Token Type", ["all"] + simulator.token_stream.token_types(),
+                                       key="token_type_filter")
+            recent_tokens = simulator.token_stream.recent(
+                50, None if type_filter == "all" else type_filter)
+            for token in reversed(list(recent_tokens)):
                 if token.get('type') == 'audio_frame':
                     st.json({
                         "Type": "Audio Frame",
@@ -624,6 +820,11 @@ def main():
                         "Frequency": token.get('harmonic', 0),
                         "Index": token.get('harmonicIndex', 0)
                     })
+                elif token.get('type') == 'phi_harmonic_set':
+                    st.json({
+                        "Type": "Phi Harmonic Set",
+                        "Frequencies": token.get('harmonics', [])
+                    })
         else:
             st.info("No tokens generated yet. Start audio to generate tokens.")
     
@@ -663,49 +864,45 @@ def main():
                 }
             }
             
-            # Create export data
-            export_data = {
-                "metadata": metadata,
-                "tokens": simulator.token_stream.tokens
-            }
-            
-            # Convert to JSON string
-            json_str = json.dumps(export_data, indent=2)
+            compression = st.selectbox("Compression", list(EXPORT_COMPRESSIONS.keys()),
+                                       key="export_compression")
+            suffix, mime = EXPORT_COMPRESSIONS[compression]
+            export_cache = st.session_state.setdefault('export_cache', {})
             
-            # Download button with unique key to prevent 404 errors
-            download_key = f"download_tokens_{len(simulator.token_stream.tokens)}"
+            # Payload is serialized only when the download is clicked (on Streamlit's
+            # worker thread) and cached by token count until the stream grows
+            token_count = len(simulator.token_stream.tokens)
+            token_stream = simulator.token_stream
             st.download_button(
                 label="💾 Download Tokens (JSON)",
-                data=json_str.encode('utf-8'),
-                file_name=f"cosmic_tokens_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                key=download_key
+                data=lambda: cached_export(
+                    export_cache, "tokens", token_count, compression,
+                    lambda: token_stream.iter_export_chunks(metadata, count=token_count)),
+                file_name=f"cosmic_tokens_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json{suffix}",
+                mime=mime,
+                key="download_tokens"
             )
             
-            st.text_area("Preview (first 1000 chars)", json_str[:1000] + "..." if len(json_str) > 1000 else json_str, height=200, key="token_preview")
+            # Preview from a bounded slice, not from the full serialized export
+            preview_str = json.dumps({
+                "metadata": metadata,
+                "tokens": simulator.token_stream.tokens[:EXPORT_PREVIEW_TOKENS]
+            }, indent=2, default=str)
+            st.text_area("Preview (first 1000 chars)", preview_str[:1000] + "..." if len(preview_str) > 1000 else preview_str, height=200, key="token_preview")
             
             # Export recording
             if len(simulator.recorder.frames) > 0:
                 st.subheader("Export Recording")
-                recording_data = [
-                    {
-                        "timestamp": f.timestamp,
-                        "rmsEnergy": f.rmsEnergy,
-                        "frequencyData": f.frequencyData,
-                        "spectralCentroid": f.spectralCentroid,
-                        "harmonics": f.harmonics
-                    }
-                    for f in simulator.recorder.frames
-                ]
-                recording_json = json.dumps(recording_data, indent=2)
-                
-                recording_key = f"download_recording_{len(simulator.recorder.frames)}"
+                frame_count = len(simulator.recorder.frames)
+                recorder = simulator.recorder
                 st.download_button(
                     label="💾 Download Recording (JSON)",
-                    data=recording_json.encode('utf-8'),
-                    file_name=f"cosmic_recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json",
-                    key=recording_key
+                    data=lambda: cached_export(
+                        export_cache, "recording", frame_count, compression,
+                        lambda: recorder.iter_export_chunks(count=frame_count)),
+                    file_name=f"cosmic_recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json{suffix}",
+                    mime=mime,
+                    key="download_recording"
                 )
         else:
             st.info("No tokens to export yet. Start audio to generate tokens.")
@@ -0,0 +1,727 @@
+# -*- coding: utf-8 -*-
+"""
+12D COSMIC SYNAPSE THEORY - ENGINE BENCHMARK SUITE
+Reproducible benchmarks for the engine hot paths
+
+Benches (all inputs from fixed seeds):
+- startup: engine/UI cold start and per-rerun overhead
+- tick: Simulator.tick() per particle count, gravity/dark matter on and off
+- chunked tick: the thread-parallel array kernels per thread count
+- fft_analysis and φ-harmonic series (held note and sweep)
+- tokens: generation, batched ingestion and export
+- recorder: save/load
+- diagnostics, including phase-locked cluster tracking
+- frame codec: quantized particle frame size and encode rate
+- precision: float32 vs float64 state on a recorded session
+- distributed: domain-decomposed stepping across a process pool
+- integrators: attractor error and energy drift against CPU time
+
+Each case reports throughput and peak traced memory. Results are written
+as JSON and can be compared against a stored baseline; throughput drops
+beyond the threshold are reported as regressions and give a non-zero
+exit code.
+
+Usage:
+    python benchmark_engine.py                       # full suite
+    python benchmark_engine.py --quick               # small sizes only
+    python benchmark_engine.py --save-baseline       # store as baseline
+    python benchmark_engine.py --baseline benchmark_baseline.json --threshold 0.2
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+import cosmic_engine
+
+Simulator = cosmic_engine.Simulator
+AudioFrame = cosmic_engine.AudioFrame
+INTEGRATORS = cosmic_engine.INTEGRATORS
+
+DEFAULT_SEED = 12345
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+TICK_SIZES = (20, 200, 2000, 20000)
+QUICK_TICK_SIZES = (20, 200)
+INTEGRATOR_DTS = (0.0025, 0.005, 0.01, 0.02)
+
+
+def _load_fft_analysis() -> Optional[Callable]:
+    """fft_analysis lives in the Streamlit UI module; skip if its deps are missing"""
+    ui_path = os.path.join(HERE, "12d_cosmic_synapse_streamlit.py")
+    try:
+        ui_spec = importlib.util.spec_from_file_location("cosmic_streamlit", ui_path)
+        ui_module = importlib.util.module_from_spec(ui_spec)
+        ui_spec.loader.exec_module(ui_module)
+        return ui_module.fft_analysis
+    except ImportError as e:
+        print(f"  skipping fft_analysis: {e}")
+        return None
+
+
+def make_simulator(n: int, seed: int = DEFAULT_SEED, grav: bool = False,
+                   dm: bool = False) -> Simulator:
+    """Simulator with n seeded particles at constant density"""
+    sim = Simulator()
+    sim.set_seed(seed)
+    sim.physics.gravEnabled = grav
+    sim.physics.dmEnabled = dm
+    rng = np.random.default_rng(seed)
+    # Keep ~20 particles per 10x10x10 box so neighbor counts stay comparable across N
+    half_width = 5.0 * (n / 20.0) ** (1.0 / 3.0)
+    positions = rng.uniform(-half_width, half_width, size=(n, 3))
+    frequencies = rng.uniform(100.0, 2000.0, size=n)
+    for (x, y, z), freq in zip(positions, frequencies):
+        sim.add_particle(float(x), float(y), float(z), float(freq))
+    return sim
+
+
+def make_frames(count: int, seed: int = DEFAULT_SEED, samples: int = 4096) -> List[AudioFrame]:
+    """Seeded synthetic audio frames with raw sample arrays"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        n_peaks = 10
+        freqs = np.sort(rng.uniform(80.0, 4000.0, size=n_peaks))
+        mags = np.sort(rng.uniform(0.05, 1.0, size=n_peaks))[::-1]
+        frames.append(AudioFrame(
+            timestamp=1_700_000_000.0 + i * 0.1,
+            rmsEnergy=float(rng.uniform(0.0, 0.5)),
+            frequencyData=[{"frequency": float(f), "magnitude": float(m)}
+                           for f, m in zip(freqs, mags)],
+            spectralCentroid=float(np.average(freqs, weights=mags)),
+            harmonics=[float(freqs[0] * cosmic_engine.phi_ratio(k)) for k in range(8)],
+            dataArray=rng.standard_normal(samples).astype(np.float32)
+        ))
+    return frames
+
+
+def run_case(fn: Callable[[], int], min_iterations: int = 1, max_iterations: int = 1000,
+             time_budget: float = 2.0, measure_memory: bool = True) -> Dict:
+    """Time fn() repeatedly; fn returns the number of work items it processed"""
+    items = 0
+    iterations = 0
+    start = time.perf_counter()
+    while iterations < max_iterations:
+        items += fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if iterations >= min_iterations and elapsed >= time_budget:
+            break
+    elapsed = time.perf_counter() - start
+
+    peak_bytes = None
+    if measure_memory:
+        tracemalloc.start()
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "seconds": elapsed,
+        "items": items,
+        "throughput": items / elapsed if elapsed > 0 else 0.0,
+        "peakBytes": peak_bytes
+    }
+
+
+def bench_tick(sizes, seed: int, time_budget: float) -> Dict[str, Dict]:
+    results = {}
+    for n in sizes:
+        for grav, dm in ((False, False), (True, True)):
+            name = f"tick[n={n},grav={'on' if grav else 'off'},dm={'on' if dm else 'off'}]"
+            sim = make_simulator(n, seed, grav, dm)
+            sim.timestep.adaptive = False
+
+            def step(sim=sim):
+                sim.tick()
+                return len(sim.particles)
+
+            result = run_case(step, time_budget=time_budget)
+            result["unit"] = "particle-steps/s"
+            results[name] = result
+            print(f"  {name}: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def bench_chunked_tick(sizes, seed: int, time_budget: float, threads=None) -> Dict[str, Dict]:
+    """tick() with the chunked array kernels, per thread count"""
+    threads = threads or sorted({1, os.cpu_count() or 1})
+    results = {}
+    for n in sizes:
+        for count in threads:
+            name = f"tick_chunked[n={n},threads={count}]"
+            sim = make_simulator(n, seed, grav=True, dm=True)
+            sim.timestep.adaptive = False
+            sim.parallel.enabled = True
+            sim.parallel.threads = count
+
+            def step(sim=sim):
+                sim.tick()
+                return len(sim.particles)
+
+            result = run_case(step, time_budget=time_budget)
+            result["unit"] = "particle-steps/s"
+            results[name] = result
+            print(f"  {name}: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def bench_fft(seed: int, time_budget: float) -> Dict[str, Dict]:
+    fft_analysis = _load_fft_analysis()
+    if fft_analysis is None:
+        return {}
+    chunks = [frame.dataArray for frame in make_frames(64, seed)]
+
+    def analyse():
+        for chunk in chunks:
+            fft_analysis(chunk)
+        return len(chunks)
+
+    result = run_case(analyse, time_budget=time_budget)
+    result["unit"] = "chunks/s"
+    print(f"  fft_analysis: {result['throughput']:.1f} {result['unit']}")
+    return {"fft_analysis": result}
+
+
+def bench_harmonics(seed: int, time_budget: float) -> Dict[str, Dict]:
+    results = {}
+    rng = np.random.default_rng(seed)
+    bin_hz = 44100 / 2048
+    cases = {
+        "held": [float(bin_hz * 20)] * 256,
+        "sweep": (bin_hz * rng.integers(1, 1024, size=256)).tolist()
+    }
+    for name, fundamentals in cases.items():
+        def generate():
+            if name == "sweep":
+                cosmic_engine._phi_harmonic_series.cache_clear()  # every fundamental misses
+            for fundamental in fundamentals:
+                cosmic_engine.phi_harmonics(fundamental, 8)
+            return len(fundamentals)
+
+        result = run_case(generate, time_budget=time_budget)
+        result["unit"] = "frames/s"
+        results[f"phi_harmonics[{name}]"] = result
+        print(f"  phi_harmonics[{name}]: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def _subprocess_seconds(code: str, runs: int = 5) -> float:
+    """Median wall time of a fresh interpreter running ``code``"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def bench_startup(time_budget: float) -> Dict[str, Dict]:
+    """Cold start of the engine and UI, and per-rerun engine/UI overhead"""
+    results = {}
+    interpreter = _subprocess_seconds("import numpy")
+    cold = _subprocess_seconds("import cosmic_engine")
+    results["startup[cold_import]"] = {
+        "unit": "s",
+        "seconds": cold,
+        "engineSeconds": cold - interpreter,
+        "interpreterSeconds": interpreter
+    }
+    print(f"  startup[cold_import]: {cold:.3f} s ({cold - interpreter:.3f} s beyond python+numpy)")
+
+    # What every Streamlit rerun used to pay: executing the engine file again
+    engine_path = os.path.join(HERE, "12d_cosmic_synapse_engine.py")
+
+    def reexec():
+        spec = importlib.util.spec_from_file_location("cosmic_engine_reexec", engine_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return 1
+
+    def cached():
+        importlib.import_module("cosmic_engine")
+        return 1
+
+    for name, fn in (("startup[engine_reexec]", reexec), ("startup[engine_import_cached]", cached)):
+        result = run_case(fn, time_budget=time_budget, max_iterations=100000, measure_memory=False)
+        result.update({"unit": "imports/s", "secondsPerImport": result["seconds"] / result["iterations"]})
+        results[name] = result
+        print(f"  {name}: {result['secondsPerImport'] * 1e6:.1f} us/import")
+
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as e:
+        print(f"  skipping UI startup: {e}")
+        return results
+    ui_path = os.path.join(HERE, "12d_cosmic_synapse_streamlit.py")
+    app = AppTest.from_file(ui_path, default_timeout=120)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    app.session_state.auto_refresh_paused = True
+    reruns = []
+    for _ in range(5):
+        start = time.perf_counter()
+        app.run()
+        reruns.append(time.perf_counter() - start)
+    results["startup[ui_first_run]"] = {"unit": "s", "seconds": first}
+    results["startup[ui_rerun]"] = {"unit": "s", "seconds": float(np.median(reruns)),
+                                    "reruns": reruns}
+    print(f"  startup[ui_first_run]: {first:.3f} s, startup[ui_rerun]: "
+          f"{np.median(reruns) * 1000:.1f} ms")
+    return results
+
+
+def bench_tokens(seed: int, time_budget: float, tmpdir: str) -> Dict[str, Dict]:
+    results = {}
+    frames = make_frames(200, seed)
+
+    def ingest():
+        sim = Simulator()
+        sim.set_seed(seed)
+        for frame in frames:
+            sim._process_audio_frame(frame)
+        return len(frames)
+
+    result = run_case(ingest, time_budget=time_budget)
+    result["unit"] = "frames/s"
+    results["token_generation"] = result
+    print(f"  token_generation: {result['throughput']:.1f} {result['unit']}")
+
+    def ingest_batch():
+        sim = Simulator()
+        sim.set_seed(seed)
+        sim.process_audio_frames(frames)
+        return len(frames)
+
+    result = run_case(ingest_batch, time_budget=time_budget)
+    result["unit"] = "frames/s"
+    results["token_generation[batch]"] = result
+    print(f"  token_generation[batch]: {result['throughput']:.1f} {result['unit']}")
+
+    sim = Simulator()
+    sim.set_seed(seed)
+    sim.process_audio_frames(frames)
+    path = os.path.join(tmpdir, "tokens.json")
+
+    def export():
+        sim.token_stream.export_json(path, {"seed": seed})
+        return len(sim.token_stream.tokens)
+
+    result = run_case(export, time_budget=time_budget)
+    result["unit"] = "tokens/s"
+    result["bytes"] = os.path.getsize(path)
+    results["token_export"] = result
+    print(f"  token_export: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def bench_recorder(seed: int, time_budget: float, tmpdir: str) -> Dict[str, Dict]:
+    results = {}
+    sim = Simulator()
+    sim.recorder.start()
+    for frame in make_frames(50, seed):
+        sim.recorder.add_frame(frame)
+    sim.recorder.stop()
+    path = os.path.join(tmpdir, "recording.json")
+    n_frames = len(sim.recorder.frames)
+
+    def save():
+        sim.recorder.save(path)
+        return n_frames
+
+    result = run_case(save, time_budget=time_budget)
+    result["unit"] = "frames/s"
+    result["bytes"] = os.path.getsize(path)
+    results["recorder_save"] = result
+    print(f"  recorder_save: {result['throughput']:.1f} {result['unit']}")
+
+    def load():
+        sim.recorder.load(path)
+        return n_frames
+
+    result = run_case(load, time_budget=time_budget)
+    result["unit"] = "frames/s"
+    results["recorder_load"] = result
+    print(f"  recorder_load: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def bench_diagnostics(sizes, seed: int, time_budget: float) -> Dict[str, Dict]:
+    results = {}
+    for n in sizes:
+        sim = make_simulator(n, seed, grav=True, dm=True)
+        sim.timestep.adaptive = False
+        sim.tick()
+
+        def diagnostics(sim=sim):
+            sim.compute_psi()
+            sim.compute_synchronization_metric()
+            sim.compute_conservation_stats()
+            sim.compute_virial()
+            return 1
+
+        name = f"diagnostics[n={n}]"
+        result = run_case(diagnostics, time_budget=time_budget)
+        result["unit"] = "calls/s"
+        results[name] = result
+        print(f"  {name}: {result['throughput']:.1f} {result['unit']}")
+
+        def sync_clusters(sim=sim):
+            sim.compute_sync_clusters()
+            return 1
+
+        # After the first call the union-find is current, so this is the per-tick update cost
+        name = f"sync_clusters[n={n}]"
+        result = run_case(sync_clusters, time_budget=time_budget)
+        result["unit"] = "calls/s"
+        results[name] = result
+        print(f"  {name}: {result['throughput']:.1f} {result['unit']}")
+    return results
+
+
+def bench_frame_codec(seed: int, time_budget: float, n: int = 2000) -> Dict[str, Dict]:
+    """Quantized frame bytes vs float64 / JSON over 60 ticks, plus encode throughput"""
+    sim = make_simulator(n, seed)
+    sim.timestep.adaptive = False
+    encoder = cosmic_engine.ParticleFrameEncoder(compress=True)
+    decoder = cosmic_engine.ParticleFrameDecoder()
+    encoded = raw = as_json = 0
+    max_error = 0.0
+    for _ in range(60):
+        sim.tick()
+        frame = encoder.encode_simulator(sim)
+        decoded = decoder.decode(frame)
+        rows = [(p.x, p.y, p.z, p.frequency, p.omega, p.theta) for p in sim.particles]
+        encoded += len(frame)
+        raw += len(rows) * 6 * 8
+        as_json += len(json.dumps(rows))
+        positions = np.array([r[:3] for r in rows])
+        max_error = max(max_error, float(np.max(np.abs(decoded["positions"] - positions))))
+
+    def encode():
+        encoder.encode_simulator(sim)
+        return 1
+
+    result = run_case(encode, time_budget=time_budget, measure_memory=False)
+    result.update({
+        "unit": "frames/s",
+        "bytesPerFrame": encoded / 60,
+        "ratioVsFloat64": raw / encoded,
+        "ratioVsJson": as_json / encoded,
+        "maxPositionError": max_error
+    })
+    print(f"  frame_codec[n={n}]: {result['bytesPerFrame']:.0f} B/frame, "
+          f"{result['ratioVsFloat64']:.1f}x vs float64, {result['ratioVsJson']:.1f}x vs JSON")
+    return {f"frame_codec[n={n}]": result}
+
+
+def bench_distributed(seed: int, time_budget: float, n: int = 20000,
+                      workers=None) -> Dict[str, Dict]:
+    """DistributedStepper throughput and speedup against one worker"""
+    workers = workers or sorted({1, 2, os.cpu_count() or 1})
+    sim = Simulator()
+    sim.set_seed(seed)
+    sim.physics.gravEnabled = True
+    sim.timestep.adaptive = False
+    rng = np.random.default_rng(seed)
+    half_width = 5.0 * (n / 20.0) ** (1.0 / 3.0)
+    positions = rng.uniform(-half_width, half_width, size=(n, 3))
+    results = {}
+    base = None
+    for count in workers:
+        name = f"distributed[n={n},workers={count}]"
+        config = cosmic_engine.DomainConfig(workers=count)
+        with cosmic_engine.DistributedStepper(sim, config, positions=positions) as stepper:
+            def step(stepper=stepper):
+                stepper.step()
+                return n
+
+            result = run_case(step, time_budget=time_budget, measure_memory=False)
+            stats = stepper.get_stats()
+        base = base or result["throughput"]
+        result.update({
+            "unit": "particle-steps/s",
+            "processes": stats["processes"],
+            "speedup": result["throughput"] / base if base else 0.0,
+            "loadImbalance": stats["loadImbalance"]
+        })
+        results[name] = result
+        print(f"  {name}: {result['throughput']:.1f} {result['unit']} "
+              f"({result['speedup']:.2f}x, {os.cpu_count()} CPUs)")
+    return results
+
+
+def _attractor_positions(sim: Simulator, dt: float, horizon: float) -> np.ndarray:
+    """Advance only the position update (gravity off) to ``horizon``"""
+    for _ in range(int(round(horizon / dt))):
+        sim._update_particle_positions(dt)
+    return np.array([(p.x, p.y, p.z) for p in sim.particles])
+
+
+def _gravity_energy(sim: Simulator) -> float:
+    """Kinetic plus pairwise softened potential energy of a gravity-only system
+
+    Kinetic energy uses the leapfrog velocity state when present, otherwise
+    the displacement-based ``velocity`` (the only one Euler/RK4 have).
+    """
+    particles = sim.particles
+    positions = np.array([(p.x, p.y, p.z) for p in particles])
+    masses = np.array([p.mass for p in particles])
+    velocities = np.array([getattr(p, 'grav_velocity', p.velocity) for p in particles])
+    kinetic = 0.5 * np.sum(masses * np.sum(velocities ** 2, axis=1))
+    d2 = np.sum((positions[:, None, :] - positions[None, :, :]) ** 2, axis=2)
+    r_eff = np.sqrt(d2 + sim.physics.epsilon ** 2)
+    pair = np.triu(np.ones_like(d2, dtype=bool), k=1) & (d2 <= sim.physics.rCutoff ** 2)
+    potential = -np.sum((sim.physics.G * masses[:, None] * masses[None, :] / r_eff)[pair])
+    return float(kinetic + potential)
+
+
+def bench_integrators(seed: int, dts=INTEGRATOR_DTS) -> Dict[str, Dict]:
+    """Accuracy vs CPU time for each integrator and dt
+
+    Attractor fidelity: 20 particles on the Lorenz flow for 0.5 time units,
+    max position error against RK4 at dt=1e-5. Energy drift: 20 particles
+    under gravity only (G=1, blendLorenz=0) for 1 time unit through tick().
+    """
+    results = {}
+    horizon = 0.5
+
+    def lorenz_sim(integrator: str) -> Simulator:
+        sim = make_simulator(20, seed)
+        rng = np.random.default_rng(seed)
+        for p in sim.particles:
+            p.x, p.y, p.z = rng.uniform(-15.0, 15.0), rng.uniform(-20.0, 20.0), rng.uniform(5.0, 40.0)
+        sim.timestep.integrator = integrator
+        return sim
+
+    reference = _attractor_positions(lorenz_sim("rk4"), 1e-5, horizon)
+    for integrator in INTEGRATORS:
+        for dt in dts:
+            sim = lorenz_sim(integrator)
+            cpu_start = time.process_time()
+            positions = _attractor_positions(sim, dt, horizon)
+            cpu = time.process_time() - cpu_start
+            name = f"integrator_attractor[{integrator},dt={dt}]"
+            results[name] = {
+                "cpuSeconds": cpu,
+                "positionError": float(np.max(np.abs(positions - reference))),
+                "steps": int(round(horizon / dt))
+            }
+            print(f"  {name}: error {results[name]['positionError']:.3g} "
+                  f"in {cpu:.3f} CPU s")
+
+    horizon = 1.0
+    for integrator in INTEGRATORS:
+        for dt in dts:
+            sim = Simulator()
+            sim.set_seed(seed)
+            sim.physics.G = 1.0
+            sim.physics.gravEnabled = True
+            sim.physics.blendLorenz = 0.0
+            sim.timestep.adaptive = False
+            sim.timestep.integrator = integrator
+            rng = np.random.default_rng(seed)
+            for x, y, z in rng.normal(0.0, 1.0, size=(20, 3)):
+                sim.add_particle(float(x), float(y), float(z), 440.0)
+            sim.tick(dt)
+            E0 = _gravity_energy(sim)
+            cpu_start = time.process_time()
+            for _ in range(int(round(horizon / dt)) - 1):
+                sim.tick(dt)
+            cpu = time.process_time() - cpu_start
+            drift = abs(_gravity_energy(sim) - E0) / abs(E0) if E0 else 0.0
+            name = f"integrator_energy[{integrator},dt={dt}]"
+            results[name] = {"cpuSeconds": cpu, "energyDrift": drift,
+                             "steps": int(round(horizon / dt))}
+            print(f"  {name}: drift {drift:.3g} in {cpu:.3f} CPU s")
+    return results
+
+
+def replay_session(frames: List[AudioFrame], precision: str, seed: int,
+                   n_particles: int = 1000) -> Dict:
+    """Replay recorded frames (one chunked tick each) and collect observables"""
+    sim = make_simulator(n_particles, seed)
+    sim.parallel.enabled = True
+    sim.set_precision(precision)
+    psi, sync, energy = [], [], []
+    cpu = 0.0
+    for frame in frames:
+        sim._process_audio_frame(frame)
+        cpu_start = time.process_time()
+        sim.tick()
+        cpu += time.process_time() - cpu_start
+        psi.append(sim.compute_psi()["psiTotal"])
+        sync.append(sim.compute_synchronization_metric()["r"])
+        energy.append(sum(p.Ec for p in sim.particles))
+    return {
+        "cpuSeconds": cpu,
+        "psi": np.array(psi),
+        "sync": np.array(sync),
+        "energy": np.array(energy),
+        "positions": np.array([(p.x, p.y, p.z) for p in sim.particles])
+    }
+
+
+def _relative_error(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.max(np.abs(a - b) / np.maximum(np.abs(b), 1e-12)))
+
+
+def bench_precision(seed: int, recording: Optional[str] = None, tmpdir: str = ".") -> Dict[str, Dict]:
+    """float32 vs float64 particle state on a recorded session
+
+    Uses ``recording`` (a Recorder JSON file) if given, otherwise records and
+    reloads 200 seeded synthetic frames, and replays them through the chunked
+    tick, timing only tick(). Reports the worst and time-mean relative error
+    of ψ and total energy, the worst absolute error of the sync order
+    parameter, and the final position divergence (the Lorenz flow is
+    chaotic, so trajectories separate; the observables are what should
+    agree).
+    """
+    sim = Simulator()
+    if recording is None:
+        sim.recorder.start()
+        for frame in make_frames(200, seed, samples=256):
+            sim.recorder.add_frame(frame)
+        sim.recorder.stop()
+        recording = os.path.join(tmpdir, "precision_session.json")
+        sim.recorder.save(recording)
+    sim.recorder.load(recording)
+    frames = sim.recorder.frames
+
+    reference = replay_session(frames, "float64", seed)
+    candidate = replay_session(frames, "float32", seed)
+    result = {
+        "frames": len(frames),
+        "cpuSecondsFloat64": reference["cpuSeconds"],
+        "cpuSecondsFloat32": candidate["cpuSeconds"],
+        "maxPositionDivergence": float(np.max(np.abs(candidate["positions"] - reference["positions"])))
+    }
+    for name in ("psi", "energy"):
+        result[f"{name}MaxRelError"] = _relative_error(candidate[name], reference[name])
+        result[f"{name}MeanRelError"] = float(abs(candidate[name].mean() - reference[name].mean()) /
+                                              max(abs(reference[name].mean()), 1e-12))
+    # r lies in [0, 1] and can pass through 0, so compare it absolutely
+    result["syncMaxAbsError"] = float(np.max(np.abs(candidate["sync"] - reference["sync"])))
+    result["syncMeanAbsError"] = float(abs(candidate["sync"].mean() - reference["sync"].mean()))
+    for key, value in result.items():
+        print(f"  precision {key}: {value:.4g}")
+    return {"precision_float32": result}
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[Dict]:
+    """Cases whose throughput fell more than ``threshold`` below baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("throughput"):
+            continue
+        ratio = result["throughput"] / base["throughput"]
+        if ratio < 1.0 - threshold:
+            regressions.append({
+                "case": name,
+                "baseline": base["throughput"],
+                "current": result["throughput"],
+                "ratio": ratio
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="12D Cosmic Synapse engine benchmarks")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--quick", action="store_true", help="only small particle counts")
+    parser.add_argument("--sizes", type=int, nargs="+", help="particle counts for tick()")
+    parser.add_argument("--time-budget", type=float, default=2.0,
+                        help="seconds to spend per case (at least one iteration always runs)")
+    parser.add_argument("--recording", help="Recorder JSON session for the precision comparison")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="fractional throughput drop flagged as a regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write results to the baseline path")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or (QUICK_TICK_SIZES if args.quick else TICK_SIZES)
+    results: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        print("startup")
+        results.update(bench_startup(args.time_budget))
+        print("tick()")
+        results.update(bench_tick(sizes, args.seed, args.time_budget))
+        print("tick() chunked kernels")
+        results.update(bench_chunked_tick(sizes, args.seed, args.time_budget))
+        print("fft_analysis")
+        results.update(bench_fft(args.seed, args.time_budget))
+        print("phi_harmonics")
+        results.update(bench_harmonics(args.seed, args.time_budget))
+        print("tokens")
+        results.update(bench_tokens(args.seed, args.time_budget, tmpdir))
+        print("recorder")
+        results.update(bench_recorder(args.seed, args.time_budget, tmpdir))
+        print("diagnostics")
+        results.update(bench_diagnostics([n for n in sizes if n <= 2000], args.seed,
+                                         args.time_budget))
+        print("frame codec")
+        results.update(bench_frame_codec(args.seed, args.time_budget))
+        print("precision")
+        results.update(bench_precision(args.seed, args.recording, tmpdir))
+        print("distributed")
+        results.update(bench_distributed(args.seed, args.time_budget,
+                                         n=2000 if args.quick else 20000))
+        print("integrators")
+        results.update(bench_integrators(args.seed, INTEGRATOR_DTS[1:3] if args.quick
+                                         else INTEGRATOR_DTS))
+
+    report = {
+        "metadata": {
+            "seed": args.seed,
+            "sizes": list(sizes),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.time()
+        },
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for reg in regressions:
+            print(f"REGRESSION {reg['case']}: {reg['current']:.1f} vs baseline "
+                  f"{reg['baseline']:.1f} ({(1 - reg['ratio']) * 100:.0f}% slower)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+12D COSMIC SYNAPSE THEORY - IMPORTABLE ENGINE MODULE
+`import cosmic_engine` loads 12d_cosmic_synapse_engine.py once per process
+
+The engine file name starts with a digit, so it cannot be imported by
+name. This module executes it under the name ``cosmic_engine`` and puts
+it in sys.modules in its own place, so every later import (each Streamlit
+rerun, the benchmarks, multiprocessing workers, pickle) gets the same
+module object and the same classes.
+"""
+
+import importlib.util
+import os
+import sys
+
+_ENGINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "12d_cosmic_synapse_engine.py")
+_spec = importlib.util.spec_from_file_location(__name__, _ENGINE_PATH)
+_module = importlib.util.module_from_spec(_spec)
+sys.modules[__name__] = _module
+try:
+    _spec.loader.exec_module(_module)
+except BaseException:
+    del sys.modules[__name__]
+    raise
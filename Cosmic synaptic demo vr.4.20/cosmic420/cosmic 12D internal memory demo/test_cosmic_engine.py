@@ -0,0 +1,988 @@
+# -*- coding: utf-8 -*-
+"""
+Regression checks for the 12D Cosmic Synapse engine
+
+Run from this directory with ``python -m pytest -q``.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cosmic_engine
+from cosmic_engine import AudioFrame, Simulator
+
+
+def make_frame(i: int, drift: float = 0.0) -> AudioFrame:
+    """Deterministic two-peak frame; ``drift`` Hz per frame moves the peaks"""
+    fundamental = 440.0 + i * drift
+    return AudioFrame(
+        timestamp=1_700_000_000.0 + i * 0.05,
+        rmsEnergy=0.3,
+        frequencyData=[{"frequency": fundamental, "magnitude": 0.5},
+                       {"frequency": 660.0 + i * drift, "magnitude": 0.3}],
+        spectralCentroid=500.0,
+        harmonics=cosmic_engine.phi_harmonics(fundamental)
+    )
+
+
+def make_simulator(seed: int = 1, particles: int = 5, coalescing: bool = False) -> Simulator:
+    sim = Simulator()
+    sim.set_seed(seed)
+    sim.coalescing.enabled = coalescing
+    for i in range(particles):
+        sim.add_particle(i, 0, 0, 100.0 * i + 100.0)
+    return sim
+
+
+def run_frames(sim: Simulator, start: int, stop: int, drift: float = 0.0) -> Simulator:
+    for i in range(start, stop):
+        sim.process_audio_frames([make_frame(i, drift)])
+        sim.tick()
+    return sim
+
+
+def encoded(tokens):
+    """Tokens as their checkpoint/export bytes (numpy scalars come back as floats)"""
+    return [cosmic_engine.encode_token(token) for token in tokens]
+
+
+def particle_state(sim: Simulator):
+    return [(p.id, p.x, p.y, p.z, p.theta, p.Ec, p.mass, p.frequency)
+            for p in sim.particles]
+
+
+# --- checkpoints ---
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "sim.ckpt")
+    sim = run_frames(make_simulator(seed=3, particles=8), 0, 10, drift=2.0)
+    sim.save_checkpoint(path)
+    restored = Simulator.from_checkpoint(path)
+
+    assert particle_state(restored) == particle_state(sim)
+    assert [p.neighbors for p in restored.particles] == [p.neighbors for p in sim.particles]
+    assert encoded(restored.token_stream.tokens) == encoded(sim.token_stream.tokens)
+    assert restored.rng.bit_generator.state == sim.rng.bit_generator.state
+    assert (restored.physics, restored.sync, restored.timestep) == (sim.physics, sim.sync, sim.timestep)
+    assert restored.psi_velocity_integral == sim.psi_velocity_integral
+    assert restored.psi_x12_integral == sim.psi_x12_integral
+
+    # Continuing both runs stays bit-for-bit identical
+    run_frames(sim, 10, 15, drift=2.0)
+    run_frames(restored, 10, 15, drift=2.0)
+    assert particle_state(restored) == particle_state(sim)
+    assert encoded(restored.token_stream.tokens) == encoded(sim.token_stream.tokens)
+
+
+def test_checkpoint_round_trip_coalescing(tmp_path):
+    path = str(tmp_path / "coalesced.ckpt")
+    straight = run_frames(make_simulator(coalescing=True), 0, 20)
+
+    halfway = run_frames(make_simulator(coalescing=True), 0, 10)
+    halfway.save_checkpoint(path)
+    resumed = run_frames(Simulator.from_checkpoint(path), 10, 20)
+
+    assert resumed.coalescing == straight.coalescing
+    assert resumed.frequency_match == straight.frequency_match
+    assert encoded(resumed.token_stream.tokens) == encoded(straight.token_stream.tokens)
+    straight.flush_coalesced_tokens()
+    resumed.flush_coalesced_tokens()
+    assert encoded(resumed.expand_coalesced_tokens()) == encoded(straight.expand_coalesced_tokens())
+    assert particle_state(resumed) == particle_state(straight)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_checkpoint_restores_token_indexes(tmp_path, ordered, monkeypatch):
+    path = str(tmp_path / "indexed.ckpt")
+    tokens = make_tokens(400, seed=5, ordered=ordered)
+    sim = make_simulator(particles=2)
+    sim.token_stream.add_tokens(tokens[:150])
+    sim.save_checkpoint(path)
+    for token in tokens[150:300]:
+        sim.token_stream.add_token(token)  # encoded on insert from the first checkpoint on
+    sim.save_checkpoint(path)
+
+    restored = Simulator.from_checkpoint(path)
+    stream = restored.token_stream
+
+    def reindex(*args):
+        raise AssertionError("restored indexes were rebuilt")
+    monkeypatch.setattr(stream, "_reset_indexes", reindex)
+    monkeypatch.setattr(stream, "_index_token", reindex)
+
+    assert sorted(stream.token_types()) == sorted({token["type"] for token in tokens[:300]})
+    stream.add_tokens(tokens[300:])
+    assert encoded(stream.tokens) == encoded(tokens)
+    for token_type in (None, "audio_frame", "missing"):
+        for particle_id in (None, "particle_1"):
+            for t_start, t_end in ((None, None), (1.0, 6.5), (4.0, None)):
+                expected = linear_filter(tokens, token_type, particle_id, t_start, t_end)
+                assert list(stream.query(token_type, particle_id, t_start, t_end)) == expected
+
+    # Appended tokens are encoded too, so the next checkpoint round-trips them
+    restored.save_checkpoint(path)
+    assert encoded(Simulator.from_checkpoint(path).token_stream.tokens) == encoded(tokens)
+
+
+def test_expand_coalesced_tokens_matches_uncoalesced_stream():
+    plain = run_frames(make_simulator(coalescing=False), 0, 20, drift=0.5)
+    coalesced = run_frames(make_simulator(coalescing=True), 0, 20, drift=0.5)
+    coalesced.flush_coalesced_tokens()
+
+    assert len(coalesced.token_stream.tokens) < len(plain.token_stream.tokens)
+    assert repr(coalesced.expand_coalesced_tokens()) == repr(list(plain.token_stream.tokens))
+
+
+def test_quiet_particle_emits_last_frequency_update():
+    sim = run_frames(make_simulator(coalescing=True), 0, 8)
+    for i in range(8, 30):  # only particle_0's frequency from here on
+        frame = make_frame(i)
+        frame.frequencyData = [{"frequency": 100.0, "magnitude": 0.4}]
+        sim.process_audio_frames([frame])
+        sim.tick()
+
+    updates = {}
+    for token in sim.token_stream.tokens:
+        if token["type"] == "frequency_update":
+            updates[token["particleId"]] = token
+    # Closed by frame time, without waiting for flush_coalesced_tokens
+    assert updates["particle_5"]["frequency"] == 440.0
+    assert updates["particle_5"]["timestamp"] == make_frame(7).timestamp
+    assert updates["particle_6"]["frequency"] == 660.0
+    assert list(sim.coalescer._pending_updates) == ["particle_0"]
+
+
+# --- token queries ---
+
+def make_tokens(count: int, seed: int, ordered: bool):
+    rng = np.random.default_rng(seed)
+    times = np.cumsum(rng.uniform(0.0, 0.1, size=count)) if ordered else rng.uniform(0.0, 10.0, size=count)
+    tokens = []
+    for k in range(count):
+        token = {"id": f"t{k}", "type": str(rng.choice(["audio_frame", "phi_harmonic", "particle_event"]))}
+        if rng.random() < 0.9:
+            token["timestamp"] = float(times[k])
+        if rng.random() < 0.6:
+            token["particleId"] = f"particle_{rng.integers(5)}"
+        tokens.append(token)
+    return tokens
+
+
+def linear_filter(tokens, token_type=None, particle_id=None, t_start=None, t_end=None):
+    def keep(token):
+        if token_type is not None and token.get("type") != token_type:
+            return False
+        if particle_id is not None and token.get("particleId") != particle_id:
+            return False
+        if t_start is None and t_end is None:
+            return True
+        ts = token.get("timestamp")
+        return (ts is not None and (t_start is None or ts >= t_start)
+                and (t_end is None or ts <= t_end))
+    return [token for token in tokens if keep(token)]
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("ingest", ["add_token", "add_tokens", "replace"])
+def test_query_matches_linear_filter(ordered, ingest):
+    tokens = make_tokens(400, seed=11, ordered=ordered)
+    stream = cosmic_engine.TokenStream()
+    if ingest == "add_token":
+        for token in tokens:
+            stream.add_token(token)
+    elif ingest == "add_tokens":
+        for k in range(0, len(tokens), 37):
+            stream.add_tokens(tokens[k:k + 37])
+    else:
+        stream.tokens = list(tokens)  # e.g. a restored checkpoint; indexed on first query
+
+    for token_type in (None, "audio_frame", "particle_event", "missing"):
+        for particle_id in (None, "particle_2", "particle_9"):
+            for t_start, t_end in ((None, None), (1.0, 6.5), (None, 3.0), (4.0, None), (8.0, 2.0)):
+                expected = linear_filter(tokens, token_type, particle_id, t_start, t_end)
+                assert list(stream.query(token_type, particle_id, t_start, t_end)) == expected
+
+    assert list(stream.by_type("phi_harmonic")) == linear_filter(tokens, token_type="phi_harmonic")
+    assert list(stream.by_particle("particle_0")) == linear_filter(tokens, particle_id="particle_0")
+    assert list(stream.in_time_range(2.0, 5.0)) == linear_filter(tokens, t_start=2.0, t_end=5.0)
+    assert list(stream.recent(25, "audio_frame")) == linear_filter(tokens, token_type="audio_frame")[-25:]
+
+
+# --- particle frame codec ---
+
+def codec_frames(count: int, n: int = 300, seed: int = 4):
+    """(ids, positions, attributes) per frame for a drifting particle set"""
+    rng = np.random.default_rng(seed)
+    ids = [f"particle_{k}" for k in range(n)]
+    positions = rng.uniform(-20.0, 20.0, size=(n, 3))
+    velocity = rng.normal(0.0, 0.05, size=(n, 3))
+    frequency = rng.uniform(80.0, 4000.0, size=n)
+    theta = rng.uniform(0.0, 2 * np.pi, size=n)
+    frames = []
+    for i in range(count):
+        positions = positions + velocity
+        theta = np.mod(theta + 0.1, 2 * np.pi)
+        if i % 3 == 0:
+            frequency = frequency.copy()
+            frequency[rng.integers(n, size=5)] *= 1.01
+        frames.append((list(ids), positions.copy(),
+                       {"frequency": frequency.copy(), "omega": np.full(n, 0.5 + i), "theta": theta.copy()}))
+    return frames
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_frame_codec_error_bounds(compress):
+    encoder = cosmic_engine.ParticleFrameEncoder(keyframe_interval=10, compress=compress)
+    decoder = cosmic_engine.ParticleFrameDecoder()
+    theta_step = cosmic_engine.PARTICLE_FRAME_ATTRIBUTES["theta"][1]
+    for ids, positions, attributes in codec_frames(40):
+        decoded = decoder.decode(encoder.encode(ids, positions, attributes, timestamp=0.0))
+        assert decoded["ids"] == ids
+        assert np.abs(decoded["positions"] - positions).max() < 2e-3
+        assert np.array_equal(decoded["frequency"], attributes["frequency"].astype(np.float32))
+        assert np.array_equal(decoded["omega"], attributes["omega"].astype(np.float32))
+        wrapped = np.angle(np.exp(1j * (decoded["theta"] - attributes["theta"])))
+        assert np.abs(wrapped).max() <= theta_step / 2 + 1e-12
+
+
+def test_frame_codec_keyframe_resync():
+    frames = codec_frames(25)
+    encoder = cosmic_engine.ParticleFrameEncoder(keyframe_interval=10)
+    encoded = [encoder.encode(*frame, timestamp=0.0) for frame in frames]
+    reference = cosmic_engine.ParticleFrameDecoder()
+    expected = [reference.decode(data) for data in encoded]
+    assert [d["keyframe"] for d in expected].count(True) == 3
+
+    # A subscriber joining mid-stream cannot decode deltas until the next keyframe
+    late = cosmic_engine.ParticleFrameDecoder()
+    with pytest.raises(ValueError):
+        late.decode(encoded[4])
+    for data, want in zip(encoded[10:], expected[10:]):
+        got = late.decode(data)
+        assert got["ids"] == want["ids"]
+        for key in ("positions", "frequency", "omega", "theta"):
+            assert np.array_equal(got[key], want[key])
+
+    # Changing the particle set forces a keyframe
+    ids, positions, attributes = frames[-1]
+    frame = encoder.encode(ids[:-1], positions[:-1], {k: v[:-1] for k, v in attributes.items()})
+    assert encoder.last_keyframe
+    assert reference.decode(frame)["ids"] == ids[:-1]
+
+
+# --- frequency matching ---
+
+class _Tone:
+    def __init__(self, frequency):
+        self.frequency = frequency
+
+
+def sequential_match(index, frequencies, tolerance):
+    """Loudest peak first: nearest free key, else the free key on its other side"""
+    claimed, result = set(), []
+    for f in frequencies:
+        key = np.log2(f) if f > 0 else np.nan
+        right = min(int(np.searchsorted(index.keys, key)), len(index.keys) - 1)
+        left = max(right - 1, 0)
+        candidates = sorted({left, right}, key=lambda pos: (abs(index.keys[pos] - key), pos))
+        pos = next((pos for pos in candidates
+                    if abs(index.keys[pos] - key) <= tolerance and pos not in claimed), -1)
+        if pos >= 0:
+            claimed.add(pos)
+        result.append(pos)
+    return result
+
+
+def test_frequency_index_falls_back_to_other_neighbour():
+    index = cosmic_engine.FrequencyIndex([_Tone(f) for f in (440.0, 450.0, 1000.0)])
+    tolerance = 1.0 / 12.0
+    # 443 Hz loses 440 to the louder 441 Hz peak and takes 450 instead
+    assert index.match([441.0, 443.0], tolerance).tolist() == [0, 1]
+    # 990 Hz loses 1000 Hz and its other neighbour (450) is out of tolerance
+    assert index.match([1001.0, 990.0], tolerance).tolist() == [2, -1]
+    assert index.match([0.0, -5.0, 442.0], tolerance).tolist() == [-1, -1, 0]
+
+
+def test_frequency_index_matches_sequential_reference():
+    rng = np.random.default_rng(8)
+    for _ in range(200):
+        index = cosmic_engine.FrequencyIndex([_Tone(f) for f in rng.uniform(100.0, 200.0, size=12)])
+        peaks = rng.uniform(95.0, 210.0, size=int(rng.integers(1, 15)))
+        assert index.match(peaks, 0.05).tolist() == sequential_match(index, peaks, 0.05)
+
+
+# --- chunked kernels ---
+
+def make_cloud(n: int = 400, seed: int = 6, threads: int = 1, chunk_size: int = 64) -> Simulator:
+    sim = Simulator()
+    sim.set_seed(seed)
+    rng = np.random.default_rng(seed)
+    for x, y, z in rng.uniform(-4.0, 4.0, size=(n, 3)):
+        sim.add_particle(float(x), float(y), float(z), float(rng.uniform(100.0, 1000.0)))
+    sim.parallel.enabled = True
+    sim.parallel.threads = threads
+    sim.parallel.chunkSize = chunk_size
+    return sim
+
+
+def test_chunked_tick_leaves_per_particle_neighbor_lists():
+    sim = make_cloud()
+    for p in sim.particles:
+        p.neighbors = []
+    spatial_index = sim._build_spatial_index()
+    expected = [sim._query_neighbors(i, sim.particles, spatial_index, sim.physics.rCutoff)
+                for i in range(len(sim.particles))]
+    sim.tick()
+    assert [p.neighbors for p in sim.particles] == expected
+    assert any(expected)
+
+
+def test_chunked_tick_threads_and_profile():
+    one, four = make_cloud(threads=1), make_cloud(threads=4)
+    four.profiler.detailed = True
+    for _ in range(3):
+        one.tick()
+        four.tick()
+    assert particle_state(one) == particle_state(four)
+    assert [p.neighbors for p in one.particles] == [p.neighbors for p in four.particles]
+
+    phases = four.profiler.stats()["phases"]
+    for name in ("neighbors", "synaptic", "adaptive", "phase", "integration", "energy", "psi"):
+        assert phases[name]["calls"] == 3 and phases[name]["totalSeconds"] > 0
+    assert phases["darkMatter"]["calls"] == 0
+
+
+# --- phase-locked clusters ---
+
+def bfs_roots(n: int, edges) -> list:
+    """Smallest particle index of each connected component"""
+    adjacency = [[] for _ in range(n)]
+    for i, j in edges:
+        adjacency[i].append(j)
+        adjacency[j].append(i)
+    roots = [-1] * n
+    for start in range(n):
+        if roots[start] >= 0:
+            continue
+        roots[start] = start
+        queue = [start]
+        while queue:
+            for j in adjacency[queue.pop()]:
+                if roots[j] < 0:
+                    roots[j] = start
+                    queue.append(j)
+    return roots
+
+
+def test_sync_clusters_match_bfs_after_edge_removal():
+    rng = np.random.default_rng(5)
+    n = 120
+    sim = make_simulator(particles=n)
+    graph = set()
+    while len(graph) < 260:
+        i, j = sorted(rng.choice(n, size=2, replace=False).tolist())
+        graph.add((i, j))
+    for p in sim.particles:
+        p.neighbors = []
+    for i, j in sorted(graph):
+        sim.particles[i].neighbors.append(j)
+        sim.particles[j].neighbors.append(i)
+    # Four phase groups, so locked edges form several components
+    base = rng.choice([0.0, 1.5, 3.0, 4.5], size=n)
+    tolerance = sim.sync.clusterPhaseTolerance
+
+    removed = 0
+    for round_ in range(12):
+        theta = np.mod(base + rng.normal(0.0, 0.04, size=n), 2 * np.pi)
+        if round_ % 3 == 2:
+            theta[rng.choice(n, size=10, replace=False)] += 0.7  # break edges inside clusters
+        for p, value in zip(sim.particles, theta):
+            p.theta = float(value)
+        labels = sim.sync_clusters.update()
+        removed += sim.sync_clusters.last_update["removed"]
+
+        locked = [(i, j) for i, j in graph
+                  if abs(np.mod(theta[j] - theta[i] + np.pi, 2 * np.pi) - np.pi) < tolerance]
+        assert labels.tolist() == bfs_roots(n, locked)
+        assert not sim.sync_clusters.last_update["rebuilt"] or round_ == 0
+    assert removed > 0
+
+
+def test_sync_clusters_use_chunked_tick_pairs():
+    sim = make_cloud(n=300)
+    sim.sync.clusterEveryTick = True
+    sim.sync.clusterPhaseTolerance = 0.5
+    sim.profiler.detailed = True
+    for _ in range(3):
+        sim.tick()
+    from_pairs = sim.compute_sync_clusters()
+    assert sim.profiler.stats()["phases"]["clusters"]["calls"] == 3
+
+    # A fresh tracker reading the neighbor lists sees the same graph
+    fresh = cosmic_engine.SyncClusterTracker(sim)
+    assert fresh.report()["clusters"] == from_pairs["clusters"]
+    assert from_pairs["update"]["edges"] == fresh.last_update["edges"] > 0
+
+
+# --- stream server ---
+
+def websocket_handshake(port: int, key):
+    """Status code and headers of the server's reply to a /ws upgrade"""
+    import socket
+    headers = "GET /ws?topics=diagnostics HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n" \
+              "Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n"
+    if key is not None:
+        headers += f"Sec-WebSocket-Key: {key}\r\n"
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall((headers + "\r\n").encode("ascii"))
+        reply = sock.makefile("rb")
+        status = int(reply.readline().split()[1])
+        fields = {}
+        for line in iter(reply.readline, b"\r\n"):
+            name, _, value = line.decode("ascii").partition(":")
+            fields[name.strip().lower()] = value.strip()
+        return status, fields
+
+
+def test_stream_server_websocket_key_validation():
+    import base64
+    import hashlib
+    server = cosmic_engine.StreamServer(make_simulator(), rate=50)
+    _, port = server.serve(0)
+    try:
+        for key in (None, "", "not-base64!", base64.b64encode(b"short").decode("ascii")):
+            assert websocket_handshake(port, key)[0] == 400
+        key = base64.b64encode(bytes(range(16))).decode("ascii")
+        status, fields = websocket_handshake(port, key)
+        assert status == 101
+        assert fields["sec-websocket-accept"] == base64.b64encode(hashlib.sha1(
+            (key + cosmic_engine._WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+    finally:
+        server.stop()
+    assert server._broadcast_thread is None
+
+
+def client_frame(opcode: int, payload: bytes, length=None, final: bool = True) -> bytes:
+    """Masked client-to-server frame; ``length`` overrides the declared size"""
+    import struct
+    n = len(payload) if length is None else length
+    head = bytes([(0x80 if final else 0) | opcode])
+    if n < 126:
+        head += bytes([0x80 | n])
+    elif n < 1 << 16:
+        head += bytes([0x80 | 126]) + struct.pack("!H", n)
+    else:
+        head += bytes([0x80 | 127]) + struct.pack("!Q", n)
+    mask = b"\x01\x02\x03\x04"
+    return head + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def test_read_websocket_frame_limits():
+    import io
+    read = cosmic_engine._read_websocket_frame
+    assert read(io.BytesIO(client_frame(0x1, b"subscribe tokens")), 64) == (0x1, b"subscribe tokens")
+    assert read(io.BytesIO(client_frame(0x9, b"x" * 125)), 64) == (0x9, b"x" * 125)
+
+    for frame, code in ((client_frame(0x2, b"", length=1 << 62), 1009),
+                        (client_frame(0x1, b"y" * 65), 1009),
+                        (client_frame(0x9, b"", length=126), 1002),
+                        (client_frame(0x9, b"ping", final=False), 1002)):
+        with pytest.raises(cosmic_engine._WebSocketClose) as excinfo:
+            read(io.BytesIO(frame), 64)
+        assert excinfo.value.code == code
+
+
+def test_stream_server_closes_oversized_websocket_frame():
+    import base64
+    import socket
+    import struct
+    server = cosmic_engine.StreamServer(make_simulator(), rate=50, max_frame_size=1024)
+    _, port = server.serve(0)
+    try:
+        key = base64.b64encode(bytes(range(16))).decode("ascii")
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall((f"GET /ws?topics=tokens HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                          f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n\r\n").encode("ascii"))
+            reply = sock.makefile("rb")
+            assert int(reply.readline().split()[1]) == 101
+            for _ in iter(reply.readline, b"\r\n"):
+                pass
+            # Declares 1 GiB but sends none of it: rejected from the header alone
+            sock.sendall(client_frame(0x2, b"", length=1 << 30))
+            head = reply.read(2)
+            assert head[0] == 0x88 and head[1] <= 125
+            assert struct.unpack("!H", reply.read(head[1])[:2])[0] == 1009
+        deadline = time.monotonic() + 5.0
+        while server.client_count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert server.client_count == 0
+    finally:
+        server.stop()
+
+
+def test_stream_server_skips_racing_frames():
+    server = cosmic_engine.StreamServer(make_simulator(), rate=200)
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        raise IndexError("particle list resized mid-tick")
+
+    server.broadcast = flaky
+    server.serve(0)
+    try:
+        deadline = time.monotonic() + 5.0
+        while len(calls) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        server.stop()
+    assert server.frames_skipped >= 3 and server.last_error is None
+
+
+# --- latency ---
+
+def test_latency_counts_each_captured_frame_once():
+    sim = make_simulator()
+    sim.recorder.start()
+    captured = make_frame(0)
+    t0 = time.monotonic()
+    captured.stageTimes.update({"capture": t0, "features": t0 + 0.001})
+    sim.process_audio_frames([captured])
+    sim.tick()
+    stamps = dict(captured.stageTimes)
+
+    # Re-ingesting the same frame and replaying the recording leave the histograms alone
+    sim.process_audio_frames([captured])
+    sim.tick()
+    sim.recorder.stop()
+    replayed = sim.recorder.next_frame()
+    sim.process_audio_frames([replayed])
+    sim.tick()
+
+    assert captured.stageTimes == stamps
+    assert replayed.stageTimes == {}
+    counts = {stage: hist.summary()["count"] for stage, hist in sim.latency.histograms.items()}
+    assert counts == {"features": 1, "ingest": 1, "tokens": 1, "tick": 1}
+
+
+# --- recorder ---
+
+def test_recorder_save_load_round_trip(tmp_path):
+    recorder = cosmic_engine.Recorder()
+    recorder.start()
+    for i in range(4):
+        frame = make_frame(i, drift=3.0)
+        frame.dataArray = np.linspace(-1.0, 1.0, 16) * i
+        recorder.add_frame(frame)
+    recorder.add_frame(make_frame(4))  # no samples
+    recorder.stop()
+    path = str(tmp_path / "recording.json")
+    recorder.save(path)
+
+    loaded = cosmic_engine.Recorder()
+    loaded.load(path)
+    assert [cosmic_engine.Recorder.frame_to_dict(f) for f in loaded.frames] == \
+        [cosmic_engine.Recorder.frame_to_dict(f) for f in recorder.frames]
+    assert b"".join(loaded.iter_export_chunks(include_data=True)) == \
+        b"".join(recorder.iter_export_chunks(include_data=True))
+
+
+# --- metrics exporter ---
+
+def test_metrics_exporter_stop_joins_file_writer(tmp_path):
+    import threading
+    path = str(tmp_path / "metrics.prom")
+    exporter = cosmic_engine.MetricsExporter(run_frames(make_simulator(), 0, 3))
+    exporter.start_file_writer(path, interval=0.01)
+    first = exporter._file_thread
+    exporter.start_file_writer(path, interval=0.01)  # restarting replaces the writer
+    assert not first.is_alive()
+    writer = exporter._file_thread
+    exporter.stop()
+    assert not writer.is_alive() and exporter._file_thread is None
+    assert writer not in threading.enumerate()
+    with open(path) as f:
+        assert "cosmic_tick" in f.read()
+
+
+# --- per-simulator RNG ---
+
+def seeded_run(seed: int):
+    """Particle state and token bytes after a fixed sequence of frames"""
+    import json
+    sim = Simulator()
+    sim.set_seed(seed)
+    for i in range(4):
+        sim.add_particle(sim.rng.random(), sim.rng.random(), sim.rng.random(), 200.0 * (i + 1))
+    for i in range(12):
+        fundamental = 220.0 + 5.0 * i
+        sim.processed_audio_queue.put(AudioFrame(
+            timestamp=1_700_000_000.0 + i * 0.05,
+            rmsEnergy=0.4,
+            frequencyData=[{"frequency": fundamental, "magnitude": 0.6},
+                           {"frequency": 3.0 * fundamental, "magnitude": 0.2}],
+            spectralCentroid=400.0,
+            harmonics=[fundamental * 1.5 ** k for k in range(4)]
+        ))
+        sim.tick(0.005)
+    state = [(p.id, p.x, p.y, p.z, p.theta, p.frequency) for p in sim.particles]
+    return state, json.dumps(list(sim.token_stream.tokens), default=float)
+
+
+def test_seeded_runs_do_not_depend_on_thread_count():
+    from concurrent.futures import ThreadPoolExecutor
+    seeds = [3, 3, 7, 11]
+    expected = [seeded_run(seed) for seed in seeds]
+    assert expected[0] == expected[1] and expected[0] != expected[2]
+    for threads in (2, 4):
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            assert list(pool.map(seeded_run, seeds)) == expected
+
+
+# --- metrics history ---
+
+def test_lttb_downsample_keeps_endpoints_and_count():
+    rng = np.random.default_rng(2)
+    x = np.cumsum(rng.uniform(0.01, 0.1, size=5000))
+    y = np.sin(x) + rng.normal(0.0, 0.1, size=5000)
+    for threshold in (3, 10, 500, 4999):
+        idx = cosmic_engine.lttb_downsample(x, y, threshold)
+        assert len(idx) == threshold
+        assert idx[0] == 0 and idx[-1] == len(x) - 1
+        assert np.all(np.diff(idx) > 0)
+    # Nothing to decimate
+    assert cosmic_engine.lttb_downsample(x[:50], y[:50], 500).tolist() == list(range(50))
+
+
+def test_metrics_history_rows_are_chronological():
+    history = cosmic_engine.MetricsHistory(("energy",), capacity=16, levels=3, factor=4)
+    for k in range(500):
+        history.append(float(k), {"energy": 2.0 * k})
+    rows = history.rows()
+    assert len(rows) == len(history) <= 3 * 16 + 2  # + partial groups of levels 1 and 2
+    assert np.all(np.diff(rows[:, 0]) > 0)
+    assert rows[-1].tolist() == [499.0, 998.0]
+    # Coarse levels hold group means of the raw samples
+    assert np.allclose(rows[:, 1], 2.0 * rows[:, 0])
+    t, y = history.series("energy", max_points=10)
+    assert len(t) == 10 and t[-1] == 499.0
+
+
+def test_metrics_history_has_no_gap_between_levels():
+    history = cosmic_engine.MetricsHistory(("energy",), capacity=16, levels=3, factor=4)
+    for k in range(600):
+        history.append(float(k), {"energy": 2.0 * k})
+        rows = history.rows()
+        assert len(rows) == len(history)
+        # Adjacent rows are never further apart than one coarsest group (4 * 4 samples)
+        assert np.all(np.diff(rows[:, 0]) > 0) and np.all(np.diff(rows[:, 0]) <= 16.0)
+        assert np.allclose(rows[:, 1], 2.0 * rows[:, 0])
+        if k == 202:
+            # Level 0 holds 187..202; 184..186 wait for a fourth sample and show as their mean
+            level0 = int(np.flatnonzero(rows[:, 0] == 187.0)[0])
+            assert rows[level0 - 1, 0] == 185.0
+
+
+# --- block timesteps ---
+
+def test_block_steps_at_level_zero_match_uniform_step():
+    def cloud(block: bool) -> Simulator:
+        sim = Simulator()
+        sim.set_seed(9)
+        sim.physics.gravEnabled = True
+        sim.timestep.adaptive = False
+        sim.timestep.blockSteps = block
+        sim.timestep.maxBlockLevel = 0
+        rng = np.random.default_rng(9)
+        for x, y, z in rng.uniform(-3.0, 3.0, size=(60, 3)):
+            sim.add_particle(float(x), float(y), float(z), 440.0)
+        return sim
+
+    uniform, block = cloud(False), cloud(True)
+    for _ in range(5):
+        uniform.tick(0.005)
+        block.tick(0.005)
+    assert block.block_levels.tolist() == [0] * 60
+    assert block.get_block_stats()["particleSteps"] == 60
+    assert [(p.x, p.y, p.z) for p in block.particles] == [(p.x, p.y, p.z) for p in uniform.particles]
+    assert [p.velocity.tolist() for p in block.particles] == [p.velocity.tolist() for p in uniform.particles]
+
+
+# --- integrators ---
+
+def lorenz_error(integrator: str, dt: float, horizon: float = 0.2) -> float:
+    """Max position error on the Lorenz flow against RK4 at dt=1e-4"""
+    def run(integrator: str, dt: float) -> np.ndarray:
+        sim = Simulator()
+        sim.set_seed(4)
+        sim.timestep.integrator = integrator
+        rng = np.random.default_rng(4)
+        for _ in range(8):
+            sim.add_particle(rng.uniform(-15.0, 15.0), rng.uniform(-20.0, 20.0), rng.uniform(5.0, 40.0))
+        for _ in range(int(round(horizon / dt))):
+            sim._update_particle_positions(dt)
+        return np.array([(p.x, p.y, p.z) for p in sim.particles])
+    return float(np.max(np.abs(run(integrator, dt) - run("rk4", 1e-4))))
+
+
+@pytest.mark.parametrize("integrator, order", [("euler", 1), ("rk4", 4), ("leapfrog", 4)])
+def test_integrators_converge_at_expected_order(integrator, order):
+    coarse, fine = lorenz_error(integrator, 0.004), lorenz_error(integrator, 0.002)
+    assert np.log2(coarse / fine) == pytest.approx(order, abs=0.3)
+
+
+def gravity_energy(sim: Simulator) -> float:
+    positions = np.array([(p.x, p.y, p.z) for p in sim.particles])
+    masses = np.array([p.mass for p in sim.particles])
+    velocities = np.array([getattr(p, 'grav_velocity', p.velocity) for p in sim.particles])
+    d2 = np.sum((positions[:, None, :] - positions[None, :, :]) ** 2, axis=2)
+    pair = np.triu(np.ones_like(d2, dtype=bool), k=1) & (d2 <= sim.physics.rCutoff ** 2)
+    potential = sim.physics.G * masses[:, None] * masses[None, :] / np.sqrt(d2 + sim.physics.epsilon ** 2)
+    return float(0.5 * np.sum(masses * np.sum(velocities ** 2, axis=1)) - np.sum(potential[pair]))
+
+
+def test_leapfrog_keeps_gravity_energy_bounded():
+    def worst_drift(integrator: str, dt: float) -> float:
+        """Largest relative energy error over one time unit of gravity only"""
+        sim = Simulator()
+        sim.set_seed(2)
+        sim.physics.G = 1.0
+        sim.physics.gravEnabled = True
+        sim.physics.blendLorenz = 0.0
+        sim.timestep.adaptive = False
+        sim.timestep.integrator = integrator
+        for x, y, z in np.random.default_rng(2).normal(0.0, 1.0, size=(12, 3)):
+            sim.add_particle(float(x), float(y), float(z), 440.0)
+        sim.tick(dt)
+        E0 = gravity_energy(sim)
+        worst = 0.0
+        for _ in range(int(round(1.0 / dt))):
+            sim.tick(dt)
+            worst = max(worst, abs(gravity_energy(sim) - E0) / abs(E0))
+        return worst
+
+    coarse, fine = worst_drift("leapfrog", 0.01), worst_drift("leapfrog", 0.005)
+    assert coarse < 0.05
+    assert np.log2(coarse / fine) == pytest.approx(2, abs=0.5)
+    assert worst_drift("euler", 0.01) > 100 * coarse
+
+
+# --- shared-memory state ---
+
+def read_shared_frames(name: str, last_frame: int, results):
+    """Reader process: collect (frame, count) until ``last_frame``, counting torn copies"""
+    reader = cosmic_engine.SharedStateReader(name)
+    seen, torn = [], 0
+    try:
+        deadline = time.monotonic() + 30.0
+        while time.monotonic() < deadline:
+            frame = reader.read()
+            if frame is None:
+                continue
+            columns, diagnostics = frame["columns"], frame["diagnostics"]
+            if len(columns["Ec"]) != frame["count"] or columns["Ec"].sum() != diagnostics["totalEnergy"]:
+                torn += 1
+            seen.append((frame["frame"], frame["count"]))
+            if frame["frame"] >= last_frame:
+                break
+    finally:
+        reader.close()
+    results.put((seen, torn))
+
+
+def test_shared_state_reader_in_another_process():
+    import multiprocessing
+    # A fresh interpreter, like any other local reader
+    context = multiprocessing.get_context("spawn")
+    name = f"cosmic_test_{os.getpid()}"
+    sim = Simulator()
+    sim.set_seed(5)
+    for i in range(10):
+        sim.add_particle(i, 0.0, 0.0, 100.0 * i + 100.0)
+    publisher = sim.start_shared_state(name, capacity=16)
+    results = context.Queue()
+    reader = context.Process(target=read_shared_frames, args=(name, 300, results))
+    reader.start()
+    try:
+        while publisher.frames_published < 300:
+            if publisher.frames_published % 25 == 10:
+                sim.add_particle(1.0, 2.0, 3.0, 440.0)  # outgrows the segment at 17
+            sim.tick()
+        seen, torn = results.get(timeout=30.0)
+    finally:
+        reader.join(timeout=30.0)
+        sim.stop_shared_state()
+    assert reader.exitcode == 0
+    assert torn == 0
+    assert seen[-1] == (300, len(sim.particles)) and len(sim.particles) > 16
+    assert [frame for frame, _ in seen] == sorted(frame for frame, _ in seen)
+    assert not os.path.exists(f"/dev/shm/{name}")
+
+
+# --- domain decomposition ---
+
+def make_domain_simulator(n: int = 120, seed: int = 7) -> Simulator:
+    sim = Simulator()
+    sim.set_seed(seed)
+    sim.physics.gravEnabled = True
+    sim.physics.dmEnabled = True
+    sim.timestep.adaptive = False
+    rng = np.random.default_rng(seed)
+    for x, y, z in rng.uniform(-4.0, 4.0, size=(n, 3)):
+        sim.add_particle(float(x), float(y), float(z), float(rng.uniform(100.0, 2000.0)))
+    return sim
+
+
+def domain_state(sim: Simulator) -> np.ndarray:
+    return np.array([(p.x, p.y, p.z, *p.velocity, p.x12, p.m12, p.omega, p.Ugrav, p.Udm, p.Ec)
+                     for p in sim.particles])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_distributed_stepper_matches_tick(workers):
+    reference = make_domain_simulator()
+    for _ in range(4):
+        reference.tick()
+    sim = make_domain_simulator()
+    sim.domain.workers = workers
+    sim.domain.rebalanceInterval = 2
+    stats = sim.run_distributed(4)
+    assert stats["workers"] == workers and stats["steps"] == 4 and sum(stats["domainSizes"]) == 120
+    assert [p.id for p in sim.particles] == [p.id for p in reference.particles]
+    assert np.allclose(domain_state(sim), domain_state(reference), rtol=1e-12, atol=1e-12)
+    assert sim.compute_psi()["psiTotal"] == pytest.approx(reference.compute_psi()["psiTotal"], rel=1e-9)
+
+
+class RecordingConnection:
+    """Pipe end that records the pickled size of every message sent"""
+
+    def __init__(self, conn, sizes):
+        self.conn = conn
+        self.sizes = sizes
+
+    def send(self, message):
+        import pickle
+        self.sizes.append(len(pickle.dumps(message)))
+        self.conn.send(message)
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_distributed_stepper_matches_chunked_tick(workers):
+    energies = (0.0, 0.6, 0.6, 1.5)  # sigma/rho follow the audio every step
+    chunked = make_domain_simulator()
+    chunked.parallel.enabled = True
+    chunked.parallel.chunkSize = 32
+    for energy in energies:
+        chunked.current_audio_energy = energy
+        chunked.tick()
+
+    sim = make_domain_simulator()
+    sim.domain.workers = workers
+    sizes = []
+    with cosmic_engine.DistributedStepper(sim) as stepper:
+        stepper._conns = [RecordingConnection(conn, sizes) for conn in stepper._conns]
+        for energy in energies:
+            sim.current_audio_energy = energy
+            stepper.step()
+        stepper.sync_to_simulator()
+    assert np.allclose(domain_state(sim), domain_state(chunked), rtol=1e-12, atol=1e-12)
+    assert sim.compute_psi()["psiTotal"] == pytest.approx(chunked.compute_psi()["psiTotal"], rel=1e-9)
+    # Configs and the NFW table went over once, with the fork; steps send a few hundred bytes
+    assert len(sizes) == (4 * workers + workers if workers > 1 else 0)
+    assert max(sizes, default=0) < 1024
+
+
+# --- NFW dark matter table ---
+
+def test_nfw_table_matches_analytic_profile():
+    rho0, rs = 1.0, 5.0
+    table = cosmic_engine.NFWTable(rho0, rs)
+    rng = np.random.default_rng(1)
+    r = np.concatenate([[1e-6, 1e-3, 0.5], rng.uniform(0.01, 1500.0, size=5000)])
+    direction = rng.normal(size=(3, len(r)))
+    direction /= np.linalg.norm(direction, axis=0)
+    phi, acc = table.evaluate(*(r * direction))
+
+    x = r / rs
+    scale = 4 * np.pi * cosmic_engine.G * rho0 * rs ** 3
+    expected_phi = -scale * np.log1p(x) / r
+    expected_g = scale * (np.log1p(x) - x / (1 + x)) / r ** 2
+    assert np.max(np.abs(phi / expected_phi - 1)) < 1e-4
+    assert np.max(np.abs(np.linalg.norm(acc, axis=0) / expected_g - 1)) < 1e-3
+    # Acceleration points at the origin
+    assert np.allclose(acc / np.linalg.norm(acc, axis=0), -direction)
+
+
+def test_nfw_table_is_finite_at_origin():
+    rho0, rs = 2.0, 3.0
+    table = cosmic_engine.NFWTable(rho0, rs)
+    phi, acc = table.evaluate(np.zeros(2), np.zeros(2), np.zeros(2))
+    assert phi.tolist() == [-4 * np.pi * cosmic_engine.G * rho0 * rs ** 2] * 2
+    assert acc.tolist() == [[0.0, 0.0]] * 3
+
+
+    # A particle sitting on the halo centre gets the finite central potential
+    sim = Simulator()
+    sim.set_seed(1)
+    sim.physics.dmEnabled = True
+    sim.add_particle(0.0, 0.0, 0.0, 440.0)
+    sim.add_particle(1.0, 2.0, 3.0, 440.0)
+    sim.particles[0].x = 0.0
+    sim.tick()
+    assert all(np.isfinite([p.Udm for p in sim.particles] + [p.x for p in sim.particles]))
+
+
+# --- φ harmonics ---
+
+def looped_phi_harmonics(fundamental, count=8):
+    """The UI's original generate_phi_harmonics loop"""
+    harmonics = []
+    for i in range(count):
+        freq = fundamental * (cosmic_engine.PHI ** (i / 2))
+        while freq > fundamental * 4:
+            freq /= 2
+        while freq < fundamental / 2:
+            freq *= 2
+        harmonics.append(freq)
+    return sorted(harmonics)
+
+
+def test_phi_harmonics_match_original_loop():
+    rng = np.random.default_rng(12)
+    bins = np.arange(1, 2048) * 44100.0 / 4096  # FFT bin grid
+    fundamentals = np.concatenate([bins, rng.uniform(20.0, 20000.0, size=2000), rng.uniform(1e-3, 1.0, size=200)])
+    for count in (1, 5, 8, 13, 64, 70):
+        for fundamental in fundamentals.tolist():
+            assert cosmic_engine.phi_harmonics(fundamental, count) == looped_phi_harmonics(fundamental, count)
+    for i in (0, 1, 7, 63, 64, 100):
+        assert cosmic_engine.phi_ratio(i) == cosmic_engine.PHI ** (i / 2)
+    assert all(type(f) is float for f in cosmic_engine.phi_harmonics(np.float64(440.0)))
+
+
+# --- float32 state ---
+
+def test_float32_chunked_tick_computes_in_float32():
+    wide, narrow = make_cloud(), make_cloud()
+    narrow.set_precision("float32")
+    for sim in (wide, narrow):
+        sim.physics.gravEnabled = True
+        for _ in range(3):
+            sim.tick()
+    state = np.array([(p.x, p.y, p.z, *p.velocity, p.x12, p.m12, p.theta) for p in narrow.particles])
+    assert np.array_equal(state, state.astype(np.float32))
+    assert not np.array_equal(state, np.array([(p.x, p.y, p.z, *p.velocity, p.x12, p.m12, p.theta)
+                                               for p in wide.particles]))
+    # Energies and ψ are summed in float64, so they agree to float32 rounding
+    energy = [sum(p.Ec for p in sim.particles) for sim in (wide, narrow)]
+    assert energy[1] == pytest.approx(energy[0], rel=1e-5)
+    assert narrow.compute_psi()["psiTotal"] == pytest.approx(wide.compute_psi()["psiTotal"], rel=1e-5)
+    assert all(np.isfinite(p.vi) and p.vi == p.Ec / cosmic_engine.H for p in narrow.particles)